@@ -4,45 +4,56 @@ API dependencies for authentication, RBAC permission check and campus scope filt
 1. JWT Token验证
 2. RBAC权限检查（资源:操作 粒度）
 3. 校区数据范围过滤
+4. 参考数据接口的条件请求（ETag）
 """
-from typing import Annotated, Optional, Set
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Annotated, FrozenSet, Optional, Tuple
 
-from fastapi import Depends, Header
+from fastapi import Depends, Header, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.config import settings
+from app.core.cache import TTLCache
 from app.core.exceptions import ForbiddenException, UnauthorizedException
+from app.core.permission_mask import token_allows
+from app.core.presence import presence
+from app.core.principal import Principal, load_principal
 from app.core.security import verify_token
+from app.core.versions import PERMISSION_VERSION, get_scoped_stamp, get_stamp, get_version
 from app.database import get_db
 from app.models.user import Role, User
 from app.models.permission import UserRole, RolePermission, Permission, Resource
 
 
-# 权限缓存（简单内存缓存，生产环境可用Redis）
-_permission_cache: dict[int, Set[str]] = {}
+# 权限缓存：按角色缓存，值为 (权限版本号, 权限集合)
+# 角色权限变更时数据库中的权限版本号加1，各工作进程读取到新版本号后自动失效
+_permission_cache = TTLCache(
+    "role_permissions",
+    maxsize=settings.permission_cache_max_entries,
+)
 
 
 def clear_permission_cache(user_id: int = None):
     """
-    清除权限缓存。
-    角色权限变更后需要调用此函数。
+    清除本进程的权限缓存。
+    权限按角色缓存，user_id 参数仅为兼容保留，总是清空全部。
+    其他工作进程通过权限版本号失效（见 PermissionService）。
     """
-    global _permission_cache
-    if user_id:
-        _permission_cache.pop(user_id, None)
-    else:
-        _permission_cache = {}
+    _permission_cache.clear()
 
 
-async def get_user_permissions(db: AsyncSession, user_id: int, role_id: int) -> Set[str]:
+async def get_user_permissions(db: AsyncSession, user_id: int, role_id: int) -> FrozenSet[str]:
     """
     获取用户所有权限（格式：resource_code:action）。
-    结果会被缓存。
+    权限只取决于角色，结果按角色缓存，权限版本号变化后重新查询。
     """
-    cache_key = user_id
-    if cache_key in _permission_cache:
-        return _permission_cache[cache_key]
+    version = await get_version(db, PERMISSION_VERSION)
+    cached = _permission_cache.get(role_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
 
     result = await db.execute(
         select(Resource.code, Permission.action)
@@ -51,8 +62,8 @@ async def get_user_permissions(db: AsyncSession, user_id: int, role_id: int) ->
         .where(RolePermission.role_id == role_id)
     )
 
-    permissions = {f"{row.code}:{row.action}" for row in result}
-    _permission_cache[cache_key] = permissions
+    permissions = frozenset(f"{row.code}:{row.action}" for row in result)
+    _permission_cache.set(role_id, (version, permissions))
     return permissions
 
 
@@ -65,13 +76,80 @@ class TokenCampusInfo:
     role_code: Optional[str] = None
 
 
-async def get_current_user(
-    authorization: Annotated[Optional[str], Header()] = None,
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def _get_linked_id(db: AsyncSession, user: User, model) -> Optional[int]:
     """
-    Get current authenticated user from JWT token.
-    加载用户的同时预加载角色信息，并从JWT中提取campus_id。
+    获取用户关联的教师/学生ID（通过 model.user_id 关联）。
+    Principal 上的结果在本次请求内缓存，同一请求多次调用只查询一次。
+    """
+    memo = getattr(user, "_request_memo", None)
+    key = model.__tablename__
+    if memo is not None and key in memo:
+        return memo[key]
+
+    result = await db.execute(select(model.id).where(model.user_id == user.id))
+    linked_id = result.scalar_one_or_none()
+    if memo is not None:
+        memo[key] = linked_id
+    return linked_id
+
+
+class AuthContext:
+    """
+    请求级鉴权上下文。
+    每个请求只解析一次令牌，挂在 request.state.auth 上，所有鉴权依赖共用：
+    Principal、权限集合、校区范围、关联的教师/学生ID（后两者按需查询并缓存）。
+    """
+
+    def __init__(self, principal: Principal, claims: Optional[dict] = None):
+        self.principal = principal
+        self.claims = claims or {}
+        self._permissions: Optional[FrozenSet[str]] = None
+
+    @property
+    def campus_id(self) -> Optional[int]:
+        """JWT 中选择的校区ID"""
+        return self.principal._token_campus_id
+
+    @property
+    def role_code(self) -> Optional[str]:
+        """JWT 中的角色编码"""
+        return self.principal._token_role_code
+
+    async def get_permissions(self, db: AsyncSession) -> FrozenSet[str]:
+        """当前用户的权限集合（未分配角色时为空）"""
+        if self._permissions is None:
+            role_id = self.principal.role_id
+            self._permissions = (
+                await get_user_permissions(db, self.principal.id, role_id)
+                if role_id else frozenset()
+            )
+        return self._permissions
+
+    async def has_permission(self, db: AsyncSession, permission: str) -> bool:
+        """
+        判断是否拥有指定权限。
+        令牌中的权限位图与当前权限版本、当前角色一致时直接按位判断，否则查询角色权限。
+        """
+        allowed = await token_allows(db, self.claims, permission, self.principal.role_id)
+        if allowed is None:
+            allowed = permission in await self.get_permissions(db)
+        return allowed
+
+    async def get_teacher_id(self, db: AsyncSession) -> Optional[int]:
+        """当前用户关联的教师ID"""
+        from app.models.teacher import Teacher
+        return await _get_linked_id(db, self.principal, Teacher)
+
+    async def get_student_id(self, db: AsyncSession) -> Optional[int]:
+        """当前用户关联的学生ID"""
+        from app.models.student import Student
+        return await _get_linked_id(db, self.principal, Student)
+
+
+async def _authenticate(authorization: Optional[str], db: AsyncSession) -> AuthContext:
+    """
+    校验 JWT 并构建请求级鉴权上下文（Principal 附带 JWT 中的 campus_id 和 role_code）。
+    Principal 按用户ID缓存，缓存命中时不查询数据库。
     """
     if not authorization or not authorization.startswith("Bearer "):
         raise UnauthorizedException("未提供认证令牌")
@@ -86,30 +164,50 @@ async def get_current_user(
     if not user_id:
         raise UnauthorizedException("无效的认证令牌")
 
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.user_role), selectinload(User.campus))
-        .where(User.id == int(user_id))
-    )
-    user = result.scalar_one_or_none()
+    principal = await load_principal(db, int(user_id))
 
-    if not user:
+    if not principal:
         raise UnauthorizedException("用户不存在")
 
-    if not user.is_active:
+    if not principal.is_active:
         raise UnauthorizedException("用户已被禁用")
 
-    # Attach JWT campus_id to user object for data filtering
+    presence.touch(principal.id)
+
+    # Attach JWT campus_id to principal for data filtering
     # This is the campus selected at login, not from database
-    user._token_campus_id = payload.get("campus_id")
-    user._token_role_code = payload.get("role_code")
+    return AuthContext(principal.with_token(payload), payload)
 
-    return user
+
+async def get_auth_context(
+    request: Request,
+    authorization: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db)
+) -> AuthContext:
+    """
+    获取请求级鉴权上下文，同一请求内只解析一次。
+    """
+    auth = getattr(request.state, "auth", None)
+    if auth is None:
+        auth = await _authenticate(authorization, db)
+        request.state.auth = auth
+    return auth
+
+
+async def get_current_user(
+    auth: AuthContext = Depends(get_auth_context)
+) -> Principal:
+    """
+    Get current authenticated user from JWT token.
+    返回当前用户的 Principal（含角色和校区摘要），并从JWT中提取campus_id。
+    需要完整 User 对象（如修改密码、个人资料）时按 id 另行查询。
+    """
+    return auth.principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user."""
     if not current_user.is_active:
         raise UnauthorizedException("用户已被禁用")
@@ -117,8 +215,8 @@ async def get_current_active_user(
 
 
 async def get_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Get current user and verify they are a super admin.
     兼容旧版role字段和新版role_id。
@@ -147,8 +245,8 @@ class RoleChecker:
 
     async def __call__(
         self,
-        current_user: User = Depends(get_current_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_user)
+    ) -> Principal:
         if current_user.role not in self.allowed_roles:
             raise ForbiddenException(
                 f"需要以下角色之一: {', '.join(self.allowed_roles)}"
@@ -177,52 +275,23 @@ class PermissionChecker:
     async def __call__(
         self,
         db: AsyncSession = Depends(get_db),
-        authorization: Annotated[Optional[str], Header()] = None,
-    ) -> User:
-        # 1. 验证Token获取用户
-        if not authorization or not authorization.startswith("Bearer "):
-            raise UnauthorizedException("未提供认证令牌")
-
-        token = authorization.split(" ")[1]
-        payload = verify_token(token, token_type="access")
-
-        if not payload:
-            raise UnauthorizedException("无效的认证令牌")
-
-        user_id = payload.get("sub")
-        if not user_id:
-            raise UnauthorizedException("无效的认证令牌")
-
-        # 2. 获取用户及角色和校区
-        result = await db.execute(
-            select(User)
-            .options(selectinload(User.user_role), selectinload(User.campus))
-            .where(User.id == int(user_id))
-        )
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise UnauthorizedException("用户不存在")
-        if not user.is_active:
-            raise UnauthorizedException("用户已被禁用")
-
-        # 3. 从JWT中提取campus_id和role_code，附加到用户对象
-        user._token_campus_id = payload.get("campus_id")
-        user._token_role_code = payload.get("role_code")
-
-        # 4. 超级管理员跳过权限检查
+        auth: AuthContext = Depends(get_auth_context),
+    ) -> Principal:
+        # 1. 当前用户（请求级鉴权上下文，含角色和校区，附带JWT中的campus_id和role_code）
+        user = auth.principal
+
+        # 2. 超级管理员跳过权限检查
         if user.user_role and user.user_role.code == "super_admin":
             return user
         # 兼容旧版admin角色
         if user.role == Role.ADMIN.value and not user.role_id:
             return user
 
-        # 5. 检查RBAC权限
+        # 3. 检查RBAC权限
         if not user.role_id:
             raise ForbiddenException("用户未分配角色")
 
-        permissions = await get_user_permissions(db, user.id, user.role_id)
-        if self.required_permission not in permissions:
+        if not await auth.has_permission(db, self.required_permission):
             raise ForbiddenException(
                 f"无权限访问此资源 (需要: {self.required_permission})"
             )
@@ -299,17 +368,76 @@ class CampusScopedQuery:
     async def get_teacher_id_for_user(self, db: AsyncSession, user: User) -> Optional[int]:
         """
         获取用户对应的教师ID（仅教师角色有效）。
-        通过 Teacher.user_id 关联查询。
+        通过 Teacher.user_id 关联查询，同一请求内只查询一次。
         """
         if not self.is_teacher(user):
             return None
 
         from app.models.teacher import Teacher
-        result = await db.execute(
-            select(Teacher.id).where(Teacher.user_id == user.id)
-        )
-        row = result.scalar_one_or_none()
-        return row
+        return await _get_linked_id(db, user, Teacher)
+
+
+class ConditionalGet:
+    """
+    参考数据接口的条件请求（ETag / Last-Modified）。
+    ETag 由相关数据的版本号、请求路径和参数、当前用户及所选校区计算，
+    请求头 If-None-Match 命中时直接返回 304，不查询业务数据；版本号读取走进程内缓存。
+    版本号由对应的服务在数据变更时递增（见 app.core.versions）。
+    campus_keys 中的类别按当前所选校区取校区版本号（未选择校区时为全部校区的汇总），
+    一个校区的写操作不会让其他校区的 ETag 失效。
+
+    须放在接口参数的最后，保证登录和权限检查先执行：
+
+        dict_etag = ConditionalGet(DICT_VERSION)
+        student_etag = ConditionalGet(campus_keys=(STUDENT_VERSION,))
+
+        @router.get("/items/{type_code}")
+        async def get_dict_items(..., _: CurrentUser = None, __: None = Depends(dict_etag)):
+            ...
+    """
+
+    def __init__(self, *version_keys: str, campus_keys: Tuple[str, ...] = ()):
+        self.version_keys = version_keys
+        self.campus_keys = campus_keys
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db),
+        auth: AuthContext = Depends(get_auth_context),
+    ) -> None:
+        keys = [*self.version_keys, *(f"{key}@{auth.campus_id}" for key in self.campus_keys)]
+        stamps = [await get_stamp(db, key) for key in self.version_keys]
+        stamps += [await get_scoped_stamp(db, key, auth.campus_id) for key in self.campus_keys]
+        variant = "|".join([
+            ",".join(f"{key}={version}" for key, (version, _) in zip(keys, stamps)),
+            request.url.path,
+            "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items())),
+            f"{auth.principal.id}:{auth.campus_id}:{auth.role_code}",
+        ])
+        etag = f'W/"{hashlib.sha1(variant.encode()).hexdigest()[:20]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        modified = [stamp for _, stamp in stamps if stamp is not None]
+        if modified:
+            last = max(m if m.tzinfo else m.replace(tzinfo=timezone.utc) for m in modified)
+            headers["Last-Modified"] = format_datetime(last.astimezone(timezone.utc), usegmt=True)
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 弱比较（忽略 W/ 前缀，支持多个值和 *）"""
+    if not if_none_match:
+        return False
+    current = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == current:
+            return True
+    return False
 
 
 # 便捷函数：创建权限检查依赖
@@ -319,9 +447,10 @@ def require_permission(resource: str, action: str):
 
 
 # Type aliases for dependency injection
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(get_admin_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+AdminUser = Annotated[Principal, Depends(get_admin_user)]
 DBSession = Annotated[AsyncSession, Depends(get_db)]
+Auth = Annotated[AuthContext, Depends(get_auth_context)]
 
 # 常用权限检查快捷方式
 # Dashboard
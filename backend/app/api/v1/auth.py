@@ -99,11 +99,13 @@ async def refresh_token(
 @router.get("/me", summary="获取当前用户信息")
 async def get_current_user_info(
     current_user: CurrentUser,
+    db: DBSession,
 ):
     """
     Get current authenticated user information.
     """
-    return success_response(UserResponse.model_validate(current_user).model_dump())
+    user = await AuthService(db).get_user(current_user.id)
+    return success_response(UserResponse.model_validate(user).model_dump())
 
 
 @router.put("/password", summary="修改密码")
@@ -117,7 +119,7 @@ async def change_password(
     """
     auth_service = AuthService(db)
     await auth_service.change_password(
-        user=current_user,
+        user=await auth_service.get_user(current_user.id),
         old_password=password_data.old_password,
         new_password=password_data.new_password,
     )
@@ -135,7 +137,7 @@ async def update_profile(
     """
     auth_service = AuthService(db)
     user = await auth_service.update_profile(
-        user=current_user,
+        user=await auth_service.get_user(current_user.id),
         email=profile_data.email,
         phone=profile_data.phone,
         avatar=profile_data.avatar,
@@ -0,0 +1,173 @@
+"""
+Composite batch request endpoint.
+页面加载时的多个只读请求合并为一次调用：鉴权只解析一次（子请求复用 request.state.auth），
+子请求经由应用自身的 ASGI 栈并发执行，各自从连接池取会话，结果按子请求分别返回状态码和响应体。
+进程内所有批量请求共用一个并发上限，且上限小于连接池大小，批量请求不会占满连接池。
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.routing import Match
+
+from app.api.deps import AuthContext, get_auth_context
+from app.config import settings
+from app.database import engine, get_db
+from app.schemas.batch import BatchRequest, BatchSubRequest, BatchSubResponse
+from app.schemas.common import success_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["批量请求"])
+
+# 允许批量调用的 GET 接口（路由模板，相对 /api/v1）：页面加载用到的字典、下拉、列表和统计
+BATCH_ROUTES = frozenset({
+    "/auth/me",
+    "/permissions/current",
+    "/dict/types",
+    "/dict/types/code/{code}",
+    "/dict/items/{type_code}",
+    "/campuses",
+    "/campuses/all",
+    "/campuses/{campus_id}/classrooms",
+    "/classrooms",
+    "/classrooms/all",
+    "/courses",
+    "/courses/active",
+    "/students",
+    "/students/active",
+    "/students/all",
+    "/teachers",
+    "/teachers/active",
+    "/teachers/all",
+    "/class-plans",
+    "/class-plans/active",
+    "/class-plans/all",
+    "/enrollments",
+    "/schedules",
+    "/schedules/calendar",
+    "/dashboard/stats",
+    "/dashboard/charts",
+    "/dashboard/student",
+    "/dashboard/teacher",
+    "/dashboard/admin",
+})
+
+# 不转发给子请求的请求头（属于批量请求本身的请求体或缓存协商）
+_SKIPPED_HEADERS = frozenset({b"content-length", b"content-type", b"if-none-match", b"if-modified-since"})
+
+# 进程内共用的子请求并发限制：(上限, 信号量)，上限变化时重建
+_semaphore: Optional[Tuple[int, asyncio.Semaphore]] = None
+
+
+def _concurrency_limit() -> int:
+    """子请求并发上限：不超过 batch_max_concurrency，并给其他请求至少留一个连接池连接"""
+    limit = settings.batch_max_concurrency
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        limit = min(limit, pool_size() - 1)
+    return max(limit, 1)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    limit = _concurrency_limit()
+    if _semaphore is None or _semaphore[0] != limit:
+        _semaphore = (limit, asyncio.Semaphore(limit))
+    return _semaphore[1]
+
+
+@router.post("/batch", summary="批量执行只读请求")
+async def batch(
+    data: BatchRequest,
+    request: Request,
+    auth: AuthContext = Depends(get_auth_context),  # 登录校验，结果挂在 request.state 上供子请求复用
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    一次执行多个 GET 子请求，按请求顺序返回每个子请求的 {id, status, body}。
+    子请求沿用当前请求的登录状态和所选校区，权限检查与单独调用时相同；
+    某个子请求失败不影响其他子请求。只允许调用白名单中的接口。
+    """
+    # 本接口挂在 /api/v1 下，子请求路径相对同一前缀
+    prefix = request.scope["route"].path.removesuffix("/batch")
+    semaphore = _get_semaphore()
+    # 结束鉴权查询的事务，把连接还给连接池，子请求执行期间本请求不占用连接
+    await db.commit()
+
+    async def run(item: BatchSubRequest) -> Dict[str, Any]:
+        scope, error = _resolve(request, prefix, item.path)
+        if error:
+            return BatchSubResponse(
+                id=item.id, status=400, body={"code": 400, "message": error, "data": None}
+            ).model_dump()
+        async with semaphore:
+            status, body = await _call(request.app, scope)
+        return BatchSubResponse(id=item.id, status=status, body=body).model_dump()
+
+    results = await asyncio.gather(*(run(item) for item in data.requests))
+    return success_response(list(results))
+
+
+def _resolve(request: Request, prefix: str, path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """构造子请求的 ASGI scope；路径无效或不在白名单中时返回错误信息"""
+    url = urlsplit(path)
+    if url.scheme or url.netloc or not url.path.startswith("/"):
+        return None, f"无效的子请求路径: {path}"
+
+    full_path = prefix + url.path
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(k, v) for k, v in request.scope["headers"] if k not in _SKIPPED_HEADERS],
+        # 复制 state（含已解析的 auth），子请求的鉴权依赖直接复用
+        "state": dict(request.scope.get("state") or {}),
+    }
+
+    # 与路由分发一致：第一个完全匹配的路由即为目标接口
+    for route in request.app.router.routes:
+        if isinstance(route, APIRoute) and route.matches(scope)[0] == Match.FULL:
+            if route.path.removeprefix(prefix) in BATCH_ROUTES:
+                return scope, None
+            break
+    return None, f"不支持批量调用的接口: {url.path}"
+
+
+async def _call(app: Any, scope: Dict[str, Any]) -> Tuple[int, Any]:
+    """在应用内执行子请求，返回状态码和解析后的 JSON 响应体"""
+    status = 500
+    chunks = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # 未处理的异常已由异常处理器写出 500 响应，这里只记录日志，不影响其他子请求
+        logger.exception("批量子请求执行失败: %s", scope["path"])
+        status = 500
+
+    body = b"".join(chunks)
+    return status, json.loads(body) if body else None
@@ -10,8 +10,9 @@ from app.database import get_db
 from app.api.deps import (
     CurrentUser, AdminUser, CampusRead, CampusEdit, CampusDelete,
     ClassroomRead, ClassroomEdit, ClassroomDelete,
-    CampusScopedQuery, DBSession
+    CampusScopedQuery, DBSession, ConditionalGet
 )
+from app.core.versions import CAMPUS_VERSION, CLASSROOM_VERSION
 from app.services.campus_service import CampusService
 from app.schemas.campus import (
     CampusCreate, CampusUpdate, CampusResponse, CampusWithClassroomsResponse,
@@ -21,6 +22,7 @@ from app.schemas.common import MessageResponse, success_response
 
 router = APIRouter(tags=["校区管理"])
 campus_scope = CampusScopedQuery()
+campus_etag = ConditionalGet(CAMPUS_VERSION, CLASSROOM_VERSION)
 
 
 def get_service(db: AsyncSession = Depends(get_db)) -> CampusService:
@@ -34,6 +36,7 @@ async def get_campuses(
     include_inactive: bool = False,
     service: CampusService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(campus_etag),
 ):
     """Get all campuses with their classrooms."""
     items = await service.get_all_campuses(include_inactive)
@@ -45,6 +48,7 @@ async def get_all_campuses_dropdown(
     active_only: bool = True,
     service: CampusService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(campus_etag),
 ):
     """Get all campuses for dropdown (no classrooms)."""
     items = await service.get_all_campuses_simple(active_only)
@@ -56,6 +60,7 @@ async def get_campus(
     campus_id: int,
     service: CampusService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(campus_etag),
 ):
     """Get campus by ID with classrooms."""
     campus = await service.get_campus_by_id(campus_id)
@@ -102,6 +107,7 @@ async def get_classrooms_by_campus(
     active_only: bool = True,
     service: CampusService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(campus_etag),
 ):
     """Get classrooms by campus ID."""
     items = await service.get_classrooms_by_campus(campus_id, active_only)
@@ -127,6 +133,7 @@ async def get_all_classrooms(
     active_only: bool = True,
     db: DBSession = None,
     current_user: ClassroomRead = None,
+    __: None = Depends(campus_etag),
 ):
     """
     Get all classrooms filtered by user's campus scope.
@@ -143,6 +150,7 @@ async def get_all_classrooms_dropdown(
     active_only: bool = True,
     db: DBSession = None,
     current_user: ClassroomRead = None,
+    __: None = Depends(campus_etag),
 ):
     """
     Get classrooms for dropdown filtered by user's campus scope.
@@ -10,14 +10,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.api.deps import (
     DBSession, CampusScopedQuery,
-    ClassPlanRead, ClassPlanEdit, ClassPlanDelete,
+    ClassPlanRead, ClassPlanEdit, ClassPlanDelete, ConditionalGet,
 )
+from app.core.versions import CLASS_PLAN_VERSION, COURSE_VERSION, TEACHER_VERSION
 from app.services.class_plan_service import ClassPlanService
 from app.schemas.class_plan import (
     ClassPlanCreate, ClassPlanUpdate, ClassPlanResponse,
     ClassPlanWithDetailsResponse, ClassPlanBriefResponse
 )
-from app.schemas.common import success_response, MessageResponse
+from app.schemas.common import BatchGetRequest, batch_get_response, success_response, MessageResponse
 
 router = APIRouter(prefix="/class-plans", tags=["开班计划"])
 
@@ -26,16 +27,21 @@ def get_service(db: AsyncSession = Depends(get_db)) -> ClassPlanService:
     return ClassPlanService(db)
 
 
+# 班级下拉带出课程信息，教师按关联的教师档案过滤
+class_plan_etag = ConditionalGet(COURSE_VERSION, TEACHER_VERSION, campus_keys=(CLASS_PLAN_VERSION,))
+
+
 @router.get("", summary="获取开班列表")
 async def get_class_plans(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     course_id: Optional[int] = Query(None, description="课程ID"),
     teacher_id: Optional[int] = Query(None, description="教师ID"),
     campus_id: Optional[int] = Query(None, description="校区ID"),
     status: Optional[str] = Query(None, description="状态"),
     is_active: Optional[bool] = Query(None, description="是否启用"),
-    search: Optional[str] = Query(None, description="搜索关键词"),
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
     start_date_from: Optional[str] = Query(None, description="开班日期起始"),
     start_date_to: Optional[str] = Query(None, description="开班日期截止"),
     db: DBSession = None,
@@ -62,7 +68,8 @@ async def get_class_plans(
 
     items, total = await service.get_all(
         page, page_size, course_id, teacher_id, campus_id, status, is_active, search,
-        start_date_from=start_date_from, start_date_to=start_date_to
+        start_date_from=start_date_from, start_date_to=start_date_to,
+        include_total=include_total,
     )
     # Service返回的已经是ClassPlanWithDetailsResponse，直接用model_dump
     return success_response([item.model_dump() for item in items], total=total, page=page, page_size=page_size)
@@ -73,6 +80,7 @@ async def get_active_class_plans(
     db: DBSession = None,
     service: ClassPlanService = Depends(get_service),
     current_user: ClassPlanRead = None,  # 权限：class_plan:read
+    __: None = Depends(class_plan_etag),
 ):
     """获取所有进行中的开班计划（用于下拉选择）"""
     scope = CampusScopedQuery()
@@ -90,11 +98,15 @@ async def get_active_class_plans(
 @router.get("/all", summary="获取所有开班下拉列表")
 async def get_all_class_plans_dropdown(
     active_only: bool = True,
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
+    q: Optional[str] = Query(None, description="输入联想关键词，传入时只返回最匹配的 limit 条"),
+    limit: int = Query(20, ge=1, le=100, description="输入联想返回条数"),
     db: DBSession = None,
     service: ClassPlanService = Depends(get_service),
     current_user: ClassPlanRead = None,  # 权限：class_plan:read
+    __: None = Depends(class_plan_etag),
 ):
-    """获取所有开班计划（用于下拉选择）"""
+    """获取所有开班计划（用于下拉选择）；传入 q 时为输入联想模式"""
     scope = CampusScopedQuery()
     campus_id = scope.get_campus_filter(current_user)
 
@@ -103,10 +115,27 @@ async def get_all_class_plans_dropdown(
     if scope.is_teacher(current_user):
         teacher_id = await scope.get_teacher_id_for_user(db, current_user)
 
-    items = await service.get_all_dropdown(active_only, campus_id=campus_id, teacher_id=teacher_id)
+    if q:
+        items = await service.typeahead(q, limit, active_only, campus_id=campus_id, teacher_id=teacher_id)
+    else:
+        items = await service.get_all_dropdown(active_only, campus_id=campus_id, teacher_id=teacher_id, search=search)
     return success_response([ClassPlanBriefResponse.model_validate(item).model_dump() for item in items])
 
 
+@router.post("/batch-get", summary="按ID批量获取开班计划")
+async def batch_get_class_plans(
+    data: BatchGetRequest,
+    service: ClassPlanService = Depends(get_service),
+    current_user: ClassPlanRead = None,  # 权限：class_plan:read
+):
+    """按ID列表一次获取多个开班计划，只返回当前校区范围内的开班计划"""
+    scope = CampusScopedQuery()
+    campus_id = scope.get_campus_filter(current_user)
+    plans = await service.get_by_ids(data.unique_ids, campus_id_filter=campus_id)
+    items, missing_ids = data.arrange([ClassPlanResponse.model_validate(p).model_dump() for p in plans])
+    return batch_get_response(items, missing_ids)
+
+
 @router.get("/{plan_id}", summary="获取开班详情")
 async def get_class_plan(
     plan_id: int,
@@ -10,13 +10,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.api.deps import (
     DBSession, CampusScopedQuery,
-    CourseRead, CourseEdit, CourseDelete,
+    CourseRead, CourseEdit, CourseDelete, ConditionalGet,
 )
+from app.core.versions import COURSE_VERSION
 from app.services.course_service import CourseService
 from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse
 from app.schemas.common import success_response, MessageResponse
 
 router = APIRouter(prefix="/courses", tags=["课程产品"])
+course_etag = ConditionalGet(COURSE_VERSION)
 
 
 def get_service(db: AsyncSession = Depends(get_db)) -> CourseService:
@@ -27,6 +29,7 @@ def get_service(db: AsyncSession = Depends(get_db)) -> CourseService:
 async def get_courses(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     campus_id: Optional[int] = Query(None, description="校区ID"),
     subject: Optional[str] = Query(None, description="学科"),
     grade_level: Optional[str] = Query(None, description="年级"),
@@ -35,6 +38,7 @@ async def get_courses(
     search: Optional[str] = Query(None, description="搜索关键词"),
     service: CourseService = Depends(get_service),
     current_user: CourseRead = None,  # 权限：course:read
+    __: None = Depends(course_etag),
 ):
     """
     获取课程列表（分页）。
@@ -49,7 +53,8 @@ async def get_courses(
 
     items, total = await service.get_all(
         page, page_size, subject, grade_level, level, is_active, search,
-        campus_id=campus_id
+        campus_id=campus_id,
+        include_total=include_total,
     )
     return success_response([CourseResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
 
@@ -58,6 +63,7 @@ async def get_courses(
 async def get_active_courses(
     service: CourseService = Depends(get_service),
     current_user: CourseRead = None,  # 权限：course:read
+    __: None = Depends(course_etag),
 ):
     """获取所有启用课程（用于下拉选择）"""
     scope = CampusScopedQuery()
@@ -71,6 +77,7 @@ async def get_course(
     course_id: int,
     service: CourseService = Depends(get_service),
     current_user: CourseRead = None,  # 权限：course:read
+    __: None = Depends(course_etag),
 ):
     """获取课程详情"""
     scope = CampusScopedQuery()
@@ -3,16 +3,18 @@ Dashboard API endpoints - statistics and overview data.
 包含管理员统计数据和学生个人仪表盘。
 """
 from typing import Optional, List
-from datetime import datetime, timedelta, date
-from decimal import Decimal
+from datetime import datetime, timedelta, date, timezone
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select, cast, Date, and_, Integer
+from sqlalchemy import func, select, cast, case, true, Date, Float, and_, Integer
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import CurrentUser, DBSession, CampusScopedQuery
+from app.api.deps import Auth, AuthContext, CurrentUser, DBSession, CampusScopedQuery
+from app.core.campus_directory import get_campus_names
 from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.timeseries import fetch_series, shift_months
+from app.database import get_dialect_name
 from app.models.student import Student
 from app.models.teacher import Teacher
 from app.models.class_plan import ClassPlan
@@ -20,27 +22,18 @@ from app.models.enrollment import Enrollment
 from app.models.course import Course
 from app.models.schedule import Schedule
 from app.models.student_attendance import StudentAttendance
-from app.models.lesson_record import LessonRecord
 from app.schemas.common import success_response
+from app.services.dashboard_service import DashboardService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+from app.services.student_dashboard_service import StudentDashboardService
 from app.schemas.dashboard import (
     KpiCard,
     DistributionItem,
-    TrendDataPoint as DashboardTrendDataPoint,
-    StudentDashboardOverview,
-    StudentDashboardCourses,
-    StudentDashboardRecords,
-    StudentScheduleItem,
-    StudentEnrollmentItem,
-    StudentAttendanceRecord,
-    StudentLessonRecord,
-    TeacherDashboardOverview,
     TeacherDashboardClasses,
     TeacherDashboardIncome,
-    TeacherScheduleItem,
     TeacherClassItem,
     TeacherStudentAttendance,
 )
-from app.models.campus import Campus
 
 router = APIRouter(prefix="/dashboard", tags=["仪表盘"])
 
@@ -205,18 +198,15 @@ async def get_chart_data(
 
 # ========== 学生仪表盘端点 ==========
 
-async def _get_student_for_user(db: DBSession, user_id: int) -> Student:
+async def _get_student_id(db: DBSession, auth: AuthContext) -> int:
     """
-    根据用户ID获取关联的学生记录。
-    学生通过 Student.user_id 关联到用户账号。
+    获取当前用户关联的学生ID。
+    学生通过 Student.user_id 关联到用户账号，结果在请求级鉴权上下文中缓存。
     """
-    result = await db.execute(
-        select(Student).where(Student.user_id == user_id)
-    )
-    student = result.scalar_one_or_none()
-    if not student:
+    student_id = await auth.get_student_id(db)
+    if student_id is None:
         raise NotFoundException("未找到关联的学生记录")
-    return student
+    return student_id
 
 
 def _require_student_role(current_user, scope: CampusScopedQuery):
@@ -233,6 +223,7 @@ def _require_student_role(current_user, scope: CampusScopedQuery):
 async def get_student_dashboard_overview(
     current_user: CurrentUser,
     db: DBSession,
+    auth: Auth,
 ):
     """
     获取学生仪表盘概览数据。
@@ -244,141 +235,16 @@ async def get_student_dashboard_overview(
     _require_student_role(current_user, scope)
 
     # 获取学生记录
-    student = await _get_student_for_user(db, current_user.id)
+    student_id = await _get_student_id(db, auth)
 
-    today = date.today()
-    next_week = today + timedelta(days=7)
-
-    # 1. 查询学生的活跃报名
-    enrollment_result = await db.execute(
-        select(Enrollment)
-        .options(
-            selectinload(Enrollment.class_plan).selectinload(ClassPlan.course),
-            selectinload(Enrollment.class_plan).selectinload(ClassPlan.teacher),
-        )
-        .where(
-            and_(
-                Enrollment.student_id == student.id,
-                Enrollment.status == "active",
-            )
-        )
-    )
-    enrollments = enrollment_result.scalars().all()
-    enrollment_ids = [e.id for e in enrollments]
-    class_plan_ids = [e.class_plan_id for e in enrollments]
-
-    # 2. 计算总剩余课时
-    total_remaining = sum(
-        (e.purchased_hours - e.used_hours) for e in enrollments
-    )
-
-    # 3. 查询近期排课（未来7天）
-    upcoming_schedules = []
-    if class_plan_ids:
-        schedule_result = await db.execute(
-            select(Schedule)
-            .options(
-                selectinload(Schedule.class_plan).selectinload(ClassPlan.course),
-                selectinload(Schedule.class_plan).selectinload(ClassPlan.teacher),
-                selectinload(Schedule.teacher),
-                selectinload(Schedule.classroom),
-            )
-            .where(
-                and_(
-                    Schedule.class_plan_id.in_(class_plan_ids),
-                    Schedule.schedule_date >= today,
-                    Schedule.schedule_date <= next_week,
-                    Schedule.status != "cancelled",
-                )
-            )
-            .order_by(Schedule.schedule_date, Schedule.start_time)
-        )
-        schedules = schedule_result.scalars().all()
-
-        # 查询学生在这些排课的出勤状态
-        schedule_ids = [s.id for s in schedules]
-        attendance_map = {}
-        if schedule_ids and enrollment_ids:
-            attendance_result = await db.execute(
-                select(StudentAttendance)
-                .where(
-                    and_(
-                        StudentAttendance.schedule_id.in_(schedule_ids),
-                        StudentAttendance.enrollment_id.in_(enrollment_ids),
-                    )
-                )
-            )
-            for att in attendance_result.scalars().all():
-                attendance_map[att.schedule_id] = att.status
-
-        for schedule in schedules:
-            class_plan = schedule.class_plan
-            teacher = schedule.teacher or (class_plan.teacher if class_plan else None)
-            course = class_plan.course if class_plan else None
-
-            upcoming_schedules.append(StudentScheduleItem(
-                schedule_id=schedule.id,
-                schedule_date=schedule.schedule_date,
-                start_time=schedule.start_time,
-                end_time=schedule.end_time,
-                class_plan_id=schedule.class_plan_id,
-                class_plan_name=class_plan.name if class_plan else "",
-                course_name=course.name if course else "",
-                teacher_name=teacher.name if teacher else None,
-                classroom_name=schedule.classroom.name if schedule.classroom else None,
-                status=schedule.status,
-                attendance_status=attendance_map.get(schedule.id),
-            ))
-
-    # 4. 计算出勤率
-    attendance_rate = 0.0
-    if enrollment_ids:
-        # 获取所有出勤记录
-        attendance_stats_result = await db.execute(
-            select(
-                func.count(StudentAttendance.id).label("total"),
-                func.sum(
-                    func.cast(StudentAttendance.status == "normal", Integer)
-                ).label("normal_count"),
-            )
-            .where(StudentAttendance.enrollment_id.in_(enrollment_ids))
-        )
-        stats = attendance_stats_result.first()
-        if stats and stats.total > 0:
-            attendance_rate = round((stats.normal_count or 0) / stats.total * 100, 1)
-
-    # 构建响应
-    response = StudentDashboardOverview(
-        total_remaining_hours=KpiCard(
-            label="剩余课时",
-            value=float(total_remaining),
-            unit="课时",
-        ),
-        upcoming_class_count=KpiCard(
-            label="近7天课程",
-            value=len(upcoming_schedules),
-            unit="节",
-        ),
-        attendance_rate=KpiCard(
-            label="出勤率",
-            value=attendance_rate,
-            unit="%",
-        ),
-        active_enrollment_count=KpiCard(
-            label="在读班级",
-            value=len(enrollments),
-            unit="个",
-        ),
-        upcoming_schedules=upcoming_schedules,
-    )
-
-    return success_response(response.model_dump())
+    return success_response(await StudentDashboardService(db).build_overview(student_id))
 
 
 @router.get("/student/courses", summary="学生我的课程")
 async def get_student_courses(
     current_user: CurrentUser,
     db: DBSession,
+    auth: Auth,
 ):
     """
     获取学生报名的班级列表。
@@ -388,180 +254,52 @@ async def get_student_courses(
     _require_student_role(current_user, scope)
 
     # 获取学生记录
-    student = await _get_student_for_user(db, current_user.id)
-
-    # 查询学生的所有报名
-    enrollment_result = await db.execute(
-        select(Enrollment)
-        .options(
-            selectinload(Enrollment.class_plan).selectinload(ClassPlan.course),
-            selectinload(Enrollment.class_plan).selectinload(ClassPlan.teacher),
-        )
-        .where(Enrollment.student_id == student.id)
-        .order_by(Enrollment.created_time.desc())
-    )
-    enrollments = enrollment_result.scalars().all()
-
-    enrollment_items = []
-    for e in enrollments:
-        class_plan = e.class_plan
-        course = class_plan.course if class_plan else None
-        teacher = class_plan.teacher if class_plan else None
-
-        total = float(e.purchased_hours)
-        used = float(e.used_hours)
-        remaining = total - used
-        progress = round((used / total * 100) if total > 0 else 0, 1)
-
-        enrollment_items.append(StudentEnrollmentItem(
-            enrollment_id=e.id,
-            class_plan_id=e.class_plan_id,
-            class_plan_name=class_plan.name if class_plan else "",
-            course_name=course.name if course else "",
-            teacher_name=teacher.name if teacher else None,
-            total_hours=e.purchased_hours,
-            remaining_hours=Decimal(str(remaining)),
-            consumed_hours=e.used_hours,
-            progress_percent=progress,
-            status=e.status,
-            enroll_date=e.enroll_date or date.today(),
-        ))
-
-    response = StudentDashboardCourses(
-        enrollments=enrollment_items,
-        hours_by_course=[],  # 可以后续扩展
-        progress_trend=[],   # 可以后续扩展
-    )
+    student_id = await _get_student_id(db, auth)
 
-    return success_response(response.model_dump())
+    return success_response(await StudentDashboardService(db).build_courses(student_id))
 
 
 @router.get("/student/records", summary="学生学习记录")
 async def get_student_records(
     current_user: CurrentUser,
     db: DBSession,
+    auth: Auth,
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
 ):
     """
     获取学生的出勤和课时消耗记录。
-    支持按时间范围过滤。
+    - 出勤与课消合并为按日期倒序的时间线，游标分页
+    - 出勤统计为全部记录的汇总，不受分页影响
+    - 支持按时间范围过滤
     """
     scope = CampusScopedQuery()
     _require_student_role(current_user, scope)
 
     # 获取学生记录
-    student = await _get_student_for_user(db, current_user.id)
-
-    # 获取学生的所有报名ID
-    enrollment_result = await db.execute(
-        select(Enrollment.id, Enrollment.class_plan_id)
-        .where(Enrollment.student_id == student.id)
-    )
-    enrollment_rows = enrollment_result.all()
-    enrollment_ids = [r.id for r in enrollment_rows]
-    enrollment_class_plan_map = {r.id: r.class_plan_id for r in enrollment_rows}
-
-    if not enrollment_ids:
-        # 没有报名记录，返回空数据
-        return success_response(StudentDashboardRecords(
-            attendance_summary={"total": 0, "normal": 0, "leave": 0, "absent": 0},
-            recent_attendance=[],
-            lesson_records=[],
-            consumption_trend=[],
-        ).model_dump())
+    student_id = await _get_student_id(db, auth)
 
-    # 1. 查询出勤记录
-    attendance_query = (
-        select(StudentAttendance)
-        .options(
-            selectinload(StudentAttendance.schedule),
-            selectinload(StudentAttendance.enrollment).selectinload(Enrollment.class_plan),
+    return success_response(
+        await StudentDashboardService(db).build_records(
+            student_id, start_date, end_date, cursor=cursor, page_size=page_size
         )
-        .where(StudentAttendance.enrollment_id.in_(enrollment_ids))
     )
 
-    attendance_result = await db.execute(attendance_query)
-    attendances = attendance_result.scalars().all()
-
-    # 出勤统计
-    attendance_summary = {"total": 0, "normal": 0, "leave": 0, "absent": 0}
-    recent_attendance = []
-
-    for att in attendances:
-        attendance_summary["total"] += 1
-        if att.status == "normal":
-            attendance_summary["normal"] += 1
-        elif att.status == "leave":
-            attendance_summary["leave"] += 1
-        elif att.status == "absent":
-            attendance_summary["absent"] += 1
-
-        schedule = att.schedule
-        class_plan = att.enrollment.class_plan if att.enrollment else None
-
-        recent_attendance.append(StudentAttendanceRecord(
-            attendance_id=att.id,
-            schedule_id=att.schedule_id,
-            schedule_date=schedule.schedule_date if schedule else date.today(),
-            class_plan_name=class_plan.name if class_plan else "",
-            status=att.status,
-            leave_reason=att.leave_reason,
-            deduct_hours=att.deduct_hours,
-        ))
-
-    # 按日期排序
-    recent_attendance.sort(key=lambda x: x.schedule_date, reverse=True)
-
-    # 2. 查询课时消耗记录
-    lesson_query = (
-        select(LessonRecord)
-        .options(
-            selectinload(LessonRecord.enrollment).selectinload(Enrollment.class_plan).selectinload(ClassPlan.course),
-            selectinload(LessonRecord.enrollment).selectinload(Enrollment.class_plan).selectinload(ClassPlan.teacher),
-        )
-        .where(LessonRecord.enrollment_id.in_(enrollment_ids))
-    )
-
-    # 应用时间过滤
-    if start_date:
-        lesson_query = lesson_query.where(LessonRecord.record_date >= start_date)
-    if end_date:
-        lesson_query = lesson_query.where(LessonRecord.record_date <= end_date)
-
-    lesson_query = lesson_query.order_by(LessonRecord.record_date.desc())
-
-    lesson_result = await db.execute(lesson_query)
-    lessons = lesson_result.scalars().all()
-
-    lesson_records = []
-    for lr in lessons:
-        class_plan = lr.enrollment.class_plan if lr.enrollment else None
-        course = class_plan.course if class_plan else None
-        teacher = class_plan.teacher if class_plan else None
-
-        lesson_records.append(StudentLessonRecord(
-            record_id=lr.id,
-            record_date=lr.record_date,
-            hours=lr.hours,
-            class_plan_name=class_plan.name if class_plan else "",
-            course_name=course.name if course else "",
-            teacher_name=teacher.name if teacher else None,
-            type=lr.type,
-            notes=lr.notes,
-        ))
-
-    response = StudentDashboardRecords(
-        attendance_summary=attendance_summary,
-        recent_attendance=recent_attendance,
-        lesson_records=lesson_records,
-        consumption_trend=[],  # 可以后续扩展
-    )
 
-    return success_response(response.model_dump())
+# ========== 教师仪表盘端点 ==========
 
+async def _get_teacher_id(db: DBSession, auth: AuthContext) -> int:
+    """
+    获取当前用户关联的教师ID。
+    教师通过 Teacher.user_id 关联到用户账号，结果在请求级鉴权上下文中缓存。
+    """
+    teacher_id = await auth.get_teacher_id(db)
+    if teacher_id is None:
+        raise NotFoundException("未找到关联的教师记录")
+    return teacher_id
 
-# ========== 教师仪表盘端点 ==========
 
 async def _get_teacher_for_user(db: DBSession, user_id: int) -> Teacher:
     """
@@ -591,6 +329,8 @@ def _require_teacher_role(current_user, scope: CampusScopedQuery):
 async def get_teacher_dashboard_overview(
     current_user: CurrentUser,
     db: DBSession,
+    auth: Auth,
+    fresh: bool = Query(False, description="是否跳过快照重新计算"),
 ):
     """
     获取教师仪表盘概览数据。
@@ -598,168 +338,17 @@ async def get_teacher_dashboard_overview(
     - KPI卡片：今日课程数、本周课程数、本月课时数、在教班级数
     - 今日排课列表
     - 近期排课列表（未来7天）
+
+    数据来自后台定时刷新的快照，as_of 为快照计算时间；fresh=true 时重新计算。
     """
     scope = CampusScopedQuery()
     _require_teacher_role(current_user, scope)
 
-    # 获取教师记录
-    teacher = await _get_teacher_for_user(db, current_user.id)
-
-    today = date.today()
-    next_week = today + timedelta(days=7)
-    month_start = today.replace(day=1)
-    week_start = today - timedelta(days=today.weekday())
-
-    # 1. 查询教师的活跃班级
-    class_plan_result = await db.execute(
-        select(ClassPlan)
-        .where(
-            and_(
-                ClassPlan.teacher_id == teacher.id,
-                ClassPlan.is_active == True,
-                ClassPlan.status.in_(["ongoing", "not_started"]),
-            )
-        )
-    )
-    active_class_plans = class_plan_result.scalars().all()
-
-    # 2. 查询今日排课
-    today_schedule_result = await db.execute(
-        select(Schedule)
-        .options(
-            selectinload(Schedule.class_plan).selectinload(ClassPlan.course),
-            selectinload(Schedule.classroom),
-        )
-        .where(
-            and_(
-                Schedule.teacher_id == teacher.id,
-                Schedule.schedule_date == today,
-                Schedule.status != "cancelled",
-            )
-        )
-        .order_by(Schedule.start_time)
-    )
-    today_schedules_raw = today_schedule_result.scalars().all()
-
-    # 3. 查询本周课程数
-    week_schedule_count = (await db.execute(
-        select(func.count())
-        .select_from(Schedule)
-        .where(
-            and_(
-                Schedule.teacher_id == teacher.id,
-                Schedule.schedule_date >= week_start,
-                Schedule.schedule_date <= week_start + timedelta(days=6),
-                Schedule.status != "cancelled",
-            )
-        )
-    )).scalar() or 0
-
-    # 4. 查询本月已完成课时数
-    month_hours_result = await db.execute(
-        select(func.sum(Schedule.lesson_hours))
-        .where(
-            and_(
-                Schedule.teacher_id == teacher.id,
-                Schedule.schedule_date >= month_start,
-                Schedule.schedule_date <= today,
-                Schedule.status == "completed",
-            )
-        )
-    )
-    month_lesson_hours = float(month_hours_result.scalar() or 0)
-
-    # 5. 查询近期排课（未来7天，包括今日）
-    upcoming_result = await db.execute(
-        select(Schedule)
-        .options(
-            selectinload(Schedule.class_plan).selectinload(ClassPlan.course),
-            selectinload(Schedule.classroom),
-        )
-        .where(
-            and_(
-                Schedule.teacher_id == teacher.id,
-                Schedule.schedule_date >= today,
-                Schedule.schedule_date <= next_week,
-                Schedule.status != "cancelled",
-            )
-        )
-        .order_by(Schedule.schedule_date, Schedule.start_time)
-    )
-    upcoming_schedules_raw = upcoming_result.scalars().all()
-
-    # 6. 获取每个排课的学生人数
-    schedule_ids = [s.id for s in upcoming_schedules_raw]
-    student_counts = {}
-    if schedule_ids:
-        # 通过 class_plan 获取报名人数
-        class_plan_ids = list(set(s.class_plan_id for s in upcoming_schedules_raw))
-        enrollment_counts = await db.execute(
-            select(
-                Enrollment.class_plan_id,
-                func.count(Enrollment.id).label("count")
-            )
-            .where(
-                and_(
-                    Enrollment.class_plan_id.in_(class_plan_ids),
-                    Enrollment.status == "active",
-                )
-            )
-            .group_by(Enrollment.class_plan_id)
-        )
-        class_plan_student_counts = {row.class_plan_id: row.count for row in enrollment_counts}
-        for s in upcoming_schedules_raw:
-            student_counts[s.id] = class_plan_student_counts.get(s.class_plan_id, 0)
-
-    # 构建排课列表
-    def _build_teacher_schedule_item(schedule: Schedule) -> TeacherScheduleItem:
-        class_plan = schedule.class_plan
-        course = class_plan.course if class_plan else None
-        return TeacherScheduleItem(
-            schedule_id=schedule.id,
-            schedule_date=schedule.schedule_date,
-            start_time=schedule.start_time,
-            end_time=schedule.end_time,
-            lesson_hours=float(schedule.lesson_hours or 0),
-            class_plan_id=schedule.class_plan_id,
-            class_plan_name=class_plan.name if class_plan else "",
-            course_name=course.name if course else "",
-            classroom_name=schedule.classroom.name if schedule.classroom else None,
-            campus_name=None,  # 可以后续加载
-            student_count=student_counts.get(schedule.id, 0),
-            status=schedule.status,
-        )
-
-    today_schedules = [_build_teacher_schedule_item(s) for s in today_schedules_raw]
-    upcoming_schedules = [_build_teacher_schedule_item(s) for s in upcoming_schedules_raw]
-
-    # 构建响应
-    response = TeacherDashboardOverview(
-        today_class_count=KpiCard(
-            label="今日课程",
-            value=len(today_schedules),
-            unit="节",
-        ),
-        week_class_count=KpiCard(
-            label="本周课程",
-            value=week_schedule_count,
-            unit="节",
-        ),
-        month_lesson_hours=KpiCard(
-            label="本月课时",
-            value=month_lesson_hours,
-            unit="课时",
-        ),
-        active_class_count=KpiCard(
-            label="在教班级",
-            value=len(active_class_plans),
-            unit="个",
-        ),
-        upcoming_schedules=upcoming_schedules,
-        today_schedules=today_schedules,
-    )
+    # 获取教师ID
+    teacher_id = await _get_teacher_id(db, auth)
 
-    return success_response(response.model_dump())
+    snapshot = await DashboardSnapshotService(db).get_teacher_overview(teacher_id, fresh=fresh)
+    return success_response(snapshot)
 
 
 @router.get("/teacher/classes", summary="教师教学情况")
@@ -783,10 +372,7 @@ async def get_teacher_classes(
     # 1. 查询教师的所有班级
     class_plan_result = await db.execute(
         select(ClassPlan)
-        .options(
-            selectinload(ClassPlan.course),
-            selectinload(ClassPlan.campus),
-        )
+        .options(selectinload(ClassPlan.course))
         .where(
             and_(
                 ClassPlan.teacher_id == teacher.id,
@@ -841,7 +427,8 @@ async def get_teacher_classes(
         for row in schedule_stats_result
     }
 
-    # 构建班级列表
+    # 构建班级列表（校区名称来自校区目录缓存）
+    campus_names = await get_campus_names(db)
     class_items = []
     students_by_class = []
     for cp in class_plans:
@@ -852,7 +439,7 @@ async def get_teacher_classes(
             class_plan_id=cp.id,
             class_plan_name=cp.name,
             course_name=cp.course.name if cp.course else "",
-            campus_name=cp.campus.name if cp.campus else None,
+            campus_name=campus_names.get(cp.campus_id),
             student_count=student_count,
             total_schedules=total_schedules,
             completed_schedules=completed_schedules,
@@ -931,6 +518,7 @@ async def get_teacher_income(
     db: DBSession,
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
+    series_format: str = Query("points", pattern="^(points|columnar)$", description="趋势数据格式：points/columnar"),
 ):
     """
     获取教师的课时收入统计。
@@ -991,55 +579,22 @@ async def get_teacher_income(
         for row in hours_by_class_result
     ]
 
-    # 3. 计算趋势数据（最近6个月）
-    income_trend = []
-    hours_trend = []
-
-    # 获取最近6个月的数据
-    for i in range(5, -1, -1):
-        # 计算月份
-        month_offset = today.month - i
-        year_offset = today.year
-        while month_offset <= 0:
-            month_offset += 12
-            year_offset -= 1
-        while month_offset > 12:
-            month_offset -= 12
-            year_offset += 1
-
-        m_start = date(year_offset, month_offset, 1)
-        # 计算月末
-        if month_offset == 12:
-            m_end = date(year_offset + 1, 1, 1) - timedelta(days=1)
-        else:
-            m_end = date(year_offset, month_offset + 1, 1) - timedelta(days=1)
-
-        # 查询这个月的课时
-        m_hours_result = await db.execute(
-            select(func.sum(Schedule.lesson_hours))
-            .where(
-                and_(
-                    Schedule.teacher_id == teacher.id,
-                    Schedule.schedule_date >= m_start,
-                    Schedule.schedule_date <= m_end,
-                    Schedule.status == "completed",
-                )
-            )
-        )
-        m_hours = float(m_hours_result.scalar() or 0)
-        m_income = m_hours * hourly_rate
-
-        date_label = m_start.strftime("%Y-%m")
-        income_trend.append(DashboardTrendDataPoint(
-            date=date_label,
-            value=m_income,
-            label=f"{m_start.month}月",
-        ))
-        hours_trend.append(DashboardTrendDataPoint(
-            date=date_label,
-            value=m_hours,
-            label=f"{m_start.month}月",
-        ))
+    # 3. 计算趋势数据（最近6个月，按月一次性分桶查询）
+    trend_start = shift_months(today, -5)
+    hours_series = await fetch_series(
+        db,
+        Schedule.schedule_date,
+        func.sum(Schedule.lesson_hours),
+        trend_start,
+        today,
+        granularity="month",
+        conditions=[
+            Schedule.teacher_id == teacher.id,
+            Schedule.status == "completed",
+        ],
+    )
+    income_trend = hours_series.scaled(hourly_rate).render(series_format)
+    hours_trend = hours_series.render(series_format)
 
     response = TeacherDashboardIncome(
         month_income=KpiCard(
@@ -1081,6 +636,18 @@ def _require_admin_role(current_user, scope: CampusScopedQuery = None):
         raise ForbiddenException("此接口仅供管理员访问")
 
 
+def _campus_teacher_ids(campus_id: int):
+    """
+    在指定校区有排课的教师ID子查询。
+    教师没有 campus_id，校区维度的教师统计通过 Schedule.campus_id 关联。
+    """
+    return (
+        select(Schedule.teacher_id)
+        .where(Schedule.campus_id == campus_id)
+        .distinct()
+    )
+
+
 class AdminDashboardResponse(BaseModel):
     """管理员仪表盘响应（灵活格式）"""
     kpi_cards: List[dict]
@@ -1096,6 +663,9 @@ async def get_admin_dashboard_overview(
     campus_id: Optional[int] = Query(None, description="校区ID（超管可选）"),
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
+    granularity: Optional[str] = Query(None, pattern="^(day|week|month)$", description="趋势粒度（为空时按时间范围自动选择）"),
+    series_format: str = Query("points", pattern="^(points|columnar)$", description="趋势数据格式：points/columnar"),
+    fresh: bool = Query(False, description="是否跳过快照重新计算"),
 ):
     """
     获取管理员仪表盘概览数据。
@@ -1105,6 +675,9 @@ async def get_admin_dashboard_overview(
     - 收入趋势（近7天）
     - 校区对比（仅超管不选校区时返回）
 
+    默认时间范围的数据来自后台定时刷新的快照，as_of 为快照计算时间；
+    fresh=true 或指定了时间范围/粒度/格式时实时计算。
+
     权限：
     - 超管可以选择校区或查看全部
     - 校区管理员只能看自己校区
@@ -1133,226 +706,23 @@ async def get_admin_dashboard_overview(
         # 校区管理员只能看自己校区
         filter_campus_id = token_campus_id
 
-    today = date.today()
-    week_ago = today - timedelta(days=7)
-    month_start = today.replace(day=1)
-
-    # 如果有时间过滤，使用过滤时间
-    query_start = start_date if start_date else week_ago
-    query_end = end_date if end_date else today
-
-    # 1. 查询学生总数
-    student_query = select(func.count()).select_from(Student).where(Student.status == "active")
-    if filter_campus_id:
-        student_query = student_query.where(Student.campus_id == filter_campus_id)
-    total_students = (await db.execute(student_query)).scalar() or 0
-
-    # 2. 查询教师总数（教师无校区限制，但可以统计有排课的教师）
-    teacher_query = select(func.count()).select_from(Teacher).where(Teacher.is_active == True)
-    total_teachers = (await db.execute(teacher_query)).scalar() or 0
-
-    # 3. 查询进行中班级数
-    class_plan_query = (
-        select(func.count())
-        .select_from(ClassPlan)
-        .where(
-            and_(
-                ClassPlan.is_active == True,
-                ClassPlan.status == "ongoing",
-            )
-        )
-    )
-    if filter_campus_id:
-        class_plan_query = class_plan_query.where(ClassPlan.campus_id == filter_campus_id)
-    active_classes = (await db.execute(class_plan_query)).scalar() or 0
-
-    # 4. 查询本月收入（报名的paid_amount）
-    revenue_query = (
-        select(func.sum(Enrollment.paid_amount))
-        .where(
-            and_(
-                Enrollment.created_time >= datetime.combine(month_start, datetime.min.time()),
-                Enrollment.status == "active",
-            )
-        )
-    )
-    if filter_campus_id:
-        revenue_query = revenue_query.where(Enrollment.campus_id == filter_campus_id)
-    month_revenue = float((await db.execute(revenue_query)).scalar() or 0)
-
-    # 5. 构建KPI卡片
-    kpi_cards = [
-        KpiCard(
-            label="学生总数",
-            value=total_students,
-            unit="人",
-        ).model_dump(),
-        KpiCard(
-            label="教师总数",
-            value=total_teachers,
-            unit="人",
-        ).model_dump(),
-        KpiCard(
-            label="进行中班级",
-            value=active_classes,
-            unit="个",
-        ).model_dump(),
-        KpiCard(
-            label="本月收入",
-            value=month_revenue,
-            unit="元",
-            is_time_filtered=bool(start_date or end_date),
-        ).model_dump(),
-    ]
-
-    # 6. 查询报名趋势（近7天）
-    # 使用 func.date() 以兼容 SQLite
-    enrollment_trend_query = (
-        select(
-            func.date(Enrollment.created_time).label("enroll_date"),
-            func.count(Enrollment.id).label("count"),
+    # 默认查询直接返回快照，自定义时间范围/粒度/格式时实时计算
+    if start_date is None and end_date is None and granularity is None and series_format == "points":
+        response_data = await DashboardSnapshotService(db).get_admin_overview(
+            filter_campus_id,
+            show_campus_comparison=show_campus_comparison,
+            fresh=fresh,
         )
-        .where(
-            and_(
-                Enrollment.created_time >= datetime.combine(query_start, datetime.min.time()),
-                Enrollment.created_time <= datetime.combine(query_end, datetime.max.time()),
-            )
-        )
-        .group_by(func.date(Enrollment.created_time))
-        .order_by(func.date(Enrollment.created_time))
-    )
-    if filter_campus_id:
-        enrollment_trend_query = enrollment_trend_query.where(Enrollment.campus_id == filter_campus_id)
-
-    enrollment_trend_result = await db.execute(enrollment_trend_query)
-    # enroll_date 可能是字符串或 date 对象，需要统一处理
-    enrollment_data = {}
-    for row in enrollment_trend_result:
-        d = row.enroll_date
-        if isinstance(d, str):
-            d = date.fromisoformat(d)
-        enrollment_data[d] = row.count
-
-    # 补齐所有日期
-    enrollment_trend = []
-    current = query_start
-    while current <= query_end:
-        date_str = current.strftime("%Y-%m-%d")
-        count = enrollment_data.get(current, 0)
-        enrollment_trend.append(DashboardTrendDataPoint(
-            date=date_str,
-            value=float(count),
-            label=current.strftime("%m-%d"),
-        ).model_dump())
-        current += timedelta(days=1)
-
-    # 7. 查询收入趋势（近7天）
-    # 使用 func.date() 以兼容 SQLite
-    revenue_trend_query = (
-        select(
-            func.date(Enrollment.created_time).label("enroll_date"),
-            func.sum(Enrollment.paid_amount).label("amount"),
-        )
-        .where(
-            and_(
-                Enrollment.created_time >= datetime.combine(query_start, datetime.min.time()),
-                Enrollment.created_time <= datetime.combine(query_end, datetime.max.time()),
-                Enrollment.status == "active",
-            )
-        )
-        .group_by(func.date(Enrollment.created_time))
-        .order_by(func.date(Enrollment.created_time))
-    )
-    if filter_campus_id:
-        revenue_trend_query = revenue_trend_query.where(Enrollment.campus_id == filter_campus_id)
-
-    revenue_trend_result = await db.execute(revenue_trend_query)
-    # enroll_date 可能是字符串或 date 对象，需要统一处理
-    revenue_data = {}
-    for row in revenue_trend_result:
-        d = row.enroll_date
-        if isinstance(d, str):
-            d = date.fromisoformat(d)
-        revenue_data[d] = float(row.amount or 0)
-
-    # 补齐所有日期
-    revenue_trend = []
-    current = query_start
-    while current <= query_end:
-        date_str = current.strftime("%Y-%m-%d")
-        amount = revenue_data.get(current, 0)
-        revenue_trend.append(DashboardTrendDataPoint(
-            date=date_str,
-            value=amount,
-            label=current.strftime("%m-%d"),
-        ).model_dump())
-        current += timedelta(days=1)
-
-    # 8. 校区对比（仅超管不选校区时）
-    campus_comparison = None
-    if show_campus_comparison:
-        # 获取所有校区
-        campuses_result = await db.execute(
-            select(Campus).where(Campus.is_active == True)
+    else:
+        response_data = await DashboardService(db).build_admin_overview(
+            filter_campus_id,
+            show_campus_comparison=show_campus_comparison,
+            start_date=start_date,
+            end_date=end_date,
+            granularity=granularity,
+            series_format=series_format,
         )
-        campuses = campuses_result.scalars().all()
-
-        campus_comparison = []
-        for campus in campuses:
-            # 查询每个校区的学生数
-            c_students = (await db.execute(
-                select(func.count())
-                .select_from(Student)
-                .where(
-                    and_(
-                        Student.campus_id == campus.id,
-                        Student.status == "active",
-                    )
-                )
-            )).scalar() or 0
-
-            # 查询每个校区的班级数
-            c_classes = (await db.execute(
-                select(func.count())
-                .select_from(ClassPlan)
-                .where(
-                    and_(
-                        ClassPlan.campus_id == campus.id,
-                        ClassPlan.is_active == True,
-                        ClassPlan.status == "ongoing",
-                    )
-                )
-            )).scalar() or 0
-
-            # 查询每个校区的本月收入
-            c_revenue = float((await db.execute(
-                select(func.sum(Enrollment.paid_amount))
-                .where(
-                    and_(
-                        Enrollment.campus_id == campus.id,
-                        Enrollment.created_time >= datetime.combine(month_start, datetime.min.time()),
-                        Enrollment.status == "active",
-                    )
-                )
-            )).scalar() or 0)
-
-            campus_comparison.append({
-                "campus_id": campus.id,
-                "campus_name": campus.name,
-                "students": c_students,
-                "active_classes": c_classes,
-                "month_revenue": c_revenue,
-            })
-
-    # 构建响应
-    response_data = {
-        "kpi_cards": kpi_cards,
-        "enrollment_trend": enrollment_trend,
-        "revenue_trend": revenue_trend,
-    }
-
-    if campus_comparison is not None:
-        response_data["campus_comparison"] = campus_comparison
+        response_data["as_of"] = datetime.now(timezone.utc)
 
     return success_response(response_data)
 
@@ -1364,6 +734,8 @@ async def get_admin_students(
     campus_id: Optional[int] = Query(None, description="校区ID（超管可选）"),
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
+    granularity: Optional[str] = Query(None, pattern="^(day|week|month)$", description="趋势粒度（为空时按时间范围自动选择）"),
+    series_format: str = Query("points", pattern="^(points|columnar)$", description="趋势数据格式：points/columnar"),
 ):
     """
     管理员仪表盘 - 学生分析 Tab。
@@ -1541,44 +913,16 @@ async def get_admin_students(
         for row in grade_result
     ]
 
-    # ========== 5. 新增学生趋势（按日期统计 created_time）==========
-    trend_query = (
-        select(
-            func.date(Student.created_time).label("create_date"),
-            func.count(Student.id).label("count"),
-        )
-        .where(
-            and_(
-                Student.created_time >= datetime.combine(query_start, datetime.min.time()),
-                Student.created_time <= datetime.combine(query_end, datetime.max.time()),
-            )
-        )
-        .group_by(func.date(Student.created_time))
-        .order_by(func.date(Student.created_time))
-    )
-    trend_query = apply_campus_filter(trend_query)
-    trend_result = await db.execute(trend_query)
-
-    # 处理趋势数据，统一日期格式
-    trend_data = {}
-    for row in trend_result:
-        d = row.create_date
-        if isinstance(d, str):
-            d = date.fromisoformat(d)
-        trend_data[d] = row.count
-
-    # 补齐所有日期
-    new_student_trend = []
-    current = query_start
-    while current <= query_end:
-        date_str = current.strftime("%Y-%m-%d")
-        count = trend_data.get(current, 0)
-        new_student_trend.append(DashboardTrendDataPoint(
-            date=date_str,
-            value=float(count),
-            label=current.strftime("%m-%d"),
-        ).model_dump())
-        current += timedelta(days=1)
+    # ========== 5. 新增学生趋势（按 created_time 分桶统计）==========
+    new_student_trend = (await fetch_series(
+        db,
+        Student.created_time,
+        func.count(Student.id),
+        query_start,
+        query_end,
+        granularity=granularity,
+        conditions=[Student.campus_id == filter_campus_id] if filter_campus_id else [],
+    )).render(series_format)
 
     return success_response({
         "kpi_cards": kpi_cards,
@@ -1643,13 +987,8 @@ async def get_admin_teachers(
     total_teachers_query = select(func.count()).select_from(Teacher)
     if filter_campus_id:
         # 通过 Schedule 过滤在该校区有排课的教师
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
-        )
         total_teachers_query = total_teachers_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+            Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
         )
     total_teachers = (await db.execute(total_teachers_query)).scalar() or 0
 
@@ -1665,13 +1004,8 @@ async def get_admin_teachers(
         )
     )
     if filter_campus_id:
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
-        )
         active_teachers_query = active_teachers_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+            Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
         )
     active_teachers = (await db.execute(active_teachers_query)).scalar() or 0
 
@@ -1682,13 +1016,8 @@ async def get_admin_teachers(
         .where(Teacher.entry_date >= month_start)
     )
     if filter_campus_id:
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
-        )
         new_teachers_query = new_teachers_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+            Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
         )
     new_teachers = (await db.execute(new_teachers_query)).scalar() or 0
 
@@ -1705,13 +1034,8 @@ async def get_admin_teachers(
         )
     )
     if filter_campus_id:
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
-        )
         resigned_teachers_query = resigned_teachers_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+            Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
         )
     resigned_teachers = (await db.execute(resigned_teachers_query)).scalar() or 0
 
@@ -1749,13 +1073,8 @@ async def get_admin_teachers(
         .group_by(Teacher.status)
     )
     if filter_campus_id:
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
-        )
         status_dist_query = status_dist_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+            Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
         )
     status_result = await db.execute(status_dist_query)
 
@@ -1775,36 +1094,53 @@ async def get_admin_teachers(
     ]
 
     # ========== 3. 科目分布（统计教师的 subjects 数组字段）==========
-    # 教师的 subjects 是一个数组，需要展开统计
-    # 先查询所有教师的 subjects
-
-    teachers_query = select(Teacher.subjects)
-    if filter_campus_id:
-        teacher_ids_subquery = (
-            select(Schedule.teacher_id)
-            .where(Schedule.campus_id == filter_campus_id)
-            .distinct()
+    # 教师的 subjects 是一个数组，在数据库中展开后 GROUP BY 统计
+    # PostgreSQL 使用 unnest；测试环境的 SQLite 中该列为 JSON，使用 json_each
+    if get_dialect_name(db) == "postgresql":
+        subject_items = (
+            select(func.unnest(Teacher.subjects).label("subject"))
+            .select_from(Teacher)
         )
-        teachers_query = teachers_query.where(
-            Teacher.id.in_(teacher_ids_subquery)
+        if filter_campus_id:
+            subject_items = subject_items.where(
+                Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
+            )
+        subject_items = subject_items.subquery("subject_items")
+        subject_col = subject_items.c.subject
+        subject_dist_query = select(
+            subject_col.label("subject"),
+            func.count().label("count"),
+        ).select_from(subject_items)
+    else:
+        subject_items = func.json_each(Teacher.subjects).table_valued("value").alias("subject_items")
+        subject_col = subject_items.c.value
+        subject_dist_query = (
+            select(
+                subject_col.label("subject"),
+                func.count().label("count"),
+            )
+            .select_from(Teacher)
+            .join(subject_items, true())
         )
-    teachers_result = await db.execute(teachers_query)
+        if filter_campus_id:
+            subject_dist_query = subject_dist_query.where(
+                Teacher.id.in_(_campus_teacher_ids(filter_campus_id))
+            )
 
-    # 统计每个科目的教师数量
-    subject_counts: dict[str, int] = {}
-    for row in teachers_result:
-        subjects = row.subjects
-        if subjects:
-            for subject in subjects:
-                if subject:
-                    subject_counts[subject] = subject_counts.get(subject, 0) + 1
+    subject_dist_query = (
+        subject_dist_query
+        .where(and_(subject_col.isnot(None), subject_col != ""))
+        .group_by(subject_col)
+        .order_by(func.count().desc(), subject_col)
+    )
+    subject_result = await db.execute(subject_dist_query)
 
     subject_distribution = [
         DistributionItem(
-            name=subject,
-            value=float(count),
+            name=row.subject,
+            value=float(row.count),
         ).model_dump()
-        for subject, count in sorted(subject_counts.items(), key=lambda x: -x[1])
+        for row in subject_result
     ]
 
     # ========== 4. 工作量排名（按课时数排序的前10名教师）==========
@@ -2014,28 +1350,32 @@ async def get_admin_classes(
     # 计算每个班级的上座率 = current_students / max_students
     # 分组：低(<50%), 中(50-80%), 高(>80%)
 
-    classes_query = (
-        select(ClassPlan.current_students, ClassPlan.max_students)
+    # 在数据库中用 CASE 分桶后 GROUP BY，只返回每个分组的计数
+    occupancy_rate = ClassPlan.current_students * 100.0 / ClassPlan.max_students
+    occupancy_bucket = case(
+        (occupancy_rate < 50, "低(<50%)"),
+        (occupancy_rate < 80, "中(50-80%)"),
+        else_="高(>80%)",
+    ).label("bucket")
+    occupancy_query = (
+        select(
+            occupancy_bucket,
+            func.count().label("count"),
+        )
         .where(
             and_(
                 ClassPlan.is_active == True,
                 ClassPlan.max_students > 0,  # 避免除以零
             )
         )
+        .group_by(occupancy_bucket)
     )
-    classes_query = apply_campus_filter(classes_query)
-    classes_result = await db.execute(classes_query)
+    occupancy_query = apply_campus_filter(occupancy_query)
+    occupancy_result = await db.execute(occupancy_query)
 
     occupancy_counts = {"低(<50%)": 0, "中(50-80%)": 0, "高(>80%)": 0}
-    for row in classes_result:
-        if row.max_students > 0:
-            rate = row.current_students / row.max_students * 100
-            if rate < 50:
-                occupancy_counts["低(<50%)"] += 1
-            elif rate < 80:
-                occupancy_counts["中(50-80%)"] += 1
-            else:
-                occupancy_counts["高(>80%)"] += 1
+    for row in occupancy_result:
+        occupancy_counts[row.bucket] = row.count
 
     occupancy_distribution = [
         DistributionItem(name=name, value=float(count)).model_dump()
@@ -2070,14 +1410,17 @@ async def get_admin_classes(
     ]
 
     # ========== 5. 进度排名（按完成率排序的前10个班级）==========
-    # 计算进度 = completed_lessons / total_lessons
+    # 计算进度 = completed_lessons / total_lessons，在数据库中排序并取前10
+    progress = (
+        cast(ClassPlan.completed_lessons, Float) * 100
+        / cast(ClassPlan.total_lessons, Float)
+    ).label("progress")
     progress_query = (
         select(
             ClassPlan.id,
             ClassPlan.name,
-            ClassPlan.completed_lessons,
-            ClassPlan.total_lessons,
             ClassPlan.status,
+            progress,
         )
         .where(
             and_(
@@ -2085,33 +1428,19 @@ async def get_admin_classes(
                 ClassPlan.total_lessons > 0,  # 避免除以零
             )
         )
+        .order_by(progress.desc(), ClassPlan.id)
+        .limit(10)
     )
     progress_query = apply_campus_filter(progress_query)
     progress_result = await db.execute(progress_query)
 
-    # 计算进度并排序
-    progress_data = []
-    for row in progress_result:
-        total = float(row.total_lessons)
-        completed = float(row.completed_lessons) if row.completed_lessons else 0
-        progress_percent = round((completed / total * 100) if total > 0 else 0, 1)
-        progress_data.append({
-            "id": row.id,
-            "name": row.name,
-            "progress": progress_percent,
-            "status": row.status,
-        })
-
-    # 按进度降序排序，取前10
-    progress_data.sort(key=lambda x: x["progress"], reverse=True)
     progress_ranking = []
-    for rank, item in enumerate(progress_data[:10], 1):
-        status_label = status_labels.get(item["status"], item["status"])
+    for rank, row in enumerate(progress_result, 1):
         progress_ranking.append({
             "rank": rank,
-            "name": item["name"],
-            "value": item["progress"],
-            "extra": status_label,
+            "name": row.name,
+            "value": round(float(row.progress or 0), 1),
+            "extra": status_labels.get(row.status, row.status),
         })
 
     return success_response({
@@ -8,7 +8,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.deps import CurrentUser, AdminUser
+from app.api.deps import CurrentUser, AdminUser, ConditionalGet
+from app.core.versions import DICT_VERSION
 from app.services.dictionary_service import DictionaryService
 from app.schemas.dictionary import (
     DictTypeCreate, DictTypeUpdate, DictTypeResponse, DictTypeWithItemsResponse,
@@ -24,6 +25,9 @@ def get_service(db: AsyncSession = Depends(get_db)) -> DictionaryService:
     return DictionaryService(db)
 
 
+dict_etag = ConditionalGet(DICT_VERSION)
+
+
 # ============ DictType Endpoints ============
 
 @router.get("/types", summary="获取所有字典类型")
@@ -31,6 +35,7 @@ async def get_dict_types(
     include_inactive: bool = False,
     service: DictionaryService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(dict_etag),
 ):
     """Get all dictionary types."""
     items = await service.get_all_types(include_inactive)
@@ -42,6 +47,7 @@ async def get_dict_type(
     type_id: int,
     service: DictionaryService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(dict_etag),
 ):
     """Get dictionary type with items by ID."""
     return success_response(DictTypeWithItemsResponse.model_validate(await service.get_type_by_id(type_id)).model_dump())
@@ -52,6 +58,7 @@ async def get_dict_type_by_code(
     code: str,
     service: DictionaryService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(dict_etag),
 ):
     """Get dictionary type with items by code."""
     dict_type = await service.get_type_by_code(code)
@@ -101,6 +108,7 @@ async def get_dict_items(
     active_only: bool = True,
     service: DictionaryService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(dict_etag),
 ):
     """Get dictionary items by type code. This is the most commonly used endpoint."""
     items = await service.get_items_by_type_code(type_code, active_only)
@@ -12,9 +12,9 @@ from app.api.deps import (
     DBSession, CampusScopedQuery,
     EnrollmentRead, EnrollmentEdit, EnrollmentDelete,
 )
-from app.services.enrollment_service import EnrollmentService
+from app.services.enrollment_service import ENROLLMENT_FIELDS, EnrollmentService
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentUpdate, EnrollmentResponse
-from app.schemas.common import success_response, MessageResponse
+from app.schemas.common import BatchGetRequest, batch_get_response, success_response, MessageResponse
 
 router = APIRouter(prefix="/enrollments", tags=["报名管理"])
 
@@ -27,12 +27,15 @@ def get_service(db: AsyncSession = Depends(get_db)) -> EnrollmentService:
 async def get_enrollments(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     campus_id: Optional[int] = Query(None, description="校区ID"),
     student_id: Optional[int] = Query(None, description="学生ID"),
     class_plan_id: Optional[int] = Query(None, description="班级计划ID"),
     status: Optional[str] = Query(None, description="状态"),
     enroll_date_from: Optional[str] = Query(None, description="报名日期起始"),
     enroll_date_to: Optional[str] = Query(None, description="报名日期截止"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,student,used_hours）"),
     db: DBSession = None,
     service: EnrollmentService = Depends(get_service),
     current_user: EnrollmentRead = None,  # 权限：enrollment:read
@@ -42,7 +45,9 @@ async def get_enrollments(
     校区管理员只能看到自己校区的报名记录。
     教师只能看到自己负责班级的报名记录。
     响应中包含已排课时数(scheduled_hours)。
+    传入 fields 时只查询并返回这些字段。
     """
+    projected = ENROLLMENT_FIELDS.parse(fields)
     # 校区范围过滤
     scope = CampusScopedQuery()
     effective_campus_id = scope.get_campus_filter(current_user)
@@ -55,16 +60,17 @@ async def get_enrollments(
     if scope.is_teacher(current_user):
         teacher_id = await scope.get_teacher_id_for_user(db, current_user)
 
-    enrollments, total = await service.get_all(
+    enrollments, total, next_cursor = await service.get_all(
         page, page_size, student_id, class_plan_id, status,
         campus_id=campus_id,
         teacher_id=teacher_id,
         enroll_date_from=enroll_date_from,
-        enroll_date_to=enroll_date_to
+        enroll_date_to=enroll_date_to,
+        cursor=cursor,
+        include_total=include_total,
+        fields=projected,
     )
-    # 丰富响应，添加已排课时信息
-    items = await service._enrich_with_scheduled_hours(enrollments)
-    return success_response([EnrollmentResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
+    return success_response(enrollments, total=total, page=page, page_size=page_size, next_cursor=next_cursor)
 
 
 @router.get("/class-plan/{class_plan_id}/hours-summary", summary="获取班级计划课时统计")
@@ -84,6 +90,20 @@ async def get_class_plan_hours_summary(
     return success_response(summary)
 
 
+@router.post("/batch-get", summary="按ID批量获取报名")
+async def batch_get_enrollments(
+    data: BatchGetRequest,
+    service: EnrollmentService = Depends(get_service),
+    current_user: EnrollmentRead = None,  # 权限：enrollment:read
+):
+    """按ID列表一次获取多个报名（包含已排课时数），只返回当前校区范围内的报名"""
+    scope = CampusScopedQuery()
+    campus_id = scope.get_campus_filter(current_user)
+    enrollments = await service.get_by_ids(data.unique_ids, campus_id_filter=campus_id)
+    items, missing_ids = data.arrange([e.model_dump() for e in enrollments])
+    return batch_get_response(items, missing_ids)
+
+
 @router.get("/{enrollment_id}", summary="获取报名详情")
 async def get_enrollment(
     enrollment_id: int,
@@ -6,7 +6,6 @@ from typing import Optional
 from fastapi import APIRouter, Query
 
 from app.api.deps import CurrentUser, DBSession
-from app.schemas.lesson_record import LessonRecordResponse
 from app.schemas.common import success_response
 from app.services.lesson_record_service import LessonRecordService
 
@@ -20,11 +19,13 @@ async def get_records_by_enrollment(
     db: DBSession,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
 ):
     """获取某个报名记录的课时消耗历史"""
     service = LessonRecordService(db)
-    items, total = await service.get_by_enrollment(enrollment_id, page, page_size)
-    return success_response([LessonRecordResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
+    items, total, next_cursor = await service.get_by_enrollment(enrollment_id, page, page_size, cursor=cursor, include_total=include_total)
+    return success_response([item.to_dict() for item in items], total=total, page=page, page_size=page_size, next_cursor=next_cursor)
 
 
 @router.get("/by-student/{student_id}", summary="获取学生的课时消耗历史")
@@ -34,9 +35,11 @@ async def get_records_by_student(
     db: DBSession,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     class_plan_id: Optional[int] = Query(None, description="班级计划ID筛选"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
 ):
     """获取某个学生的所有课时消耗历史"""
     service = LessonRecordService(db)
-    items, total = await service.get_by_student(student_id, page, page_size, class_plan_id)
-    return success_response([LessonRecordResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
+    items, total, next_cursor = await service.get_by_student(student_id, page, page_size, class_plan_id, cursor=cursor, include_total=include_total)
+    return success_response([item.to_dict() for item in items], total=total, page=page, page_size=page_size, next_cursor=next_cursor)
@@ -6,7 +6,7 @@ from fastapi import APIRouter
 from app.api.v1 import (
     auth, user, dictionary, campus, course,
     student, teacher, class_plan, enrollment, dashboard, schedule, lesson_record, scheduler,
-    student_attendance, permission
+    student_attendance, permission, batch
 )
 
 # Create main API router
@@ -29,3 +29,4 @@ api_router.include_router(dashboard.router)
 api_router.include_router(scheduler.router)
 api_router.include_router(student_attendance.router)
 api_router.include_router(permission.router)  # RBAC权限管理
+api_router.include_router(batch.router)  # 批量只读请求
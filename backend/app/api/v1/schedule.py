@@ -3,7 +3,7 @@ Schedule management API endpoints with RBAC permission check and campus scope fi
 排课管理接口，支持校区数据隔离和批次号操作。
 """
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Query
 from sqlalchemy import select, func
@@ -14,15 +14,15 @@ from app.api.deps import (
 )
 from app.models.enrollment import Enrollment
 from app.models.student_attendance import StudentAttendance
-from app.schemas.common import success_response, MessageResponse
+from app.schemas.common import BatchGetRequest, batch_get_response, success_response, MessageResponse
 from app.schemas.schedule import (
     ScheduleCreate, ScheduleUpdate, ScheduleResponse,
-    ScheduleListResponse, CalendarEventResponse,
+    ScheduleListResponse,
     ScheduleBatchCreate, ScheduleBatchResponse, ScheduleBatchPreviewResponse, BatchConflictItem,
     ScheduleBatchUpdate, ScheduleBatchUpdateResponse, ScheduleBatchDeleteRequest,
     ConflictCheckRequest, ConflictCheckResponse,
 )
-from app.services.schedule_service import ScheduleService
+from app.services.schedule_service import SCHEDULE_FIELDS, CalendarRow, ScheduleService
 
 router = APIRouter(prefix="/schedules", tags=["排课管理"])
 
@@ -41,37 +41,37 @@ CALENDAR_COLORS = [
 
 
 def schedule_to_calendar_event(
-    schedule,
+    schedule: CalendarRow,
     color_index: int = 0,
     student_count: int = 0,
     leave_count: int = 0,
     absent_count: int = 0,
-) -> CalendarEventResponse:
-    """Convert Schedule model to TOAST UI Calendar event format."""
+) -> Dict[str, Any]:
+    """Convert a calendar row to TOAST UI Calendar event format（字段同 CalendarEventResponse）."""
     start_dt = datetime.combine(schedule.schedule_date, schedule.start_time)
     end_dt = datetime.combine(schedule.schedule_date, schedule.end_time)
     color = CALENDAR_COLORS[color_index % len(CALENDAR_COLORS)]
 
-    title = schedule.title or (schedule.class_plan.name if schedule.class_plan else "课程")
-    location = schedule.classroom.name if schedule.classroom else None
-    teacher_name = schedule.teacher.name if schedule.teacher else None
-
-    return CalendarEventResponse(
-        id=str(schedule.id),
-        calendarId=str(schedule.class_plan_id),
-        title=title,
-        category="time",
-        start=start_dt.isoformat(),
-        end=end_dt.isoformat(),
-        location=location,
-        attendees=[teacher_name] if teacher_name else None,
-        state=schedule.status,
-        backgroundColor=color,
-        borderColor=color,
-        raw={
+    title = schedule.title or schedule.class_plan_name or "课程"
+    location = schedule.classroom_name
+    teacher_name = schedule.teacher_name
+
+    return {
+        "id": str(schedule.id),
+        "calendarId": str(schedule.class_plan_id),
+        "title": title,
+        "category": "time",
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat(),
+        "location": location,
+        "attendees": [teacher_name] if teacher_name else None,
+        "state": schedule.status,
+        "backgroundColor": color,
+        "borderColor": color,
+        "raw": {
             "schedule_id": schedule.id,
             "class_plan_id": schedule.class_plan_id,
-            "class_plan_name": schedule.class_plan.name if schedule.class_plan else None,
+            "class_plan_name": schedule.class_plan_name,
             "teacher_id": schedule.teacher_id,
             "teacher_name": teacher_name,
             "classroom_id": schedule.classroom_id,
@@ -83,8 +83,8 @@ def schedule_to_calendar_event(
             "leave_count": leave_count,
             "absent_count": absent_count,
             "batch_no": schedule.batch_no,  # 批次号，有这个说明是批量创建的
-        }
-    )
+        },
+    }
 
 
 @router.get("", summary="获取排课列表")
@@ -93,6 +93,7 @@ async def get_schedules(
     db: DBSession,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     campus_id: Optional[int] = Query(None, description="校区ID"),
     class_plan_id: Optional[int] = Query(None, description="班级计划ID"),
     teacher_id: Optional[int] = Query(None, description="教师ID"),
@@ -100,12 +101,16 @@ async def get_schedules(
     end_date: Optional[date] = Query(None, description="结束日期"),
     status: Optional[str] = Query(None, description="状态"),
     batch_no: Optional[str] = Query(None, description="批次号"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,schedule_date,teacher）"),
 ):
     """
     获取排课列表（分页）。
     - 校区管理员只能看到自己校区的排课
     - 教师只能看到自己的排课
+    - 传入 fields 时只查询并返回这些字段，关联对象（class_plan/teacher/classroom）只在请求时查询
     """
+    projected = SCHEDULE_FIELDS.parse(fields)
     # 校区范围过滤
     scope = CampusScopedQuery()
     effective_campus_id = scope.get_campus_filter(current_user)
@@ -119,7 +124,7 @@ async def get_schedules(
             teacher_id = my_teacher_id
 
     service = ScheduleService(db)
-    schedules, total = await service.get_schedules(
+    schedules, total, next_cursor = await service.get_schedules(
         page=page,
         page_size=page_size,
         class_plan_id=class_plan_id,
@@ -129,12 +134,16 @@ async def get_schedules(
         status=status,
         campus_id=campus_id,
         batch_no=batch_no,
+        cursor=cursor,
+        include_total=include_total,
+        fields=projected,
     )
     return success_response({
         "total": total,
         "page": page,
         "page_size": page_size,
-        "items": [ScheduleResponse.model_validate(s).model_dump() for s in schedules],
+        "items": schedules,
+        "next_cursor": next_cursor,
     })
 
 
@@ -230,7 +239,7 @@ async def get_calendar_events(
             absent_count=stats["absent"],
         ))
 
-    return success_response([e.model_dump() for e in events])
+    return success_response(events)
 
 
 @router.post("", summary="创建排课")
@@ -425,6 +434,22 @@ async def delete_schedules_by_batch(
 
 # 动态路由放在静态路由后面
 
+@router.post("/batch-get", summary="按ID批量获取排课")
+async def batch_get_schedules(
+    data: BatchGetRequest,
+    current_user: ScheduleRead,  # 权限：schedule:read
+    db: DBSession,
+):
+    """按ID列表一次获取多个排课，只返回当前校区范围内的排课"""
+    scope = CampusScopedQuery()
+    campus_id = scope.get_campus_filter(current_user)
+
+    service = ScheduleService(db)
+    schedules = await service.get_schedules_by_ids(data.unique_ids, campus_id_filter=campus_id)
+    items, missing_ids = data.arrange([ScheduleResponse.model_validate(s).model_dump() for s in schedules])
+    return batch_get_response(items, missing_ids)
+
+
 @router.get("/{schedule_id}", summary="获取排课详情")
 async def get_schedule(
     schedule_id: int,
@@ -10,11 +10,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.api.deps import (
     DBSession, CampusScopedQuery,
-    StudentRead, StudentEdit, StudentDelete,
+    StudentRead, StudentEdit, StudentDelete, ConditionalGet,
 )
-from app.services.student_service import StudentService
+from app.core.versions import STUDENT_VERSION
+from app.services.student_service import STUDENT_FIELDS, StudentService
 from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse, StudentBriefResponse
-from app.schemas.common import success_response, MessageResponse
+from app.schemas.common import BatchGetRequest, batch_get_response, success_response, MessageResponse
 
 router = APIRouter(prefix="/students", tags=["学生管理"])
 
@@ -23,23 +24,31 @@ def get_service(db: AsyncSession = Depends(get_db)) -> StudentService:
     return StudentService(db)
 
 
+student_etag = ConditionalGet(campus_keys=(STUDENT_VERSION,))
+
+
 @router.get("", summary="获取学生列表")
 async def get_students(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     campus_id: Optional[int] = Query(None, description="校区ID"),
     status: Optional[str] = Query(None, description="状态"),
     is_active: Optional[bool] = Query(None, description="是否启用"),
-    search: Optional[str] = Query(None, description="搜索关键词"),
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
     grade: Optional[str] = Query(None, description="年级"),
     source: Optional[str] = Query(None, description="来源"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name,phone）"),
     service: StudentService = Depends(get_service),
     current_user: StudentRead = None,  # 权限：student:read
 ):
     """
     获取学生列表（分页）。
     校区管理员只能看到自己校区的学生。
+    传入 fields 时只查询并返回这些字段。
     """
+    projected = STUDENT_FIELDS.parse(fields)
     # 校区范围过滤
     scope = CampusScopedQuery()
     effective_campus_id = scope.get_campus_filter(current_user)
@@ -47,17 +56,21 @@ async def get_students(
     if effective_campus_id is not None:
         campus_id = effective_campus_id
 
-    items, total = await service.get_all(
+    items, total, next_cursor = await service.get_all(
         page, page_size, status, is_active, search, campus_id=campus_id,
-        grade=grade, source=source
+        grade=grade, source=source, cursor=cursor,
+        include_total=include_total, fields=projected,
     )
-    return success_response([StudentResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
+    if projected is None:
+        items = [StudentResponse.model_validate(item).model_dump() for item in items]
+    return success_response(items, total=total, page=page, page_size=page_size, next_cursor=next_cursor)
 
 
 @router.get("/active", summary="获取所有在读学生")
 async def get_active_students(
     service: StudentService = Depends(get_service),
     current_user: StudentRead = None,  # 权限：student:read
+    __: None = Depends(student_etag),
 ):
     """获取所有在读学生（用于下拉选择）"""
     scope = CampusScopedQuery()
@@ -69,16 +82,37 @@ async def get_active_students(
 @router.get("/all", summary="获取学生下拉列表")
 async def get_all_students_dropdown(
     active_only: bool = True,
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
+    q: Optional[str] = Query(None, description="输入联想关键词，传入时只返回最匹配的 limit 条"),
+    limit: int = Query(20, ge=1, le=100, description="输入联想返回条数"),
     service: StudentService = Depends(get_service),
     current_user: StudentRead = None,  # 权限：student:read
+    __: None = Depends(student_etag),
 ):
-    """获取所有学生（用于下拉选择）"""
+    """获取所有学生（用于下拉选择）；传入 q 时为输入联想模式"""
     scope = CampusScopedQuery()
     campus_id = scope.get_campus_filter(current_user)
-    items = await service.get_all_dropdown(active_only, campus_id=campus_id)
+    if q:
+        items = await service.typeahead(q, limit, active_only, campus_id=campus_id)
+    else:
+        items = await service.get_all_dropdown(active_only, campus_id=campus_id, search=search)
     return success_response([StudentResponse.model_validate(item).model_dump() for item in items])
 
 
+@router.post("/batch-get", summary="按ID批量获取学生")
+async def batch_get_students(
+    data: BatchGetRequest,
+    service: StudentService = Depends(get_service),
+    current_user: StudentRead = None,  # 权限：student:read
+):
+    """按ID列表一次获取多个学生，只返回当前校区范围内的学生"""
+    scope = CampusScopedQuery()
+    campus_id = scope.get_campus_filter(current_user)
+    students = await service.get_by_ids(data.unique_ids, campus_id_filter=campus_id)
+    items, missing_ids = data.arrange([StudentResponse.model_validate(s).model_dump() for s in students])
+    return batch_get_response(items, missing_ids)
+
+
 @router.get("/{student_id}", summary="获取学生详情")
 async def get_student(
     student_id: int,
@@ -24,19 +24,23 @@ async def get_student_attendances(
     student_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     status: Optional[str] = Query(None, description="出勤状态: normal/leave/absent"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
     """Get student's attendance records."""
     service = StudentAttendanceService(db)
-    items, total = await service.get_student_attendance_list(
+    items, total, next_cursor = await service.get_student_attendance_list(
         student_id=student_id,
         page=page,
         page_size=page_size,
         status=status,
+        cursor=cursor,
+        include_total=include_total,
     )
-    return success_response([StudentAttendanceResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
+    return success_response([StudentAttendanceResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size, next_cursor=next_cursor)
 
 
 @router.get("/schedule/{schedule_id}", summary="获取排课的学生出勤列表")
@@ -7,10 +7,11 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.deps import CurrentUser, AdminUser
+from app.api.deps import CurrentUser, AdminUser, ConditionalGet
+from app.core.versions import TEACHER_VERSION
 from app.services.teacher_service import TeacherService
 from app.schemas.teacher import TeacherCreate, TeacherUpdate, TeacherResponse, TeacherBriefResponse
-from app.schemas.common import success_response, MessageResponse
+from app.schemas.common import BatchGetRequest, batch_get_response, success_response, MessageResponse
 
 router = APIRouter(prefix="/teachers", tags=["教师管理"])
 
@@ -19,13 +20,17 @@ def get_service(db: AsyncSession = Depends(get_db)) -> TeacherService:
     return TeacherService(db)
 
 
+teacher_etag = ConditionalGet(TEACHER_VERSION)
+
+
 @router.get("", summary="获取教师列表")
 async def get_teachers(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     status: Optional[str] = Query(None, description="状态"),
     is_active: Optional[bool] = Query(None, description="是否启用"),
-    search: Optional[str] = Query(None, description="搜索关键词"),
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
     subjects: Optional[List[str]] = Query(None, description="科目过滤（多选）"),
     grade_levels: Optional[List[str]] = Query(None, description="年级过滤（多选）"),
     service: TeacherService = Depends(get_service),
@@ -34,7 +39,8 @@ async def get_teachers(
     """Get teachers with pagination and filters."""
     items, total = await service.get_all(
         page, page_size, status, is_active, search,
-        subjects=subjects, grade_levels=grade_levels
+        subjects=subjects, grade_levels=grade_levels,
+        include_total=include_total,
     )
     return success_response([TeacherResponse.model_validate(item).model_dump() for item in items], total=total, page=page, page_size=page_size)
 
@@ -43,6 +49,7 @@ async def get_teachers(
 async def get_active_teachers(
     service: TeacherService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(teacher_etag),
 ):
     """Get all active teachers (for dropdowns)."""
     items = await service.get_all_active()
@@ -52,14 +59,33 @@ async def get_active_teachers(
 @router.get("/all", summary="获取所有教师下拉列表")
 async def get_all_teachers_dropdown(
     active_only: bool = True,
+    search: Optional[str] = Query(None, description="搜索关键词（支持拼音首字母，如 zs）"),
+    q: Optional[str] = Query(None, description="输入联想关键词，传入时只返回最匹配的 limit 条"),
+    limit: int = Query(20, ge=1, le=100, description="输入联想返回条数"),
     service: TeacherService = Depends(get_service),
     _: CurrentUser = None,
+    __: None = Depends(teacher_etag),
 ):
-    """Get all teachers for dropdown."""
-    items = await service.get_all_dropdown(active_only)
+    """Get all teachers for dropdown (typeahead mode when q is given)."""
+    if q:
+        items = await service.typeahead(q, limit, active_only)
+    else:
+        items = await service.get_all_dropdown(active_only, search=search)
     return success_response([TeacherBriefResponse.model_validate(item).model_dump() for item in items])
 
 
+@router.post("/batch-get", summary="按ID批量获取教师")
+async def batch_get_teachers(
+    data: BatchGetRequest,
+    service: TeacherService = Depends(get_service),
+    _: CurrentUser = None,
+):
+    """按ID列表一次获取多个教师"""
+    teachers = await service.get_by_ids(data.unique_ids)
+    items, missing_ids = data.arrange([TeacherResponse.model_validate(t).model_dump() for t in teachers])
+    return batch_get_response(items, missing_ids)
+
+
 @router.get("/{teacher_id}", summary="获取教师详情")
 async def get_teacher(
     teacher_id: int,
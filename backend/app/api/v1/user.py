@@ -6,6 +6,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Query
 
 from app.api.deps import AdminUser, DBSession
+from app.core.presence import presence
 from app.models.user import User
 from app.schemas.auth import PasswordResetRequest
 from app.schemas.common import success_response, MessageResponse
@@ -41,7 +42,7 @@ def user_to_response(user: User) -> UserResponse:
         campus_id=user.campus_id,
         campus_name=user.campus.name if user.campus else None,
         is_active=user.is_active,
-        is_online=user.is_online,
+        is_online=presence.is_online(user.id),
         last_login=user.last_login,
         avatar=user.avatar,
         created_time=user.created_time,
@@ -55,6 +56,7 @@ async def get_users(
     db: DBSession,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     role: Optional[str] = Query(None, description="角色筛选"),
     is_active: Optional[bool] = Query(None, description="是否启用筛选"),
     is_online: Optional[bool] = Query(None, description="是否在线筛选"),
@@ -71,6 +73,7 @@ async def get_users(
         is_active=is_active,
         is_online=is_online,
         search=search,
+        include_total=include_total,
     )
     return success_response([user_to_response(u).model_dump() for u in users], total=total, page=page, page_size=page_size)
 
@@ -99,7 +102,10 @@ async def get_online_users(
     """
     user_service = UserService(db)
     users = await user_service.get_online_users()
-    return success_response([OnlineUserResponse.model_validate(u).model_dump() for u in users])
+    return success_response([
+        OnlineUserResponse.model_validate(u).model_copy(update={"last_seen": presence.last_seen(u.id)}).model_dump()
+        for u in users
+    ])
 
 
 @router.get("/{user_id}", summary="获取用户详情")
@@ -178,6 +184,7 @@ async def get_user_login_logs(
     db: DBSession,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
 ):
     """
     Get user's login logs (admin only).
@@ -187,6 +194,7 @@ async def get_user_login_logs(
         user_id=user_id,
         page=page,
         page_size=page_size,
+        include_total=include_total,
     )
     return success_response([LoginLogResponse.model_validate(log).model_dump() for log in logs], total=total, page=page, page_size=page_size)
 
@@ -204,19 +212,23 @@ async def get_all_login_logs(
     db: DBSession,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    include_total: bool = Query(True, description="是否统计总数（为 false 时跳过 COUNT 查询，total 返回 null）"),
     user_id: Optional[int] = Query(None, description="用户ID筛选"),
     status: Optional[str] = Query(None, description="状态筛选 (success/failed)"),
     search: Optional[str] = Query(None, description="搜索关键词 (用户名/IP)"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，传入时忽略 page）"),
 ):
     """
     Get all login logs with filters (admin only).
     """
     user_service = UserService(db)
-    logs, total = await user_service.get_all_login_logs(
+    logs, total, next_cursor = await user_service.get_all_login_logs(
         page=page,
         page_size=page_size,
         user_id=user_id,
         status=status,
         search=search,
+        cursor=cursor,
+        include_total=include_total,
     )
-    return success_response([LoginLogWithUserResponse.from_orm_with_user(log).model_dump() for log in logs], total=total, page=page, page_size=page_size)
+    return success_response([LoginLogWithUserResponse.from_orm_with_user(log).model_dump() for log in logs], total=total, page=page, page_size=page_size, next_cursor=next_cursor)
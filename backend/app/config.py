@@ -36,6 +36,8 @@ class Settings(BaseSettings):
     # JWT
     secret_key: str = "your-super-secret-key-change-in-production"
     algorithm: str = "HS256"
+    jwt_backend: str = "jose"  # jose / pyjwt（需安装 PyJWT）
+    token_cache_max_entries: int = 10000
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
 
@@ -44,6 +46,55 @@ class Settings(BaseSettings):
     app_name: str = "课程管理系统"
     app_version: str = "2.0.0"
 
+    # Dashboard snapshots & caches
+    dashboard_snapshot_interval_minutes: int = 5
+    dashboard_snapshot_ttl_seconds: int = 900
+    dashboard_snapshot_max_entries: int = 5000
+    student_dashboard_cache_ttl_seconds: int = 30
+    student_dashboard_cache_max_entries: int = 5000
+
+    # Auth caches
+    principal_cache_ttl_seconds: int = 300
+    principal_cache_max_entries: int = 10000
+    permission_cache_max_entries: int = 256
+    # 读取全局版本号（如权限版本）的缓存时间，即其他进程变更的最大感知延迟
+    version_check_seconds: int = 5
+
+    # Password hashing
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 200
+
+    # List counts
+    list_count_mode: str = "exact"  # exact / cached / estimated
+    count_cache_ttl_seconds: int = 30
+    count_cache_max_entries: int = 2000
+    count_estimate_threshold: int = 100000
+
+    # Typeahead (dropdown ?q= search)
+    typeahead_max_scopes: int = 256  # 每类实体最多缓存的校区索引数
+    typeahead_max_candidates: int = 2000  # 单次查询最多考察的候选数
+
+    # Login throttling
+    login_user_rate_per_minute: float = 5
+    login_user_burst: int = 10
+    login_ip_rate_per_minute: float = 120
+    login_ip_burst: int = 200
+    login_max_in_flight: int = 32
+    login_throttle_max_keys: int = 100000
+
+    # Login activity write-behind
+    login_buffer_flush_seconds: float = 2.0
+    login_buffer_flush_size: int = 100
+    login_buffer_max_entries: int = 10000
+
+    # Presence
+    presence_touch_seconds: int = 30
+    presence_max_entries: int = 100000
+    presence_snapshot_seconds: int = 60
+
+    # Composite batch requests (/api/v1/batch)
+    batch_max_concurrency: int = 4  # 进程内同时执行的子请求总数（所有批量请求共用），另受连接池大小限制
+
     # CORS
     cors_origins: List[str] = ["http://localhost:5173", "http://localhost:3000"]
 
@@ -0,0 +1,117 @@
+"""
+In-process cache utilities.
+进程内缓存工具：有界 LRU + TTL 缓存，以及全局注册表（统一统计与清理）。
+注意：缓存只在当前工作进程内有效，多进程部署时需要配合版本号等机制保证一致性。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+# 已创建的缓存实例，按名称注册
+_registry: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    有界 LRU 缓存，条目可设置过期时间。
+
+    Usage:
+        cache = TTLCache("principal", maxsize=10000, ttl=300)
+        cache.set(user_id, principal)
+        principal = cache.get(user_id)
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，不存在或已过期时返回 default"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._removed(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值，ttl 为空时使用缓存默认过期时间"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._removed(evicted)
+                self.evictions += 1
+
+    def _removed(self, key: Hashable) -> None:
+        """条目过期或被 LRU 淘汰后调用（持有锁），子类可覆盖以跟踪被移除的条目"""
+
+    def pop(self, key: Hashable) -> None:
+        """删除指定缓存项"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> list:
+        """未过期的 (key, value) 快照"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """缓存统计信息"""
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def get_cache_stats() -> list[dict]:
+    """获取所有已注册缓存的统计信息"""
+    return [cache.stats() for cache in _registry.values()]
+
+
+def clear_all_caches() -> None:
+    """清空所有已注册的缓存（测试或运维场景使用）"""
+    for cache in _registry.values():
+        cache.clear()
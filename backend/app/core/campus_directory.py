@@ -0,0 +1,84 @@
+"""
+Process-level campus directory.
+校区目录缓存：校区列表很少变化，登录校区选项、校区下拉列表、仪表盘校区名称都从进程内缓存读取。
+CampusService 增删改校区时递增校区版本号并清空本地缓存，其他工作进程按版本号感知变更。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.versions import CAMPUS_VERSION, get_version
+from app.models.campus import Campus
+
+# 版本号 -> 全部校区（按 sort_order, id 排序）
+_directory_cache = TTLCache("campus_directory", maxsize=2)
+
+
+@dataclass(frozen=True)
+class CampusEntry:
+    """校区信息快照（字段与 CampusResponse 一致，可直接 model_validate）"""
+    id: int
+    name: str
+    address: Optional[str]
+    phone: Optional[str]
+    contact_person: Optional[str]
+    description: Optional[str]
+    is_active: bool
+    sort_order: int
+    created_time: Optional[datetime]
+    updated_time: Optional[datetime]
+
+    @classmethod
+    def from_campus(cls, campus: Campus) -> "CampusEntry":
+        return cls(
+            id=campus.id,
+            name=campus.name,
+            address=campus.address,
+            phone=campus.phone,
+            contact_person=campus.contact_person,
+            description=campus.description,
+            is_active=campus.is_active,
+            sort_order=campus.sort_order,
+            created_time=campus.created_time,
+            updated_time=campus.updated_time,
+        )
+
+
+async def get_campus_directory(db: AsyncSession) -> Tuple[CampusEntry, ...]:
+    """获取全部校区（含已停用），按 sort_order, id 排序"""
+    version = await get_version(db, CAMPUS_VERSION)
+    entries = _directory_cache.get(version)
+    if entries is not None:
+        return entries
+
+    result = await db.execute(select(Campus).order_by(Campus.sort_order, Campus.id))
+    entries = tuple(CampusEntry.from_campus(campus) for campus in result.scalars().all())
+    _directory_cache.set(version, entries)
+    return entries
+
+
+async def get_active_campuses(db: AsyncSession) -> List[CampusEntry]:
+    """获取启用的校区"""
+    return [entry for entry in await get_campus_directory(db) if entry.is_active]
+
+
+async def get_active_campus(db: AsyncSession, campus_id: int) -> Optional[CampusEntry]:
+    """获取指定的启用校区，不存在或已停用时返回 None"""
+    for entry in await get_campus_directory(db):
+        if entry.id == campus_id and entry.is_active:
+            return entry
+    return None
+
+
+async def get_campus_names(db: AsyncSession) -> Dict[int, str]:
+    """校区ID到名称的映射（含已停用校区）"""
+    return {entry.id: entry.name for entry in await get_campus_directory(db)}
+
+
+def invalidate_campus_directory() -> None:
+    """清空本进程的校区目录缓存"""
+    _directory_cache.clear()
@@ -52,3 +52,17 @@ class ConflictException(CourseManagerException):
 
     def __init__(self, message: str = "资源冲突", detail: Optional[Any] = None):
         super().__init__(message=message, status_code=409, detail=detail)
+
+
+class TooManyRequestsException(CourseManagerException):
+    """Exception for rate-limited requests (429)."""
+
+    def __init__(self, message: str = "请求过于频繁，请稍后重试", detail: Optional[Any] = None):
+        super().__init__(message=message, status_code=429, detail=detail)
+
+
+class ServiceUnavailableException(CourseManagerException):
+    """Exception for temporarily overloaded service (503)."""
+
+    def __init__(self, message: str = "服务繁忙，请稍后重试", detail: Optional[Any] = None):
+        super().__init__(message=message, status_code=503, detail=detail)
@@ -0,0 +1,231 @@
+"""
+Pagination helpers: cursor (keyset) pagination and total counts.
+游标分页工具：游标为排序键的 base64 编码 JSON，客户端原样回传即可获取下一页。
+相比 OFFSET 分页，翻页成本与页码无关。
+总数统计支持多种策略（精确、跳过、短期缓存、PostgreSQL 估算），见 count_total。
+"""
+import base64
+import json
+import logging
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import BadRequestException
+from app.database import get_dialect_name
+
+logger = logging.getLogger(__name__)
+
+# 总数统计策略
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+
+# 查询语句 + 参数 -> 总数
+_count_cache = TTLCache(
+    "list_counts",
+    maxsize=settings.count_cache_max_entries,
+    ttl=settings.count_cache_ttl_seconds,
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的游标值: {value!r}")
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """将排序键编码为游标字符串"""
+    raw = json.dumps(values, default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    解析游标字符串，cursor 为空时返回 None。
+
+    Raises:
+        BadRequestException: 游标格式错误
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise BadRequestException("无效的分页游标")
+    if not isinstance(values, dict):
+        raise BadRequestException("无效的分页游标")
+    return values
+
+
+def _parse_value(python_type: type, value: Any) -> Any:
+    """将游标中的 JSON 值还原为排序列的 Python 类型"""
+    if value is None:
+        raise ValueError("游标值不能为空")
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+class Keyset:
+    """
+    基于排序键的游标分页，与 page/page_size 分页并存。
+
+    排序键按顺序给出，可用 .desc() 指定倒序，最后一个键须唯一（通常是主键），且各键不能为空：
+
+        keyset = Keyset(Schedule.schedule_date.desc(), Schedule.start_time, Schedule.id)
+        query = keyset.paginate(query, cursor, page, page_size)
+        rows, next_cursor = keyset.page(list((await db.execute(query)).scalars().all()), page_size)
+
+    传入 cursor 时忽略 page，从游标位置继续；未传时按 page 做 OFFSET 分页。
+    两种方式都会返回 next_cursor，客户端可以随时切换到游标分页。
+    """
+
+    def __init__(self, *keys: Any):
+        self._keys: List[Tuple[Any, bool]] = []
+        for key in keys:
+            if isinstance(key, UnaryExpression) and key.modifier in (operators.desc_op, operators.asc_op):
+                self._keys.append((key.element, key.modifier is operators.desc_op))
+            else:
+                self._keys.append((key, False))
+
+    def columns(self) -> List[Any]:
+        """排序键对应的列（列级查询时须包含这些列才能生成游标）"""
+        return [column for column, _ in self._keys]
+
+    def order_by(self) -> List[Any]:
+        """ORDER BY 子句"""
+        return [column.desc() if descending else column.asc() for column, descending in self._keys]
+
+    def _decode(self, cursor: str) -> List[Any]:
+        values = decode_cursor(cursor)
+        try:
+            return [
+                _parse_value(column.type.python_type, values[column.key])
+                for column, _ in self._keys
+            ]
+        except (KeyError, TypeError, ValueError, NotImplementedError):
+            raise BadRequestException("无效的分页游标")
+
+    def after(self, cursor: str):
+        """游标位置之后的行的过滤条件（按排序键逐列比较）"""
+        values = self._decode(cursor)
+        clauses = []
+        for i, (column, descending) in enumerate(self._keys):
+            equal = [self._keys[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def paginate(self, query: Select, cursor: Optional[str], page: int, page_size: int) -> Select:
+        """排序并截取一页（多取一行用于判断是否还有下一页）"""
+        query = query.order_by(*self.order_by())
+        if cursor:
+            query = query.where(self.after(cursor))
+        else:
+            query = query.offset((page - 1) * page_size)
+        return query.limit(page_size + 1)
+
+    def encode(self, row: Any) -> str:
+        """生成指向 row 之后的游标"""
+        return encode_cursor({column.key: getattr(row, column.key) for column, _ in self._keys})
+
+    def page(self, rows: Sequence[Any], page_size: int) -> Tuple[List[Any], Optional[str]]:
+        """截取一页并生成下一页游标（没有下一页时为 None）"""
+        rows = list(rows)
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self.encode(rows[-1])
+
+
+def build_count_query(query: Select) -> Select:
+    """
+    由列表查询构造 COUNT 查询：去掉实体列、加载选项、ORDER BY 和 LIMIT/OFFSET。
+    带 GROUP BY / DISTINCT 的查询无法直接替换列，退化为子查询计数。
+    """
+    query = query.order_by(None).limit(None).offset(None)
+    if query._group_by_clauses or query._distinct:
+        return select(func.count()).select_from(query.subquery())
+    return query.with_only_columns(func.count(), maintain_column_froms=True)
+
+
+def _count_cache_key(db: AsyncSession, count_query: Select) -> Tuple:
+    """过滤条件签名：编译后的 SQL 与参数"""
+    compiled = count_query.compile(dialect=db.get_bind().dialect)
+    params = tuple(
+        (name, tuple(value) if isinstance(value, (list, set)) else value)
+        for name, value in sorted(compiled.params.items())
+    )
+    return str(compiled), params
+
+
+async def _estimate_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """PostgreSQL 查询计划估算的行数，无法估算时返回 None"""
+    if get_dialect_name(db) != "postgresql":
+        return None
+    try:
+        sql = query.order_by(None).limit(None).offset(None).compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        logger.debug("查询计划估算失败，改用精确计数", exc_info=True)
+        return None
+
+
+async def count_total(
+    db: AsyncSession,
+    query: Select,
+    include_total: bool = True,
+    mode: Optional[str] = None,
+) -> Optional[int]:
+    """
+    统计列表查询的总数。
+
+    Args:
+        db: 数据库会话
+        query: 列表查询（可带加载选项、排序，会自动去掉）
+        include_total: False 时不统计，返回 None
+        mode: 统计策略，默认 settings.list_count_mode
+            - exact: 精确计数
+            - cached: 按过滤条件签名缓存 count_cache_ttl_seconds 秒
+            - estimated: PostgreSQL 估算行数超过 count_estimate_threshold 时返回估算值，否则精确计数
+
+    Returns:
+        总数；include_total 为 False 时返回 None
+    """
+    if not include_total:
+        return None
+
+    mode = mode or settings.list_count_mode
+    count_query = build_count_query(query)
+
+    if mode == COUNT_ESTIMATED:
+        estimate = await _estimate_rows(db, query)
+        if estimate is not None and estimate >= settings.count_estimate_threshold:
+            return estimate
+
+    key = None
+    if mode == COUNT_CACHED:
+        key = _count_cache_key(db, count_query)
+        total = _count_cache.get(key)
+        if total is not None:
+            return total
+
+    total = (await db.execute(count_query)).scalar() or 0
+    if key is not None:
+        _count_cache.set(key, total)
+    return total
@@ -0,0 +1,99 @@
+"""
+Permission bitmask embedded in access tokens.
+令牌权限位图：登录时把角色权限按 Permission.id 编码为位图（十六进制字符串）写入访问令牌，
+同时写入当时的权限版本号和角色ID；鉴权时版本号、角色均一致即可直接按位判断，无需查询角色权限。
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.versions import PERMISSION_VERSION, get_version
+from app.models.permission import Permission, Resource, RolePermission
+
+# 令牌中的声明名称
+PERMISSION_MASK_CLAIM = "perms"
+PERMISSION_VERSION_CLAIM = "pv"
+ROLE_ID_CLAIM = "rid"
+
+# "resource:action" -> Permission.id，按权限版本号缓存
+_index_cache = TTLCache("permission_index", maxsize=4)
+
+
+def encode_mask(bits: Iterable[int]) -> str:
+    """将权限ID集合编码为十六进制位图"""
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return format(mask, "x")
+
+
+def mask_has(mask: str, bit: int) -> bool:
+    """判断位图中是否包含指定权限ID"""
+    try:
+        return bool((int(mask, 16) >> bit) & 1)
+    except (TypeError, ValueError):
+        return False
+
+
+async def get_permission_index(db: AsyncSession) -> Dict[str, int]:
+    """获取权限编码到权限ID的映射（resource_code:action -> id）"""
+    version = await get_version(db, PERMISSION_VERSION)
+    index = _index_cache.get(version)
+    if index is not None:
+        return index
+
+    result = await db.execute(
+        select(Resource.code, Permission.action, Permission.id)
+        .join(Permission, Permission.resource_id == Resource.id)
+    )
+    index = {f"{row.code}:{row.action}": row.id for row in result}
+    _index_cache.set(version, index)
+    return index
+
+
+async def build_permission_claims(db: AsyncSession, role_id: Optional[int]) -> dict:
+    """
+    构建访问令牌中的权限声明：{"perms": 位图, "pv": 权限版本号, "rid": 角色ID}。
+    未分配角色时返回空字典。
+    """
+    if not role_id:
+        return {}
+
+    version = await get_version(db, PERMISSION_VERSION)
+    result = await db.execute(
+        select(RolePermission.permission_id).where(RolePermission.role_id == role_id)
+    )
+    return {
+        PERMISSION_MASK_CLAIM: encode_mask(result.scalars().all()),
+        PERMISSION_VERSION_CLAIM: version,
+        ROLE_ID_CLAIM: role_id,
+    }
+
+
+async def token_allows(
+    db: AsyncSession, claims: dict, permission: str, role_id: Optional[int]
+) -> Optional[bool]:
+    """
+    根据令牌中的权限位图判断是否拥有权限。
+
+    Args:
+        role_id: 用户当前的角色ID；与签发令牌时的角色不同（如被降级）则位图作废
+
+    Returns:
+        True/False；令牌没有权限声明、角色已变更或权限版本已过期时返回 None（需要回退到数据库查询）
+    """
+    mask = claims.get(PERMISSION_MASK_CLAIM)
+    token_version = claims.get(PERMISSION_VERSION_CLAIM)
+    if mask is None or token_version is None:
+        return None
+    if claims.get(ROLE_ID_CLAIM) != role_id:
+        return None
+    if token_version != await get_version(db, PERMISSION_VERSION):
+        return None
+
+    bit = (await get_permission_index(db)).get(permission)
+    if bit is None:
+        return False
+    return mask_has(mask, bit)
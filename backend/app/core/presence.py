@@ -0,0 +1,120 @@
+"""
+In-memory presence tracking.
+在线状态：在进程内记录每个用户最近一次访问时间，由鉴权依赖更新（按 presence_touch_seconds 节流），
+超过访问令牌有效期未访问即视为离线。在线用户列表、在线筛选直接读内存，
+定时任务把快照写回 users.is_online，供其他进程和报表参考。
+注意：多进程部署时每个进程只记录自己处理过的请求。
+"""
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.user import User
+
+
+class PresenceTracker(TTLCache):
+    """
+    用户最近访问时间（user_id -> Unix 时间戳），条目在访问令牌有效期后过期。
+    过期（无论在哪个读取路径上被清理）、被容量淘汰或登出的用户记入待同步离线集合，
+    由 persist_presence_snapshot 写回数据库。
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, touch_interval: float):
+        super().__init__(name, maxsize=maxsize, ttl=ttl)
+        self.touch_interval = touch_interval
+        self._offline: Set[int] = set()
+
+    def touch(self, user_id: int) -> None:
+        """记录一次访问；距上次记录不足 touch_interval 秒时忽略"""
+        now = time.time()
+        last_seen = self.get(user_id)
+        if last_seen is not None and now - last_seen < self.touch_interval:
+            return
+        self.set(user_id, now)
+        self._offline.discard(user_id)
+
+    def mark_offline(self, user_id: int) -> None:
+        """用户登出"""
+        self.pop(user_id)
+        self._offline.add(user_id)
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self
+
+    def last_seen(self, user_id: int) -> Optional[datetime]:
+        """最近访问时间，离线时返回 None"""
+        timestamp = self.get(user_id)
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    def online_user_ids(self) -> List[int]:
+        """当前在线的用户ID（按最近访问时间倒序），同时清理已过期的条目"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                user_id for user_id, (_, expires_at) in self._data.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for user_id in expired:
+                del self._data[user_id]
+                self._removed(user_id)
+            items = [(user_id, value) for user_id, (value, _) in self._data.items()]
+        items.sort(key=lambda item: item[1], reverse=True)
+        return [user_id for user_id, _ in items]
+
+    def _removed(self, user_id: int) -> None:
+        self._offline.add(user_id)
+
+    def drain_offline(self) -> Set[int]:
+        """取出待同步为离线的用户ID"""
+        with self._lock:
+            offline, self._offline = self._offline, set()
+        return offline
+
+    def clear(self) -> None:
+        super().clear()
+        self._offline = set()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["pending_offline"] = len(self._offline)
+        return stats
+
+
+presence = PresenceTracker(
+    "presence",
+    maxsize=settings.presence_max_entries,
+    ttl=settings.access_token_expire_minutes * 60,
+    touch_interval=settings.presence_touch_seconds,
+)
+
+
+async def persist_presence_snapshot(db: AsyncSession) -> int:
+    """
+    将内存中的在线状态写回 users.is_online，由调用方提交。
+
+    Returns:
+        本次同步的用户数
+    """
+    online = presence.online_user_ids()
+    offline = presence.drain_offline().difference(online)
+
+    if online:
+        await db.execute(
+            update(User)
+            .where(User.id.in_(online), User.is_online == False)
+            .values(is_online=True)
+        )
+    if offline:
+        await db.execute(
+            update(User)
+            .where(User.id.in_(offline), User.is_online == True)
+            .values(is_online=False)
+        )
+    return len(online) + len(offline)
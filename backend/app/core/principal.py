@@ -0,0 +1,129 @@
+"""
+Authenticated principal and its cache.
+认证主体：鉴权所需的用户信息快照（不可变），按用户ID缓存在进程内，
+常规请求鉴权无需查询数据库。
+
+缓存项记录写入时的用户版本号和权限版本号，版本号变化后重新查询：
+用户修改、删除、重置密码时递增用户版本号，角色变更时递增权限版本号，
+其他工作进程最多延迟 version_check_seconds 秒感知（见 app.core.versions）。
+本进程内另调用 invalidate_principal 立即失效。
+"""
+from dataclasses import dataclass, field, replace
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.versions import PERMISSION_VERSION, USER_VERSION, get_version
+from app.models.user import User
+
+# user_id -> ((用户版本号, 权限版本号), Principal)
+principal_cache = TTLCache(
+    "principal",
+    maxsize=settings.principal_cache_max_entries,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+@dataclass(frozen=True)
+class RoleInfo:
+    """RBAC角色摘要"""
+    id: int
+    code: str
+    name: str
+
+
+@dataclass(frozen=True)
+class CampusInfo:
+    """校区摘要"""
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    当前登录用户的不可变快照。
+    属性名与 User 模型保持一致，依赖 current_user.xxx 的代码无需修改；
+    _token_campus_id / _token_role_code 为本次请求 JWT 中的校区和角色编码；
+    _request_memo 为本次请求内的查询结果缓存（如关联的教师ID、学生ID）。
+    """
+    id: int
+    username: str
+    role: str
+    role_id: Optional[int]
+    campus_id: Optional[int]
+    is_active: bool
+    user_role: Optional[RoleInfo] = None
+    campus: Optional[CampusInfo] = None
+    _token_campus_id: Optional[int] = None
+    _token_role_code: Optional[str] = None
+    _request_memo: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """从已加载 user_role、campus 关系的 User 构建"""
+        user_role = user.user_role
+        campus = user.campus
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            role_id=user.role_id,
+            campus_id=user.campus_id,
+            is_active=user.is_active,
+            user_role=RoleInfo(user_role.id, user_role.code, user_role.name) if user_role else None,
+            campus=CampusInfo(campus.id, campus.name) if campus else None,
+        )
+
+    def with_token(self, payload: dict) -> "Principal":
+        """附加 JWT 中的校区和角色编码，返回新的 Principal"""
+        return replace(
+            self,
+            _token_campus_id=payload.get("campus_id"),
+            _token_role_code=payload.get("role_code"),
+            _request_memo={},
+        )
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """
+    获取用户的 Principal，优先读缓存，未命中时查询数据库并写入缓存。
+    用户不存在时返回 None。
+    """
+    versions = await _cache_versions(db)
+    cached = principal_cache.get(user_id)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.user_role), selectinload(User.campus))
+        .where(User.id == user_id)
+    )
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, (versions, principal))
+    return principal
+
+
+async def _cache_versions(db: AsyncSession) -> Tuple[int, int]:
+    """Principal 缓存依赖的版本号：用户信息和角色（名称、编码）"""
+    return await get_version(db, USER_VERSION), await get_version(db, PERMISSION_VERSION)
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """
+    清除本进程的 Principal 缓存，其他工作进程通过版本号失效。
+    user_id 为空时清空全部（如角色名称、编码变更）。
+    """
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(user_id)
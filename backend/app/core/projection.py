@@ -0,0 +1,130 @@
+"""
+Sparse fieldsets for list endpoints.
+列表接口的 fields= 参数：只查询请求的字段。
+请求 fields 时列表查询改为列级 select()，关联对象（如 teacher）只在被请求时 LEFT JOIN，
+结果行直接转成字典，不经过 ORM 实体加载和 identity map；未传 fields 时接口行为不变。
+列值按响应模型的字段类型输出：响应模型为 float 的 Numeric 列（如 lesson_hours）转成 float，
+与经过响应模型序列化时一样输出 JSON 数字而不是字符串。
+
+    SCHEDULE_FIELDS = Projection(Schedule, ScheduleResponse, relations={
+        "teacher": (Teacher, Schedule.teacher_id, ("id", "name")),
+    })
+    names = SCHEDULE_FIELDS.parse("id,schedule_date,teacher")
+    query = SCHEDULE_FIELDS.apply(select(Schedule).where(...), names, SCHEDULE_KEYSET.columns())
+    items = SCHEDULE_FIELDS.to_dicts((await db.execute(query)).all(), names)
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import aliased
+
+from app.core.exceptions import BadRequestException
+
+# 关联字段在结果行中的列名前缀分隔符：teacher__name
+_SEP = "__"
+
+
+class Projection:
+    """
+    一类实体可投影的字段：取自响应模型的字段，与完整响应的字段名和结构一致。
+
+    Args:
+        model: ORM 模型
+        schema: 完整响应模型，其字段即可请求的字段
+        relations: 关联字段 -> (关联模型, 外键列, 关联对象的字段)
+        computed: 不是数据库列、由调用方补充的字段（如报名的已排课时）
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        relations: Optional[Dict[str, Tuple[Any, Any, Sequence[str]]]] = None,
+        computed: Sequence[str] = (),
+    ):
+        self.model = model
+        self.relations = relations or {}
+        self.computed = tuple(computed)
+        self.columns = tuple(
+            name for name in schema.model_fields
+            if name not in self.relations and name not in self.computed
+        )
+        self.allowed = tuple(schema.model_fields)
+        # 列 -> 转换函数：数据库返回的类型与响应模型不一致的列（Numeric 列返回 Decimal）
+        self._coerce: Dict[str, Callable[[Any], Any]] = {
+            name: float
+            for name in self.columns
+            if schema.model_fields[name].annotation in (float, Optional[float])
+        }
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """
+        解析逗号分隔的字段列表（保持请求顺序、去重），未传或为空时返回 None。
+
+        Raises:
+            BadRequestException: 包含不支持的字段
+        """
+        if not fields:
+            return None
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        if not names:
+            return None
+        unknown = [name for name in names if name not in self.allowed]
+        if unknown:
+            raise BadRequestException(
+                f"不支持的字段: {', '.join(unknown)}（可选: {', '.join(self.allowed)}）"
+            )
+        return names
+
+    def apply(self, query: Select, names: Sequence[str], extra: Iterable[Any] = ()) -> Select:
+        """
+        把实体查询改为只查询 names 对应的列。
+
+        Args:
+            query: 已带过滤条件的 select(model) 查询（不要带 selectinload 等加载选项）
+            names: parse 返回的字段
+            extra: 额外需要的本表列（如游标排序键），结果行中按列名取值，不会输出
+        """
+        columns: Dict[str, Any] = {}
+        for name in names:
+            if name in self.columns:
+                columns[name] = getattr(self.model, name)
+        for column in extra:
+            columns.setdefault(column.key, column)
+        selected = [column.label(name) for name, column in columns.items()]
+
+        joins = []
+        for name in names:
+            if name not in self.relations:
+                continue
+            target, foreign_key, fields = self.relations[name]
+            # 别名避免与过滤条件中已 join 的同一张表冲突
+            alias = aliased(target)
+            joins.append((alias, foreign_key == alias.id))
+            selected.extend(getattr(alias, field).label(f"{name}{_SEP}{field}") for field in fields)
+
+        query = query.with_only_columns(*selected, maintain_column_froms=True)
+        for alias, onclause in joins:
+            query = query.outerjoin(alias, onclause)
+        return query
+
+    def to_dicts(self, rows: Iterable[Any], names: Sequence[str]) -> List[Dict[str, Any]]:
+        """把结果行转成只含 names 的字典；关联对象不存在时为 None，计算字段先置为 None"""
+        items = []
+        for row in rows:
+            values = row._mapping
+            item: Dict[str, Any] = {}
+            for name in names:
+                if name in self.relations:
+                    fields = self.relations[name][2]
+                    nested = {field: values[f"{name}{_SEP}{field}"] for field in fields}
+                    item[name] = nested if nested.get("id") is not None else None
+                elif name in self.computed:
+                    item[name] = None
+                else:
+                    value = values[name]
+                    coerce = self._coerce.get(name)
+                    item[name] = coerce(value) if coerce is not None and value is not None else value
+            items.append(item)
+        return items
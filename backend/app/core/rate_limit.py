@@ -0,0 +1,117 @@
+"""
+Token-bucket rate limiting and login admission control.
+令牌桶限流与登录准入控制：按用户名、按IP限制登录频率，并限制同时进行的登录校验数，
+被拒绝的请求在查询用户和计算 bcrypt 之前直接返回 429，保护 CPU。
+注意：限流状态只在当前工作进程内有效。
+"""
+import time
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Optional
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import TooManyRequestsException
+
+
+class TokenBucketLimiter:
+    """
+    按键的令牌桶：每个键最多积累 burst 个令牌，每分钟补充 rate_per_minute 个。
+    桶状态存放在有界缓存中，补满后的桶过期释放（与满桶等价）。
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, maxsize: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets = TTLCache(name, maxsize=maxsize, ttl=burst / self.rate)
+        self.allowed = 0
+        self.rejected = 0
+
+    def try_acquire(self, key: Hashable) -> bool:
+        """消耗一个令牌，令牌不足时返回 False"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            self.rejected += 1
+            return False
+        self._buckets.set(key, (tokens - 1, now))
+        self.allowed += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+class LoginThrottle:
+    """登录准入：用户名限流 + IP限流 + 同时进行的登录数上限"""
+
+    def __init__(
+        self,
+        user_limiter: TokenBucketLimiter,
+        ip_limiter: TokenBucketLimiter,
+        max_in_flight: int,
+    ):
+        self.user_limiter = user_limiter
+        self.ip_limiter = ip_limiter
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.rejected_in_flight = 0
+
+    @contextmanager
+    def admit(self, username: str, ip_address: Optional[str]) -> Iterator[None]:
+        """
+        登录准入，在上下文内占用一个登录名额。
+
+        Raises:
+            TooManyRequestsException: 登录过于频繁或同时登录数已达上限
+        """
+        if self.in_flight >= self.max_in_flight:
+            self.rejected_in_flight += 1
+            raise TooManyRequestsException("登录人数过多，请稍后重试")
+        if ip_address and not self.ip_limiter.try_acquire(ip_address):
+            raise TooManyRequestsException("登录尝试过于频繁，请稍后重试")
+        if not self.user_limiter.try_acquire(username.lower()):
+            raise TooManyRequestsException("登录尝试过于频繁，请稍后重试")
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """限流统计信息（用于健康检查）"""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "rejected_in_flight": self.rejected_in_flight,
+            "per_user": self.user_limiter.stats(),
+            "per_ip": self.ip_limiter.stats(),
+        }
+
+
+login_throttle = LoginThrottle(
+    user_limiter=TokenBucketLimiter(
+        "login_rate_user",
+        rate_per_minute=settings.login_user_rate_per_minute,
+        burst=settings.login_user_burst,
+        maxsize=settings.login_throttle_max_keys,
+    ),
+    ip_limiter=TokenBucketLimiter(
+        "login_rate_ip",
+        rate_per_minute=settings.login_ip_rate_per_minute,
+        burst=settings.login_ip_burst,
+        maxsize=settings.login_throttle_max_keys,
+    ),
+    max_in_flight=settings.login_max_in_flight,
+)
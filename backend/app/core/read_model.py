@@ -0,0 +1,52 @@
+"""
+Read models for high-volume read-only queries.
+只读查询的行对象：由 Core select() + 显式 join 直接取列，结果行装入带 __slots__ 的轻量对象，
+不经过 ORM 实体加载、identity map 和关系加载器，也不再转换成 Pydantic 模型，to_dict() 后直接序列化。
+
+    class CalendarRow(ReadModel):
+        __slots__ = ("id", "title", "teacher_name")
+
+    CALENDAR_COLUMNS = CalendarRow.columns(id=Schedule.id, title=Schedule.title, teacher_name=Teacher.name)
+    query = select(*CALENDAR_COLUMNS).select_from(Schedule).outerjoin(Teacher, Schedule.teacher_id == Teacher.id)
+    rows = CalendarRow.from_rows((await db.execute(query)).all())
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Type, TypeVar
+
+T = TypeVar("T", bound="ReadModel")
+
+
+class ReadModel:
+    """只读行的基类，子类用 __slots__ 声明字段"""
+
+    __slots__ = ()
+
+    def __init__(self, values: Mapping[str, Any]):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def columns(cls, **columns: Any) -> List[Any]:
+        """
+        按字段顺序给列表达式加上字段名标签。
+        在模块级调用，字段与 __slots__ 不一致时导入即报错。
+        """
+        missing = set(cls.__slots__) - set(columns)
+        extra = set(columns) - set(cls.__slots__)
+        if missing or extra:
+            raise ValueError(f"{cls.__name__} 列定义与字段不一致: 缺少 {sorted(missing)}，多余 {sorted(extra)}")
+        return [columns[name].label(name) for name in cls.__slots__]
+
+    @classmethod
+    def from_rows(cls: Type[T], rows: Iterable[Any]) -> List[T]:
+        """把 columns() 查询的结果行转换为行对象"""
+        return [cls(row._mapping) for row in rows]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and other.to_dict() == self.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
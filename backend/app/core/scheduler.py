@@ -8,11 +8,13 @@ from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
+from app.core.versions import CLASS_PLAN_VERSION, STUDENT_VERSION, bump_scoped_versions
 from app.models.schedule import Schedule
 from app.models.enrollment import Enrollment
 from app.models.lesson_record import LessonRecord
@@ -23,14 +25,21 @@ logger = logging.getLogger(__name__)
 # 全局调度器实例
 scheduler: Optional[AsyncIOScheduler] = None
 
+# 调度器专用的数据库会话工厂（首次使用时创建，周期任务复用同一个连接池）
+_scheduler_session_maker: Optional[async_sessionmaker] = None
+
 
 def _get_scheduler_session():
     """
     为调度器创建独立的数据库会话工厂
     避免 event loop 冲突问题
     """
-    engine = create_async_engine(settings.database_url, echo=False)
-    return async_sessionmaker(engine, expire_on_commit=False)
+    global _scheduler_session_maker
+
+    if _scheduler_session_maker is None:
+        engine = create_async_engine(settings.database_url, echo=False)
+        _scheduler_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    return _scheduler_session_maker
 
 
 async def auto_complete_schedules():
@@ -65,6 +74,7 @@ async def auto_complete_schedules():
 
             completed_count = 0
             error_count = 0
+            student_campuses = set()
 
             for schedule in pending_schedules:
                 try:
@@ -101,10 +111,10 @@ async def auto_complete_schedules():
 
                         # 更新学生剩余课时
                         if enrollment.student:
-                            enrollment.student.remaining_hours = max(
-                                Decimal("0"),
-                                Decimal(str(enrollment.student.remaining_hours or 0)) - hours
-                            )
+                            remaining = Decimal(str(enrollment.student.remaining_hours or 0))
+                            enrollment.student.remaining_hours = max(Decimal("0"), remaining - hours)
+                            if enrollment.student.remaining_hours != remaining:
+                                student_campuses.add(enrollment.student.campus_id)
 
                     # 更新排课状态为已完成
                     schedule.status = "completed"
@@ -121,6 +131,9 @@ async def auto_complete_schedules():
                     logger.error(f"处理排课 #{schedule.id} 时出错: {str(e)}")
                     continue
 
+            # 剩余课时在学生下拉列表中展示，同步递增这些学生所在校区的版本号
+            await bump_scoped_versions(db, STUDENT_VERSION, student_campuses)
+
             await db.commit()
             logger.info(
                 f"自动完成排课任务执行完毕: "
@@ -167,6 +180,9 @@ async def auto_complete_class_plans():
                 plan.updated_by = "system_scheduler"
                 logger.info(f"开班计划 #{plan.id} ({plan.name}) 已自动结班")
 
+            # 班级状态在下拉列表中展示（不影响输入联想索引），递增所在校区的版本号
+            await bump_scoped_versions(db, CLASS_PLAN_VERSION, [plan.campus_id for plan in pending_plans])
+
             await db.commit()
             logger.info(f"自动结班任务执行完毕: 成功 {len(pending_plans)} 个")
 
@@ -176,6 +192,44 @@ async def auto_complete_class_plans():
             raise
 
 
+async def refresh_dashboard_snapshots():
+    """
+    刷新仪表盘快照任务
+    预先计算各校区管理员概览和各教师概览，接口直接返回快照
+    """
+    from app.services.dashboard_snapshot_service import DashboardSnapshotService
+
+    Session = _get_scheduler_session()
+
+    async with Session() as db:
+        try:
+            count = await DashboardSnapshotService(db).refresh_all()
+            logger.info(f"仪表盘快照刷新完毕: 共 {count} 个")
+        except Exception as e:
+            logger.error(f"仪表盘快照刷新失败: {str(e)}")
+            raise
+
+
+async def persist_presence():
+    """
+    同步在线状态任务
+    把内存中的在线用户快照写回 users.is_online
+    """
+    from app.core.presence import persist_presence_snapshot
+
+    Session = _get_scheduler_session()
+
+    async with Session() as db:
+        try:
+            count = await persist_presence_snapshot(db)
+            await db.commit()
+            logger.debug(f"在线状态同步完毕: 共 {count} 个用户")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"在线状态同步失败: {str(e)}")
+            raise
+
+
 def init_scheduler():
     """初始化定时任务调度器"""
     global scheduler
@@ -205,8 +259,31 @@ def init_scheduler():
         replace_existing=True,
     )
 
+    # 定期刷新仪表盘快照，启动后立即执行一次
+    scheduler.add_job(
+        refresh_dashboard_snapshots,
+        trigger=IntervalTrigger(minutes=settings.dashboard_snapshot_interval_minutes),
+        id="refresh_dashboard_snapshots",
+        name="刷新仪表盘快照",
+        next_run_time=datetime.now(),
+        replace_existing=True,
+    )
+
+    # 定期把内存中的在线状态写回数据库
+    scheduler.add_job(
+        persist_presence,
+        trigger=IntervalTrigger(seconds=settings.presence_snapshot_seconds),
+        id="persist_presence",
+        name="同步在线状态",
+        replace_existing=True,
+    )
+
     logger.info("定时任务调度器初始化完成")
-    logger.info("已注册任务: 每天 02:00 自动完成过期排课, 02:05 自动结班")
+    logger.info(
+        "已注册任务: 每天 02:00 自动完成过期排课, 02:05 自动结班, "
+        f"每 {settings.dashboard_snapshot_interval_minutes} 分钟刷新仪表盘快照, "
+        f"每 {settings.presence_snapshot_seconds} 秒同步在线状态"
+    )
 
     return scheduler
 
@@ -244,6 +321,10 @@ async def run_task_manually(task_id: str):
         await auto_complete_schedules()
     elif task_id == "auto_complete_class_plans":
         await auto_complete_class_plans()
+    elif task_id == "refresh_dashboard_snapshots":
+        await refresh_dashboard_snapshots()
+    elif task_id == "persist_presence":
+        await persist_presence()
     else:
         raise ValueError(f"未知的任务ID: {task_id}")
 
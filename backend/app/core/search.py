@@ -0,0 +1,134 @@
+"""
+Ranked fuzzy search for list endpoints.
+列表搜索：文本列做不区分大小写的包含匹配（PostgreSQL 上由 pg_trgm GIN 索引支撑，见 migrations/006），
+电话号码搜索走纯数字列（'138-0000-0001' 与 '13800000001' 互相匹配），
+纯字母搜索词同时按姓名拼音全拼/首字母做前缀匹配（'zs'、'zhangs' 都能匹配 张三）。
+结果按匹配程度排序：完全匹配 > 前缀匹配 > 包含匹配，PostgreSQL 上同档再按三元组相似度排序。
+"""
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from pypinyin import lazy_pinyin
+from sqlalchemy import case, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+# 只含数字和常见分隔符的搜索词视为电话号码
+_PHONE_TERM = re.compile(r"^[\d\s+\-()]+$")
+_NON_DIGITS = re.compile(r"\D")
+# 只含字母（可带空格）的搜索词按拼音匹配
+_PINYIN_TERM = re.compile(r"^[A-Za-z\s]+$")
+# 电话号码搜索至少需要的数字位数，更短的数字串按普通文本搜索
+MIN_PHONE_DIGITS = 3
+# 拼音列长度（与模型的 name_pinyin / name_initials 列一致）
+PINYIN_MAX_LENGTH = 255
+INITIALS_MAX_LENGTH = 100
+
+
+def digits_only(value: Optional[str]) -> Optional[str]:
+    """去掉电话号码中的非数字字符，空值或没有数字时返回 None"""
+    if not value:
+        return None
+    return _NON_DIGITS.sub("", value) or None
+
+
+def name_pinyin(name: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    姓名的拼音全拼和首字母（小写，去掉空格和符号），如 '张三' -> ('zhangsan', 'zs')。
+    非汉字的字母和数字逐个保留。
+    """
+    if not name:
+        return None, None
+    syllables = [
+        syllable.lower()
+        for syllable in lazy_pinyin(name, errors=lambda chars: list(chars))
+        if syllable.isalnum()
+    ]
+    if not syllables:
+        return None, None
+    full = "".join(syllables)[:PINYIN_MAX_LENGTH]
+    initials = "".join(syllable[0] for syllable in syllables)[:INITIALS_MAX_LENGTH]
+    return full, initials
+
+
+def escape_like(term: str) -> str:
+    """转义 LIKE 通配符，搜索词中的 % 和 _ 按字面匹配"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchSpec:
+    """
+    一类实体的搜索配置。
+
+        STUDENT_SEARCH = SearchSpec(
+            text_columns=[Student.name],
+            digit_columns=[Student.phone_digits, Student.parent_phone_digits],
+            pinyin_columns=[Student.name_pinyin, Student.name_initials],
+        )
+        query = query.where(STUDENT_SEARCH.condition(search))
+        query = query.order_by(*STUDENT_SEARCH.rank(search, get_dialect_name(db)))
+    """
+
+    def __init__(
+        self,
+        text_columns: Sequence[Any],
+        digit_columns: Sequence[Any] = (),
+        pinyin_columns: Sequence[Any] = (),
+    ):
+        self.text_columns = list(text_columns)
+        self.digit_columns = list(digit_columns)
+        self.pinyin_columns = list(pinyin_columns)
+
+    def _phone_digits(self, term: str) -> Optional[str]:
+        """搜索词像电话号码时返回其数字部分"""
+        if not self.digit_columns or not _PHONE_TERM.match(term):
+            return None
+        digits = digits_only(term)
+        if digits and len(digits) >= MIN_PHONE_DIGITS:
+            return digits
+        return None
+
+    def _pinyin(self, term: str) -> Optional[str]:
+        """搜索词像拼音时返回其小写形式（去掉空格）"""
+        if not self.pinyin_columns or not _PINYIN_TERM.match(term):
+            return None
+        return "".join(term.lower().split()) or None
+
+    def condition(self, term: str) -> ColumnElement:
+        """搜索过滤条件：任一文本列包含搜索词，或任一电话列包含其数字，或拼音列以其开头"""
+        term = term.strip()
+        pattern = f"%{escape_like(term)}%"
+        clauses = [column.ilike(pattern, escape="\\") for column in self.text_columns]
+        digits = self._phone_digits(term)
+        if digits:
+            clauses.extend(column.like(f"%{digits}%") for column in self.digit_columns)
+        letters = self._pinyin(term)
+        if letters:
+            clauses.extend(column.like(f"{letters}%") for column in self.pinyin_columns)
+        return or_(*clauses)
+
+    def rank(self, term: str, dialect: Optional[str] = None) -> List[ColumnElement]:
+        """
+        相关度排序子句（放在列表原有排序之前）。
+
+        Args:
+            term: 搜索词
+            dialect: 数据库方言名，为 postgresql 时追加 pg_trgm 相似度排序
+        """
+        term = term.strip()
+        prefix = f"{escape_like(term)}%"
+        exact = [func.lower(column) == term.lower() for column in self.text_columns]
+        starts = [column.ilike(prefix, escape="\\") for column in self.text_columns]
+        digits = self._phone_digits(term)
+        if digits:
+            exact.extend(column == digits for column in self.digit_columns)
+            starts.extend(column.like(f"{digits}%") for column in self.digit_columns)
+        letters = self._pinyin(term)
+        if letters:
+            exact.extend(column == letters for column in self.pinyin_columns)
+            starts.extend(column.like(f"{letters}%") for column in self.pinyin_columns)
+
+        order = [case((or_(*exact), 0), (or_(*starts), 1), else_=2)]
+        if dialect == "postgresql":
+            similarities = [func.coalesce(func.similarity(column, term), 0) for column in self.text_columns]
+            order.append(func.greatest(*similarities).desc())
+        return order
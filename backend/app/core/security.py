@@ -1,13 +1,23 @@
 """
 Security utilities: JWT tokens and password hashing.
 """
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +33,96 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordWorkPool:
+    """
+    密码哈希专用线程池。
+    bcrypt 每次计算约几百毫秒，放到线程池中执行避免阻塞事件循环；
+    线程数即并发上限，排队数超过上限时直接拒绝（503），登录高峰时优雅降级。
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password"
+            )
+        return self._executor
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """在线程池中执行，排队已满时抛出 ServiceUnavailableException"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ServiceUnavailableException()
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        future = self._get_executor().submit(self._run, fn, *args)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future) -> None:
+        """等待方被取消（如客户端断开）时排队中的任务不会执行，在这里归还排队名额"""
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        """线程池统计信息"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "peak_queued": self.peak_queued,
+        }
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_pool = PasswordWorkPool(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the password worker pool (不阻塞事件循环)."""
+    return await password_pool.submit(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the password worker pool (不阻塞事件循环)."""
+    return await password_pool.submit(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(
     data: dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -93,9 +193,56 @@ def create_refresh_token(
     )
 
 
+def _load_token_decoder() -> Tuple[Callable[[str], dict], Tuple[type, ...]]:
+    """
+    选择 JWT 解码实现：settings.jwt_backend 为 "pyjwt" 且已安装 PyJWT 时使用 PyJWT（解码更快），
+    否则使用 python-jose。两者签发的令牌格式一致，可以互相校验。
+    """
+    if settings.jwt_backend == "pyjwt":
+        try:
+            import jwt as pyjwt
+        except ImportError:
+            logger.warning("未安装 PyJWT，令牌校验使用 python-jose")
+        else:
+            def decode_pyjwt(token: str) -> dict:
+                return pyjwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            return decode_pyjwt, (pyjwt.PyJWTError,)
+
+    def decode_jose(token: str) -> dict:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    return decode_jose, (JWTError,)
+
+
+_decode_token, _decode_errors = _load_token_decoder()
+
+# 已校验令牌缓存：令牌摘要 -> payload，条目在令牌 exp 时过期
+_token_cache = TTLCache("verified_tokens", maxsize=settings.token_cache_max_entries)
+
+
+def _decode_cached(token: str) -> Optional[dict[str, Any]]:
+    """校验并解码令牌，校验通过的结果按令牌摘要缓存到过期时间"""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    try:
+        payload = _decode_token(token)
+    except _decode_errors:
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = exp - time.time()
+        if ttl > 0:
+            _token_cache.set(digest, payload, ttl=ttl)
+    return payload
+
+
 def verify_token(token: str, token_type: str = "access") -> Optional[dict[str, Any]]:
     """
     Verify and decode a JWT token.
+    同一令牌重复校验时直接返回缓存的 payload（不重复验签），缓存在令牌过期时失效。
 
     Args:
         token: JWT token string
@@ -104,18 +251,13 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict[str, A
     Returns:
         Decoded payload if valid, None otherwise
     """
-    try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm]
-        )
-
-        # Verify token type
-        if payload.get("type") != token_type:
-            return None
-
-        return payload
+    payload = _decode_cached(token)
+    if payload is None:
+        return None
 
-    except JWTError:
+    # Verify token type
+    if payload.get("type") != token_type:
         return None
+
+    # 返回副本，避免调用方修改缓存内容
+    return dict(payload)
@@ -0,0 +1,192 @@
+"""
+Time series helpers for dashboard trends.
+仪表盘趋势数据的公共时间序列引擎：
+1. 根据时间范围自动选择粒度（日/周/月）
+2. 在数据库中按粒度分桶聚合（兼容 PostgreSQL 与 SQLite）
+3. 用日期序号批量生成桶序列补齐空缺，直接输出 dict，不逐点构建 Pydantic 对象
+"""
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Date, DateTime, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_dialect_name
+
+GRANULARITIES = ("day", "week", "month")
+
+# 自动选择粒度的阈值（按天数）
+DAY_GRANULARITY_MAX_DAYS = 62
+WEEK_GRANULARITY_MAX_DAYS = 366
+
+
+def choose_granularity(start: date, end: date) -> str:
+    """
+    根据时间范围长度选择粒度：
+    - 两个月以内按日
+    - 一年以内按周
+    - 超过一年按月
+    """
+    days = (end - start).days + 1
+    if days <= DAY_GRANULARITY_MAX_DAYS:
+        return "day"
+    if days <= WEEK_GRANULARITY_MAX_DAYS:
+        return "week"
+    return "month"
+
+
+def bucket_start(d: date, granularity: str) -> date:
+    """获取日期所在桶的起始日期（周从周一开始）"""
+    if granularity == "week":
+        return date.fromordinal(d.toordinal() - d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+
+def shift_months(d: date, months: int) -> date:
+    """按月偏移日期，返回偏移后月份的1号"""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bucket_dates(start: date, end: date, granularity: str) -> List[date]:
+    """生成 [start, end] 范围内所有桶的起始日期"""
+    first = bucket_start(start, granularity)
+    if granularity == "month":
+        months = (end.year - first.year) * 12 + (end.month - first.month) + 1
+        return [shift_months(first, i) for i in range(months)]
+    step = 7 if granularity == "week" else 1
+    return [date.fromordinal(o) for o in range(first.toordinal(), end.toordinal() + 1, step)]
+
+
+def bucket_expression(column: Any, granularity: str, dialect: str) -> Any:
+    """
+    构建按粒度分桶的 SQL 表达式。
+    PostgreSQL 使用 date_trunc，SQLite 使用 date() 修饰符。
+    """
+    if dialect == "postgresql":
+        if granularity == "day":
+            return cast(column, Date)
+        return cast(func.date_trunc(granularity, column), Date)
+
+    if granularity == "week":
+        # 先回退6天再取下一个周一，即本周周一
+        return func.date(column, "-6 days", "weekday 1")
+    if granularity == "month":
+        return func.date(column, "start of month")
+    return func.date(column)
+
+
+def as_date(value: Any) -> date:
+    """统一数据库返回的桶值（SQLite 返回字符串，PostgreSQL 返回 date）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class TimeSeries:
+    """
+    补齐空缺后的时间序列。
+    可输出为点列表（兼容 TrendDataPoint 结构）或紧凑的列式结构。
+    """
+
+    def __init__(self, granularity: str, dates: List[date], values: List[float]):
+        self.granularity = granularity
+        self.dates = dates
+        self.values = values
+
+    def _date_strings(self) -> List[str]:
+        fmt = "%Y-%m" if self.granularity == "month" else "%Y-%m-%d"
+        return [d.strftime(fmt) for d in self.dates]
+
+    def _labels(self) -> List[str]:
+        if self.granularity == "month":
+            return [f"{d.month}月" for d in self.dates]
+        return [d.strftime("%m-%d") for d in self.dates]
+
+    def scaled(self, factor: float) -> "TimeSeries":
+        """返回按系数缩放后的新序列（如课时 × 课时单价 = 收入）"""
+        return TimeSeries(self.granularity, self.dates, [v * factor for v in self.values])
+
+    def to_points(self) -> List[dict]:
+        """点列表格式：[{"date", "value", "label"}, ...]"""
+        return [
+            {"date": d, "value": v, "label": label}
+            for d, v, label in zip(self._date_strings(), self.values, self._labels())
+        ]
+
+    def to_columnar(self) -> dict:
+        """列式格式：{"granularity", "dates": [...], "values": [...], "labels": [...]}"""
+        return {
+            "granularity": self.granularity,
+            "dates": self._date_strings(),
+            "values": list(self.values),
+            "labels": self._labels(),
+        }
+
+    def render(self, series_format: str = "points") -> Any:
+        """按请求的输出格式渲染"""
+        if series_format == "columnar":
+            return self.to_columnar()
+        return self.to_points()
+
+
+def fill_series(
+    rows: Iterable[Sequence[Any]],
+    start: date,
+    end: date,
+    granularity: str,
+) -> TimeSeries:
+    """
+    将 (bucket, value) 聚合行补齐为完整的时间序列，没有数据的桶填0。
+    """
+    data = {as_date(bucket): float(value or 0) for bucket, value in rows}
+    dates = bucket_dates(start, end, granularity)
+    return TimeSeries(granularity, dates, [data.get(d, 0.0) for d in dates])
+
+
+async def fetch_series(
+    db: AsyncSession,
+    date_column: Any,
+    value_expression: Any,
+    start: date,
+    end: date,
+    granularity: Optional[str] = None,
+    conditions: Sequence[Any] = (),
+) -> TimeSeries:
+    """
+    按时间范围和粒度查询聚合值并补齐空缺。
+
+    Args:
+        db: 数据库会话
+        date_column: 用于分桶的日期/时间列
+        value_expression: 聚合表达式（如 func.count(Model.id)、func.sum(Model.amount)）
+        start: 开始日期（含）
+        end: 结束日期（含）
+        granularity: day/week/month，为空时根据范围自动选择
+        conditions: 额外的过滤条件
+
+    Returns:
+        补齐后的 TimeSeries
+    """
+    granularity = granularity or choose_granularity(start, end)
+    bucket = bucket_expression(date_column, granularity, get_dialect_name(db)).label("bucket")
+
+    if isinstance(date_column.type, DateTime):
+        range_conditions = [
+            date_column >= datetime.combine(start, datetime.min.time()),
+            date_column <= datetime.combine(end, datetime.max.time()),
+        ]
+    else:
+        range_conditions = [date_column >= start, date_column <= end]
+
+    query = (
+        select(bucket, value_expression.label("value"))
+        .where(*range_conditions, *conditions)
+        .group_by(bucket)
+    )
+    result = await db.execute(query)
+    return fill_series(result.all(), start, end, granularity)
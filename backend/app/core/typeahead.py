@@ -0,0 +1,300 @@
+"""
+In-process typeahead indexes for dropdown endpoints.
+下拉列表输入联想：按校区在进程内建立姓名/拼音/电话的前缀索引和姓名 n-gram 索引，
+?q= 查询只在内存中筛选出前 K 个ID，再按ID从数据库取这几行，避免下发整张表。
+
+一致性：
+- 索引按 system_versions 中各校区的联想版本号（如 student_typeahead:3）缓存，其他工作进程修改数据后
+  该校区的版本号变化，本进程只重建该校区的索引；全部校区的索引按各校区版本号之和缓存；
+- 只有联想用到的字段（姓名、拼音、电话、筛选属性、所属校区）变化时才递增版本号，
+  课时、人数等其他字段的修改不影响索引；
+- 本进程的写操作在事务提交后增量更新已建好的索引（回滚则丢弃），不触发重建。
+"""
+import heapq
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.search import digits_only
+from app.core.versions import bump_scoped_versions, get_scoped_stamp, get_version
+
+# 匹配程度：完全匹配 > 前缀匹配（含电话号码尾号）> 姓名包含
+_EXACT, _PREFIX, _CONTAINS = 0, 1, 2
+# 电话号码倒序键的前缀，支持按尾号匹配（'<1000' 对应以 0001 结尾）
+_SUFFIX_MARK = "<"
+# session.info 中待提交后应用的索引变更
+_PENDING_KEY = "typeahead_pending"
+
+
+def normalize_query(value: str) -> str:
+    """查询词规范化：小写、去掉空白"""
+    return "".join(value.lower().split())
+
+
+def _grams(text: str) -> Set[str]:
+    """姓名的单字和相邻双字"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TypeaheadEntry:
+    """索引中的一条记录：匹配用的键和筛选用的属性"""
+
+    __slots__ = ("id", "name", "scope", "keys", "attrs")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        scope: Optional[int] = None,
+        aliases: Iterable[Optional[str]] = (),
+        phones: Iterable[Optional[str]] = (),
+        attrs: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            id: 记录ID
+            name: 名称（前缀匹配和包含匹配）
+            scope: 所属范围（校区ID）
+            aliases: 其他前缀匹配的键，如拼音全拼、首字母
+            phones: 电话号码（按纯数字做前缀和尾号匹配）
+            attrs: 筛选属性，如 {"is_active": True}
+        """
+        self.id = id
+        self.name = normalize_query(name or "")
+        self.scope = scope
+        keys = {self.name}
+        keys.update(normalize_query(alias) for alias in aliases if alias)
+        for phone in phones:
+            digits = digits_only(phone)
+            if digits:
+                keys.add(digits)
+                keys.add(_SUFFIX_MARK + digits[::-1])
+        self.keys = tuple(key for key in keys if key)
+        self.attrs = attrs or {}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TypeaheadEntry):
+            return NotImplemented
+        return (
+            (self.id, self.name, self.scope, self.attrs) == (other.id, other.name, other.scope, other.attrs)
+            and set(self.keys) == set(other.keys)
+        )
+
+    __hash__ = None
+
+    def matches(self, filters: Dict[str, Any]) -> bool:
+        return all(self.attrs.get(field) == value for field, value in filters.items())
+
+
+class TypeaheadIndex:
+    """一个范围（校区）内的索引：有序键列表做前缀查找，姓名 n-gram 倒排表做包含查找"""
+
+    def __init__(self, entries: Iterable[TypeaheadEntry] = ()):
+        self._entries: Dict[int, TypeaheadEntry] = {}
+        self._keys: List[Tuple[str, int]] = []
+        self._grams: Dict[str, Set[int]] = {}
+        pairs = []
+        for entry in entries:
+            self._entries[entry.id] = entry
+            pairs.extend((key, entry.id) for key in entry.keys)
+            self._index_grams(entry)
+        pairs.sort()
+        self._keys = pairs
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _index_grams(self, entry: TypeaheadEntry) -> None:
+        for gram in _grams(entry.name):
+            self._grams.setdefault(gram, set()).add(entry.id)
+
+    def add(self, entry: TypeaheadEntry) -> None:
+        """新增或替换一条记录"""
+        self.remove(entry.id)
+        self._entries[entry.id] = entry
+        for key in entry.keys:
+            insort(self._keys, (key, entry.id))
+        self._index_grams(entry)
+
+    def remove(self, entry_id: int) -> None:
+        """删除一条记录（不存在时忽略）"""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry.keys:
+            i = bisect_left(self._keys, (key, entry_id))
+            if i < len(self._keys) and self._keys[i] == (key, entry_id):
+                del self._keys[i]
+        for gram in _grams(entry.name):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def _scan_prefix(self, prefix: str, rank: int, found: Dict[int, int], budget: int) -> None:
+        """收集以 prefix 开头的键，最多 budget 个"""
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(found) < budget:
+            key, entry_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            score = _EXACT if key == prefix and rank == _PREFIX else rank
+            found[entry_id] = min(found.get(entry_id, score), score)
+            i += 1
+
+    def search(self, query: str, limit: int, filters: Optional[Dict[str, Any]] = None) -> List[int]:
+        """
+        返回最匹配的 limit 个ID。
+        排序：匹配程度，其次姓名长度、姓名、ID；每次最多考察 typeahead_max_candidates 个候选。
+        """
+        query = normalize_query(query)
+        if not query:
+            return []
+        budget = settings.typeahead_max_candidates
+        found: Dict[int, int] = {}
+        self._scan_prefix(query, _PREFIX, found, budget)
+        if query.isdigit():
+            self._scan_prefix(_SUFFIX_MARK + query[::-1], _PREFIX, found, budget)
+
+        # 姓名包含：用 n-gram 倒排表取候选，再逐个确认
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = [self._grams.get(gram) for gram in grams]
+        if all(postings):
+            candidates = set.intersection(*sorted(postings, key=len))
+            for entry_id in candidates:
+                if len(found) >= budget:
+                    break
+                if entry_id not in found and query in self._entries[entry_id].name:
+                    found[entry_id] = _CONTAINS
+
+        filters = filters or {}
+        ranked = (
+            (score, len(entry.name), entry.name, entry.id)
+            for entry_id, score in found.items()
+            for entry in (self._entries[entry_id],)
+            if entry.matches(filters)
+        )
+        return [item[3] for item in heapq.nsmallest(limit, ranked)]
+
+
+class Typeahead:
+    """
+    一类实体的输入联想索引，按范围（校区ID，None 表示全部）分别建立。
+
+    Args:
+        name: 缓存名称
+        version_key: system_versions 中的版本号类别，联想用到的字段变化时按校区递增
+        load: async (db, scope) -> 该范围内全部记录的 TypeaheadEntry 列表
+        to_entry: ORM 对象 -> TypeaheadEntry（写操作增量更新时使用）
+        scoped: 是否按校区建立索引；为 False 时只有一个全局索引，使用 version_key 本身的版本号
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version_key: str,
+        load: Callable[[AsyncSession, Optional[int]], Any],
+        to_entry: Callable[[Any], TypeaheadEntry],
+        scoped: bool = True,
+    ):
+        self.version_key = version_key
+        self.scoped = scoped
+        self._load = load
+        self._to_entry = to_entry
+        # 范围 -> (版本号, 索引)
+        self._scopes = TTLCache(name, maxsize=settings.typeahead_max_scopes)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        scope: Optional[int] = None,
+        **filters: Any,
+    ) -> List[int]:
+        """在范围内查询最匹配的 limit 个ID（索引过期或未建立时先从数据库加载）"""
+        if self.scoped:
+            version = (await get_scoped_stamp(db, self.version_key, scope))[0]
+        else:
+            version = await get_version(db, self.version_key)
+        cached = self._scopes.get(scope)
+        if cached is None or cached[0] != version:
+            cached = (version, TypeaheadIndex(await self._load(db, scope)))
+            self._scopes.set(scope, cached)
+        return cached[1].search(query, limit, filters)
+
+    def entry(self, obj: Any) -> TypeaheadEntry:
+        """ORM 对象在索引中的记录；修改前取一份，传给 changed 的 previous"""
+        return self._to_entry(obj)
+
+    async def changed(self, db: AsyncSession, obj: Any, previous: Optional[TypeaheadEntry] = None) -> None:
+        """
+        记录新增或修改（调用前需 flush 以获得ID），事务提交后更新索引。
+        修改时传入修改前的 previous：联想用到的字段都没变时不递增版本号；改了校区时两个校区都递增。
+        """
+        entry = self._to_entry(obj)
+        if previous is not None and previous == entry:
+            return
+        await self._record(db, entry.id, entry, previous)
+
+    async def removed(self, db: AsyncSession, obj: Any) -> None:
+        """记录删除，事务提交后从索引移除"""
+        await self._record(db, obj.id, None, self._to_entry(obj))
+
+    async def _record(
+        self,
+        db: AsyncSession,
+        entry_id: int,
+        entry: Optional[TypeaheadEntry],
+        previous: Optional[TypeaheadEntry],
+    ) -> None:
+        scopes = [e.scope if self.scoped else None for e in (previous, entry) if e is not None]
+        versions = await bump_scoped_versions(db, self.version_key, scopes)
+        db.sync_session.info.setdefault(_PENDING_KEY, []).append((self, versions, entry_id, entry))
+
+    def _apply(self, versions: Dict[Optional[int], int], entry_id: int, entry: Optional[TypeaheadEntry]) -> None:
+        """
+        增量更新已建立的索引（versions 为本次修改递增后的各校区版本号）。
+        索引版本等于新版本时也要更新：提交前有其他请求按新版本号重建了索引，但读不到未提交的修改。
+        索引落后不止一个版本（有其他进程的修改）时留待下次查询重建；
+        全部校区的索引按版本号之和缓存，无法判断是否只落后本次修改，同样留待下次查询重建。
+        """
+        for scope, (cached_version, index) in self._scopes.items():
+            version = versions.get(scope)
+            if version is None or (scope is None and self.scoped):
+                continue
+            if cached_version not in (version - 1, version):
+                continue
+            index.remove(entry_id)
+            if entry is not None and (scope is None or entry.scope == scope):
+                index.add(entry)
+            self._scopes.set(scope, (version, index))
+
+    def clear(self) -> None:
+        """清空全部索引"""
+        self._scopes.clear()
+
+
+def rows_in_order(rows: Iterable[Any], ids: List[int]) -> List[Any]:
+    """按联想结果的ID顺序排列从数据库取回的行（已不存在的ID跳过）"""
+    by_id = {row.id: row for row in rows}
+    return [by_id[entry_id] for entry_id in ids if entry_id in by_id]
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    """事务提交后应用本会话记录的索引变更"""
+    for typeahead, versions, entry_id, entry in session.info.pop(_PENDING_KEY, []):
+        typeahead._apply(versions, entry_id, entry)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    """事务回滚时丢弃未应用的索引变更"""
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,153 @@
+"""
+Database-backed version counters for cross-worker cache coherence.
+全局版本号：数据变更时在数据库中递增版本号，各工作进程读取版本号判断本地缓存是否过期。
+读取结果在进程内缓存 version_check_seconds 秒，避免每个请求都查询数据库。
+递增版本号时先移除本进程的缓存，事务提交后才写入新版本号（回滚则不写入），
+避免其他请求在提交前读到新版本号、却按提交前的数据重建缓存。
+版本号同时记录最后变更时间，用于参考数据接口的 ETag / Last-Modified（见 api.deps.ConditionalGet）。
+按校区变更的数据使用校区版本号（类别:校区ID，如 student:3），一个校区的写操作不影响其他校区的缓存。
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.system_version import SystemVersion
+
+# 版本类别
+PERMISSION_VERSION = "permission"
+CAMPUS_VERSION = "campus"
+STUDENT_VERSION = "student"
+TEACHER_VERSION = "teacher"
+CLASS_PLAN_VERSION = "class_plan"
+CLASSROOM_VERSION = "classroom"
+COURSE_VERSION = "course"
+DICT_VERSION = "dict"
+USER_VERSION = "user"
+# 下拉输入联想索引（按校区），只在联想用到的字段变化时递增
+STUDENT_TYPEAHEAD_VERSION = "student_typeahead"
+CLASS_PLAN_TYPEAHEAD_VERSION = "class_plan_typeahead"
+TEACHER_TYPEAHEAD_VERSION = "teacher_typeahead"
+
+# 版本类别 -> (版本号, 最后变更时间)
+_version_cache = TTLCache(
+    "system_versions",
+    maxsize=256,
+    ttl=settings.version_check_seconds,
+)
+
+# 会话中已递增、待提交后发布的版本号
+_PENDING_KEY = "system_versions_pending"
+# 全部校区汇总版本号的缓存键后缀
+_ALL_SCOPES = ":*"
+
+
+def scoped_key(key: str, scope: Optional[int]) -> str:
+    """校区版本类别（类别:校区ID）；scope 为 None 时即类别本身"""
+    return key if scope is None else f"{key}:{scope}"
+
+
+def _all_scopes_key(key: str) -> str:
+    return key.split(":", 1)[0] + _ALL_SCOPES
+
+
+async def get_stamp(db: AsyncSession, key: str) -> Tuple[int, Optional[datetime]]:
+    """
+    获取版本号和最后变更时间（最多延迟 version_check_seconds 秒感知其他进程的变更）。
+    版本记录不存在时视为 (0, None)。
+    """
+    stamp = _version_cache.get(key)
+    if stamp is not None:
+        return stamp
+
+    result = await db.execute(
+        select(
+            SystemVersion.version,
+            func.coalesce(SystemVersion.updated_time, SystemVersion.created_time),
+        ).where(SystemVersion.key == key)
+    )
+    row = result.one_or_none()
+    stamp = (row[0], row[1]) if row else (0, None)
+    _version_cache.set(key, stamp)
+    return stamp
+
+
+async def get_version(db: AsyncSession, key: str) -> int:
+    """获取版本号，版本记录不存在时视为0"""
+    return (await get_stamp(db, key))[0]
+
+
+async def get_scoped_stamp(db: AsyncSession, key: str, scope: Optional[int]) -> Tuple[int, Optional[datetime]]:
+    """
+    获取校区版本号和最后变更时间。
+    scope 为 None 表示全部校区：返回该类别下各校区版本号之和及最后变更时间，任一校区变更都会改变。
+    """
+    if scope is not None:
+        return await get_stamp(db, scoped_key(key, scope))
+
+    all_key = _all_scopes_key(key)
+    stamp = _version_cache.get(all_key)
+    if stamp is not None:
+        return stamp
+
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(SystemVersion.version), 0),
+            func.max(func.coalesce(SystemVersion.updated_time, SystemVersion.created_time)),
+        ).where(or_(SystemVersion.key == key, SystemVersion.key.startswith(f"{key}:", autoescape=True)))
+    )
+    version, modified = result.one()
+    stamp = (int(version), modified)
+    _version_cache.set(all_key, stamp)
+    return stamp
+
+
+async def bump_version(db: AsyncSession, key: str) -> int:
+    """
+    递增版本号并返回新版本号。
+    与业务修改在同一事务中执行，由调用方提交；提交后新版本号才写入本进程缓存。
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(SystemVersion)
+        .where(SystemVersion.key == key)
+        .values(version=SystemVersion.version + 1, updated_time=now)
+        .returning(SystemVersion.version)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        db.add(SystemVersion(key=key, version=1, updated_time=now, created_by="system"))
+        await db.flush()
+        version = 1
+
+    # 提交前其他请求从数据库读取已提交的旧版本号
+    _version_cache.pop(key)
+    _version_cache.pop(_all_scopes_key(key))
+    db.sync_session.info.setdefault(_PENDING_KEY, {})[key] = (version, now)
+    return version
+
+
+async def bump_scoped_versions(
+    db: AsyncSession, key: str, scopes: Iterable[Optional[int]]
+) -> Dict[Optional[int], int]:
+    """递增各校区的版本号（同一校区只递增一次），返回 校区ID -> 新版本号"""
+    return {scope: await bump_version(db, scoped_key(key, scope)) for scope in dict.fromkeys(scopes)}
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    """事务提交后把本会话递增的版本号写入进程内缓存"""
+    for key, stamp in session.info.pop(_PENDING_KEY, {}).items():
+        _version_cache.set(key, stamp)
+        # 汇总版本号在提交前可能已按旧数据重新缓存
+        _version_cache.pop(_all_scopes_key(key))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    """事务回滚时丢弃未提交的版本号"""
+    session.info.pop(_PENDING_KEY, None)
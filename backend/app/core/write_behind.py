@@ -0,0 +1,185 @@
+"""
+Write-behind buffer for login activity.
+登录活动异步写入缓冲：登录日志批量插入，用户的 last_login / is_online 更新按用户合并，
+由后台任务按时间或数量阈值统一落库，登录请求不再同步写热点表。
+
+缓冲未启动（如测试环境、脚本）时退化为在调用方会话中同步写入；
+缓冲已满时同样由调用方同步写入（背压），内存占用有上限。
+落库失败的数据在容量允许时放回缓冲重试，超出容量的部分丢弃并计数。
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import LoginLog, User
+
+logger = logging.getLogger(__name__)
+
+_LOG_COLUMNS = ("user_id", "login_time", "ip_address", "user_agent", "status", "fail_reason")
+
+
+class LoginActivityBuffer:
+    """登录日志与在线状态的异步批量写入缓冲"""
+
+    def __init__(
+        self,
+        flush_seconds: float,
+        flush_size: int,
+        max_entries: int,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        self.flush_seconds = flush_seconds
+        self.flush_size = flush_size
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+        self._logs: List[Dict[str, Any]] = []
+        self._presence: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.flushed = 0
+        self.synchronous = 0
+        self.dropped = 0
+        self.failures = 0
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def _pending(self) -> int:
+        return len(self._logs) + len(self._presence)
+
+    def _accepts(self, user_id: Optional[int] = None) -> bool:
+        """缓冲已启动且未满（已有待写记录的用户合并写入，不占用新容量）"""
+        if not self.started:
+            return False
+        return user_id in self._presence or self._pending() < self.max_entries
+
+    def _notify(self) -> None:
+        if self._pending() >= self.flush_size:
+            self._wakeup.set()
+
+    async def add_log(self, db: AsyncSession, log: LoginLog) -> None:
+        """记录一条登录日志"""
+        if not self._accepts():
+            self.synchronous += 1
+            db.add(log)
+            return
+
+        row = {column: getattr(log, column) for column in _LOG_COLUMNS}
+        if row["login_time"] is None:
+            row["login_time"] = datetime.now(timezone.utc)
+        self._logs.append(row)
+        self._notify()
+
+    async def set_presence(self, db: AsyncSession, user_id: int, **values: Any) -> None:
+        """
+        更新用户在线状态字段（is_online、last_login）。
+        同一用户的多次更新在落库前合并，后写入的值覆盖先写入的值。
+        """
+        if not self._accepts(user_id):
+            self.synchronous += 1
+            await db.execute(update(User).where(User.id == user_id).values(**values))
+            return
+
+        self._presence.setdefault(user_id, {}).update(values)
+        self._notify()
+
+    async def flush(self) -> None:
+        """将缓冲中的数据写入数据库"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            logs, self._logs = self._logs, []
+            presence, self._presence = self._presence, {}
+            if not logs and not presence:
+                return
+
+            session_factory = self._session_factory
+            if session_factory is None:
+                from app.database import async_session_maker
+                session_factory = async_session_maker
+
+            try:
+                async with session_factory() as db:
+                    if logs:
+                        await db.execute(insert(LoginLog), logs)
+                    for user_id, values in presence.items():
+                        await db.execute(
+                            update(User).where(User.id == user_id).values(**values)
+                        )
+                    await db.commit()
+            except Exception:
+                self.failures += 1
+                logger.exception("登录活动写入失败")
+                self._requeue(logs, presence)
+                return
+
+            self.flushed += len(logs) + len(presence)
+
+    def _requeue(self, logs: List[Dict[str, Any]], presence: Dict[int, Dict[str, Any]]) -> None:
+        """落库失败时放回缓冲，超出容量的部分丢弃"""
+        for user_id, values in presence.items():
+            # 失败期间产生的新值优先
+            merged = {**values, **self._presence.get(user_id, {})}
+            if user_id in self._presence or self._pending() < self.max_entries:
+                self._presence[user_id] = merged
+            else:
+                self.dropped += 1
+
+        room = max(self.max_entries - self._pending(), 0)
+        self.dropped += max(len(logs) - room, 0)
+        self._logs[:0] = logs[:room]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # 停止时不中断进行中的写入，stop() 会等待其完成
+            await asyncio.shield(self.flush())
+
+    def start(self) -> None:
+        """启动后台写入任务（需在事件循环中调用）"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台写入任务并写入剩余数据"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def stats(self) -> dict:
+        """缓冲状态（用于健康检查）"""
+        return {
+            "started": self.started,
+            "pending_logs": len(self._logs),
+            "pending_presence": len(self._presence),
+            "flushed": self.flushed,
+            "synchronous": self.synchronous,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+login_activity = LoginActivityBuffer(
+    flush_seconds=settings.login_buffer_flush_seconds,
+    flush_size=settings.login_buffer_flush_size,
+    max_entries=settings.login_buffer_max_entries,
+)
@@ -47,6 +47,14 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_dialect_name(db: AsyncSession) -> str:
+    """
+    Get the SQL dialect name of a session's bind ("postgresql", "sqlite", ...).
+    用于在统计查询中区分 PostgreSQL 专有语法与测试环境的 SQLite 兼容写法。
+    """
+    return db.get_bind().dialect.name
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
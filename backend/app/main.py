@@ -12,6 +12,9 @@ from app.api.v1.router import api_router
 from app.config import settings
 from app.core.exceptions import CourseManagerException
 from app.core.scheduler import start_scheduler, shutdown_scheduler, get_scheduler_status
+from app.core.rate_limit import login_throttle
+from app.core.security import password_pool
+from app.core.write_behind import login_activity
 from app.database import close_db, init_db
 
 
@@ -29,12 +32,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     start_scheduler()
     print("Scheduler started")
 
+    # 登录日志、在线状态异步批量写入
+    login_activity.start()
+
     yield
 
     # Shutdown
     print("Shutting down...")
     shutdown_scheduler()
     print("Scheduler stopped")
+    password_pool.shutdown()
+    await login_activity.stop()
+    print("Login activity flushed")
     await close_db()
     print("Database connections closed")
 
@@ -115,6 +124,9 @@ async def health_check():
         "app": settings.app_name,
         "version": settings.app_version,
         "scheduler": get_scheduler_status(),
+        "password_pool": password_pool.stats(),
+        "login_activity": login_activity.stats(),
+        "login_throttle": login_throttle.stats(),
     }
 
 
@@ -14,6 +14,7 @@ from app.models.schedule import Schedule
 from app.models.lesson_record import LessonRecord
 from app.models.student_attendance import StudentAttendance
 from app.models.permission import Resource, Permission, UserRole, RolePermission
+from app.models.system_version import SystemVersion
 
 __all__ = [
     "BaseModel",
@@ -37,4 +38,5 @@ __all__ = [
     "Permission",
     "UserRole",
     "RolePermission",
+    "SystemVersion",
 ]
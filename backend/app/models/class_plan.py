@@ -4,9 +4,10 @@ Class plan model - scheduled course offerings.
 from datetime import date
 from typing import Optional
 
-from sqlalchemy import Boolean, Date, Integer, Numeric, String, Text, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Boolean, Date, Integer, Numeric, String, Text, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core.search import name_pinyin
 from app.models.base import BaseModel
 
 
@@ -16,6 +17,11 @@ class ClassPlan(BaseModel):
     A course product can have multiple class plans (different sessions/terms).
     """
     __tablename__ = "class_plans"
+    __table_args__ = (
+        # text_pattern_ops 使 PostgreSQL 的 LIKE 'zs%' 前缀查询可以走索引
+        Index("ix_class_plans_name_pinyin", "name_pinyin", postgresql_ops={"name_pinyin": "text_pattern_ops"}),
+        Index("ix_class_plans_name_initials", "name_initials", postgresql_ops={"name_initials": "text_pattern_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(
@@ -23,6 +29,16 @@ class ClassPlan(BaseModel):
         nullable=False,
         comment="班级名称"
     )
+    name_pinyin: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="班级名称拼音全拼（搜索用）"
+    )
+    name_initials: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+        comment="班级名称拼音首字母（搜索用）"
+    )
     course_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("courses.id", ondelete="RESTRICT"),
@@ -109,5 +125,11 @@ class ClassPlan(BaseModel):
     campus = relationship("Campus", foreign_keys=[campus_id])
     classroom = relationship("Classroom", foreign_keys=[classroom_id])
 
+    @validates("name")
+    def _sync_name_pinyin(self, key: str, value: str) -> str:
+        """班级名称变更时同步拼音列（搜索用）"""
+        self.name_pinyin, self.name_initials = name_pinyin(value)
+        return value
+
     def __repr__(self) -> str:
         return f"<ClassPlan(id={self.id}, name={self.name})>"
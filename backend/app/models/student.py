@@ -5,10 +5,11 @@ from datetime import date
 from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Date, Integer, String, Text, Numeric, ForeignKey
+from sqlalchemy import Boolean, Date, Integer, String, Text, Numeric, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core.search import digits_only, name_pinyin
 from app.models.base import BaseModel
 
 
@@ -18,6 +19,11 @@ class Student(BaseModel):
     每个学生归属于一个校区，校区管理员只能管理自己校区的学生。
     """
     __tablename__ = "students"
+    __table_args__ = (
+        # text_pattern_ops 使 PostgreSQL 的 LIKE 'zs%' 前缀查询可以走索引
+        Index("ix_students_name_pinyin", "name_pinyin", postgresql_ops={"name_pinyin": "text_pattern_ops"}),
+        Index("ix_students_name_initials", "name_initials", postgresql_ops={"name_initials": "text_pattern_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     # Optional link to user account for student login
@@ -42,6 +48,16 @@ class Student(BaseModel):
         index=True,
         comment="学生姓名"
     )
+    name_pinyin: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="姓名拼音全拼（搜索用）"
+    )
+    name_initials: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+        comment="姓名拼音首字母（搜索用）"
+    )
     gender: Mapped[Optional[str]] = mapped_column(
         String(10),
         nullable=True,
@@ -58,6 +74,11 @@ class Student(BaseModel):
         index=True,
         comment="联系电话"
     )
+    phone_digits: Mapped[Optional[str]] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="联系电话纯数字（搜索用）"
+    )
     parent_name: Mapped[Optional[str]] = mapped_column(
         String(50),
         nullable=True,
@@ -68,6 +89,11 @@ class Student(BaseModel):
         nullable=True,
         comment="家长电话"
     )
+    parent_phone_digits: Mapped[Optional[str]] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="家长电话纯数字（搜索用）"
+    )
     school: Mapped[Optional[str]] = mapped_column(
         String(100),
         nullable=True,
@@ -141,5 +167,17 @@ class Student(BaseModel):
     user = relationship("User", foreign_keys=[user_id])
     campus = relationship("Campus", foreign_keys=[campus_id])
 
+    @validates("name")
+    def _sync_name_pinyin(self, key: str, value: str) -> str:
+        """姓名变更时同步拼音列（搜索用）"""
+        self.name_pinyin, self.name_initials = name_pinyin(value)
+        return value
+
+    @validates("phone", "parent_phone")
+    def _sync_phone_digits(self, key: str, value: Optional[str]) -> Optional[str]:
+        """电话号码变更时同步纯数字列（搜索用）"""
+        setattr(self, f"{key}_digits", digits_only(value))
+        return value
+
     def __repr__(self) -> str:
         return f"<Student(id={self.id}, name={self.name})>"
@@ -0,0 +1,28 @@
+"""
+System version counters.
+全局版本号：某类数据发生变更时递增，各工作进程据此判断本地缓存是否过期。
+"""
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class SystemVersion(BaseModel):
+    """
+    System version counter model.
+    key 为数据类别（如 permission），version 每次变更加1。
+    """
+    __tablename__ = "system_versions"
+
+    key: Mapped[str] = mapped_column(
+        String(50),
+        primary_key=True,
+        comment="版本类别"
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+        comment="版本号"
+    )
@@ -6,8 +6,9 @@ from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
 
 from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core.search import digits_only
 from app.models.base import BaseModel
 
 if TYPE_CHECKING:
@@ -52,6 +53,11 @@ class User(BaseModel):
         nullable=True,
         comment="手机号"
     )
+    phone_digits: Mapped[Optional[str]] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="手机号纯数字（搜索用）"
+    )
     hashed_password: Mapped[str] = mapped_column(
         String(255),
         nullable=False,
@@ -121,6 +127,12 @@ class User(BaseModel):
     # teacher: Mapped[Optional["Teacher"]] = relationship(back_populates="user")
     # student: Mapped[Optional["Student"]] = relationship(back_populates="user")
 
+    @validates("phone")
+    def _sync_phone_digits(self, key: str, value: Optional[str]) -> Optional[str]:
+        """电话号码变更时同步纯数字列（搜索用）"""
+        self.phone_digits = digits_only(value)
+        return value
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username={self.username}, role={self.role})>"
 
@@ -0,0 +1,40 @@
+"""
+Composite batch request schemas.
+"""
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# 单次批量请求最多的子请求数
+BATCH_MAX_REQUESTS = 20
+
+
+class BatchSubRequest(BaseModel):
+    """批量请求中的一个 GET 子请求"""
+    id: str = Field(..., min_length=1, max_length=64, description="子请求标识，原样返回")
+    path: str = Field(
+        ...,
+        min_length=1,
+        description="接口路径（相对 /api/v1，可带查询参数），如 /dict/items/grade?active_only=true",
+    )
+
+
+class BatchRequest(BaseModel):
+    """Schema for composite batch requests."""
+    requests: List[BatchSubRequest] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_REQUESTS, description="子请求列表"
+    )
+
+    @field_validator("requests")
+    @classmethod
+    def ids_unique(cls, v: List[BatchSubRequest]) -> List[BatchSubRequest]:
+        if len({item.id for item in v}) != len(v):
+            raise ValueError("子请求标识不能重复")
+        return v
+
+
+class BatchSubResponse(BaseModel):
+    """子请求的结果：status 为子请求的 HTTP 状态码，body 为其响应体"""
+    id: str
+    status: int
+    body: Optional[Any] = None
@@ -1,9 +1,9 @@
 """
 Common Pydantic schemas for API responses.
 """
-from typing import Any, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 T = TypeVar("T")
 
@@ -38,6 +38,30 @@ class MessageResponse(BaseModel):
     message: str
 
 
+# 批量按ID查询单次最多的ID数
+BATCH_GET_MAX_IDS = 100
+
+
+class BatchGetRequest(BaseModel):
+    """
+    按ID列表批量查询（POST /<entity>/batch-get）。
+    返回当前用户可见的记录，按请求的ID顺序排列；不存在或无权访问的ID放在 missing_ids 中。
+    """
+
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS, description="ID列表")
+
+    @property
+    def unique_ids(self) -> List[int]:
+        """去重后的ID，保持请求顺序"""
+        return list(dict.fromkeys(self.ids))
+
+    def arrange(self, items: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """按请求顺序排列查询结果，同时返回未找到的ID"""
+        by_id = {item["id"]: item for item in items}
+        ids = self.unique_ids
+        return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+
 class ErrorResponse(BaseModel):
     """Error response format."""
 
@@ -48,14 +72,15 @@ class ErrorResponse(BaseModel):
 
 # ========== 统一响应辅助函数 ==========
 
-def success_response(data: Any = None, message: str = "success", total: int = None, page: int = None, page_size: int = None) -> ResponseModel:
+def success_response(data: Any = None, message: str = "success", total: int = None, page: int = None, page_size: int = None, next_cursor: str = None) -> ResponseModel:
     """
     统一成功响应格式。
     - data: dict 类型 (如 {"items": [...], "total": 100})
     - data 是 list 时，会自动放入 data.items
-    - total: 分页总数（兼容旧接口）
+    - total: 分页总数（兼容旧接口；未统计总数时为 None）
     - page: 当前页码
     - page_size: 每页数量
+    - next_cursor: 下一页游标（游标分页，有下一页时才返回）
 
     Args:
         data: 响应数据
@@ -63,16 +88,20 @@ def success_response(data: Any = None, message: str = "success", total: int = No
         total: 分页总数
         page: 当前页码
         page_size: 每页数量
+        next_cursor: 下一页游标
 
     Returns:
         ResponseModel 对象
     """
     # 如果 data 是 list，自动放入 data.items，total 也放入 data
     if isinstance(data, list):
+        payload = {"items": data, "total": total, "page": page, "page_size": page_size}
+        if next_cursor is not None:
+            payload["next_cursor"] = next_cursor
         return ResponseModel(
             code=0,
             message=message,
-            data={"items": data, "total": total, "page": page, "page_size": page_size},
+            data=payload,
         )
     return ResponseModel(
         code=0,
@@ -81,6 +110,12 @@ def success_response(data: Any = None, message: str = "success", total: int = No
     )
 
 
+def batch_get_response(items: List[Any], missing_ids: List[int]) -> ResponseModel:
+    """批量按ID查询的响应：data = {"items": [...], "missing_ids": [...]}"""
+    data: Dict[str, Any] = {"items": items, "missing_ids": missing_ids}
+    return success_response(data)
+
+
 def error_response(code: int, message: str, detail: Any = None) -> ResponseModel:
     """
     统一错误响应格式。
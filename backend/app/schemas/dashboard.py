@@ -8,7 +8,7 @@ Includes schemas for:
 """
 from datetime import date, datetime, time
 from decimal import Decimal
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -37,6 +37,14 @@ class TrendDataPoint(BaseModel):
     label: Optional[str] = Field(None, description="标签（如：周一、1月）")
 
 
+class TrendSeries(BaseModel):
+    """趋势图列式数据（series_format=columnar 时返回）"""
+    granularity: str = Field(..., description="粒度：day/week/month")
+    dates: List[str] = Field(default_factory=list, description="日期（YYYY-MM-DD 或 YYYY-MM）")
+    values: List[float] = Field(default_factory=list, description="数值")
+    labels: List[str] = Field(default_factory=list, description="标签")
+
+
 class DistributionItem(BaseModel):
     """分布图数据项"""
     name: str = Field(..., description="类目名称")
@@ -115,6 +123,23 @@ class StudentLessonRecord(BaseModel):
     notes: Optional[str] = Field(None, description="备注")
 
 
+class StudentTimelineItem(BaseModel):
+    """学生学习记录时间线条目（出勤或课时消耗）"""
+    event_type: str = Field(..., description="事件类型：attendance/lesson")
+    event_id: int = Field(..., description="出勤记录ID或课消记录ID")
+    event_date: date = Field(..., description="事件日期")
+    schedule_id: Optional[int] = Field(None, description="排课ID")
+    class_plan_name: str = Field(..., description="班级名称")
+    course_name: str = Field(..., description="课程名称")
+    teacher_name: Optional[str] = Field(None, description="教师姓名")
+    status: Optional[str] = Field(None, description="出勤状态（仅出勤）")
+    leave_reason: Optional[str] = Field(None, description="请假原因（仅出勤）")
+    deduct_hours: Optional[bool] = Field(None, description="是否扣课时（仅出勤）")
+    hours: Optional[Decimal] = Field(None, description="消耗课时数（仅课消）")
+    type: Optional[str] = Field(None, description="消耗类型（仅课消）")
+    notes: Optional[str] = Field(None, description="备注")
+
+
 class StudentDashboardOverview(BaseModel):
     """学生仪表盘概览"""
     # KPI 卡片
@@ -155,14 +180,20 @@ class StudentDashboardRecords(BaseModel):
         description="出勤统计：{total: 总次数, normal: 正常, leave: 请假, absent: 缺勤}"
     )
 
+    # 出勤与课消合并的时间线（按日期倒序，游标分页）
+    timeline: List[StudentTimelineItem] = Field(
+        default_factory=list, description="学习记录时间线（当前页）"
+    )
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多")
+
     # 近期出勤记录
     recent_attendance: List[StudentAttendanceRecord] = Field(
-        default_factory=list, description="近期出勤记录"
+        default_factory=list, description="出勤记录（当前页）"
     )
 
     # 课时消耗记录
     lesson_records: List[StudentLessonRecord] = Field(
-        default_factory=list, description="课时消耗记录"
+        default_factory=list, description="课时消耗记录（当前页）"
     )
 
     # 课时消耗趋势（按月）
@@ -264,12 +295,12 @@ class TeacherDashboardIncome(BaseModel):
     hourly_rate: KpiCard = Field(..., description="课时单价")
 
     # 收入趋势（按月）
-    income_trend: List[TrendDataPoint] = Field(
+    income_trend: Union[List[TrendDataPoint], TrendSeries] = Field(
         default_factory=list, description="收入趋势"
     )
 
     # 课时趋势（按月）
-    hours_trend: List[TrendDataPoint] = Field(
+    hours_trend: Union[List[TrendDataPoint], TrendSeries] = Field(
         default_factory=list, description="课时趋势"
     )
 
@@ -118,4 +118,5 @@ class OnlineUserResponse(BaseModel):
     username: str
     role: str
     last_login: Optional[datetime] = None
+    last_seen: Optional[datetime] = None  # 最近访问时间
     avatar: Optional[str] = None
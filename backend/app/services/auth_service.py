@@ -8,16 +8,21 @@ from sqlalchemy import select, update, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.campus_directory import get_active_campus, get_active_campuses
 from app.core.exceptions import BadRequestException, UnauthorizedException, ForbiddenException
+from app.core.permission_mask import build_permission_claims
+from app.core.presence import presence
+from app.core.rate_limit import login_throttle
+from app.core.search import digits_only
+from app.core.write_behind import login_activity
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     verify_token,
 )
 from app.models.user import LoginLog, User
-from app.models.campus import Campus
 from app.models.class_plan import ClassPlan
 from app.models.student import Student
 from app.models.teacher import Teacher
@@ -58,12 +63,10 @@ class AuthService:
         # Teacher: show all active campuses for selection
         # 教师可以跨校区上课，登录时直接显示所有校区让他选择
         if role_code == "teacher":
-            result = await self.db.execute(
-                select(Campus)
-                .where(Campus.is_active == True)
-                .order_by(Campus.sort_order, Campus.name)
+            campuses = sorted(
+                await get_active_campuses(self.db),
+                key=lambda c: (c.sort_order, c.name),
             )
-            campuses = result.scalars().all()
 
             if len(campuses) == 0:
                 # No campuses exist, skip selection
@@ -78,12 +81,7 @@ class AuthService:
 
         # Super admin: get all active campuses
         if role_code == "super_admin" or (user.role == "admin" and not user.role_id):
-            result = await self.db.execute(
-                select(Campus)
-                .where(Campus.is_active == True)
-                .order_by(Campus.name)
-            )
-            campuses = result.scalars().all()
+            campuses = sorted(await get_active_campuses(self.db), key=lambda c: c.name)
 
             if len(campuses) == 0:
                 # No campuses, skip selection
@@ -99,6 +97,14 @@ class AuthService:
         # Default: no campus restriction
         return False, [], None
 
+    async def _create_access_token(self, user: User, token_data: dict) -> str:
+        """
+        Create an access token with the role's permission bitmask embedded.
+        令牌中附带角色权限位图和权限版本号，鉴权时无需查询角色权限。
+        """
+        claims = await build_permission_claims(self.db, user.role_id)
+        return create_access_token({**token_data, **claims})
+
     async def authenticate_user(
         self,
         username: str,
@@ -120,7 +126,20 @@ class AuthService:
 
         Raises:
             UnauthorizedException: If authentication fails
+            TooManyRequestsException: If login attempts are throttled
         """
+        # 限流检查在查询用户、校验密码之前完成
+        with login_throttle.admit(username, ip_address):
+            return await self._authenticate_user(username, password, ip_address, user_agent)
+
+    async def _authenticate_user(
+        self,
+        username: str,
+        password: str,
+        ip_address: Optional[str],
+        user_agent: Optional[str],
+    ) -> LoginResponse:
+        """Verify credentials and issue tokens (called after admission)."""
         # Find user with role relation
         result = await self.db.execute(
             select(User)
@@ -145,30 +164,29 @@ class AuthService:
             log.user_id = user.id
             log.status = "failed"
             log.fail_reason = "用户已被禁用"
-            self.db.add(log)
+            await login_activity.add_log(self.db, log)
             raise UnauthorizedException("用户已被禁用")
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             log.user_id = user.id
             log.status = "failed"
             log.fail_reason = "密码错误"
-            self.db.add(log)
+            await login_activity.add_log(self.db, log)
             raise UnauthorizedException("用户名或密码错误")
 
         # Login successful
         log.user_id = user.id
         log.status = "success"
-        self.db.add(log)
-
-        # Update user's online status and last login
-        await self.db.execute(
-            update(User)
-            .where(User.id == user.id)
-            .values(
-                is_online=True,
-                last_login=datetime.now(timezone.utc)
-            )
+        await login_activity.add_log(self.db, log)
+
+        # Update user's online status and last login (coalesced by the write-behind buffer)
+        await login_activity.set_presence(
+            self.db,
+            user.id,
+            is_online=True,
+            last_login=datetime.now(timezone.utc),
         )
+        presence.touch(user.id)
 
         # Get campus selection info
         need_select, campuses, default_campus_id = await self._get_user_available_campuses(user)
@@ -186,7 +204,7 @@ class AuthService:
         }
 
         return LoginResponse(
-            access_token=create_access_token(token_data),
+            access_token=await self._create_access_token(user, token_data),
             refresh_token=create_refresh_token(token_data),
             need_select_campus=need_select,
             available_campuses=campuses,
@@ -242,7 +260,7 @@ class AuthService:
         }
 
         return TokenResponse(
-            access_token=create_access_token(token_data),
+            access_token=await self._create_access_token(user, token_data),
             refresh_token=create_refresh_token(token_data)
         )
 
@@ -270,10 +288,7 @@ class AuthService:
             user = result.scalar_one()
 
         # Verify campus exists and is active
-        campus_result = await self.db.execute(
-            select(Campus).where(Campus.id == campus_id, Campus.is_active == True)
-        )
-        campus = campus_result.scalar_one_or_none()
+        campus = await get_active_campus(self.db, campus_id)
 
         if not campus:
             raise BadRequestException("校区不存在或已禁用")
@@ -304,13 +319,33 @@ class AuthService:
         }
 
         return LoginResponse(
-            access_token=create_access_token(token_data),
+            access_token=await self._create_access_token(user, token_data),
             refresh_token=create_refresh_token(token_data),
             need_select_campus=False,
             available_campuses=[],
             current_campus_id=campus_id
         )
 
+    async def get_user(self, user_id: int) -> User:
+        """
+        Load the full user record (with role and campus) for the current principal.
+
+        Args:
+            user_id: Current user ID
+
+        Raises:
+            UnauthorizedException: If user no longer exists
+        """
+        result = await self.db.execute(
+            select(User)
+            .options(selectinload(User.user_role), selectinload(User.campus))
+            .where(User.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            raise UnauthorizedException("用户不存在")
+        return user
+
     async def logout(self, user: User) -> None:
         """
         Logout user and mark as offline.
@@ -318,11 +353,8 @@ class AuthService:
         Args:
             user: Current user
         """
-        await self.db.execute(
-            update(User)
-            .where(User.id == user.id)
-            .values(is_online=False)
-        )
+        presence.mark_offline(user.id)
+        await login_activity.set_presence(self.db, user.id, is_online=False)
 
     async def change_password(
         self,
@@ -341,10 +373,10 @@ class AuthService:
         Raises:
             BadRequestException: If old password is incorrect
         """
-        if not verify_password(old_password, user.hashed_password):
+        if not await verify_password_async(old_password, user.hashed_password):
             raise BadRequestException("原密码错误")
 
-        hashed = get_password_hash(new_password)
+        hashed = await get_password_hash_async(new_password)
         await self.db.execute(
             update(User)
             .where(User.id == user.id)
@@ -391,6 +423,7 @@ class AuthService:
             if result.scalar_one_or_none():
                 raise ConflictException(f"手机号 '{phone}' 已被使用")
             update_dict["phone"] = phone
+            update_dict["phone_digits"] = digits_only(phone)
 
         if avatar is not None:
             update_dict["avatar"] = avatar
@@ -12,7 +12,11 @@ from app.schemas.campus import (
     CampusCreate, CampusUpdate,
     ClassroomCreate, ClassroomUpdate
 )
+from app.core.campus_directory import (
+    CampusEntry, get_active_campuses, get_campus_directory, invalidate_campus_directory
+)
 from app.core.exceptions import NotFoundException, ConflictException
+from app.core.versions import CAMPUS_VERSION, CLASSROOM_VERSION, bump_version
 
 
 class CampusService:
@@ -47,13 +51,16 @@ class CampusService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
-    async def get_all_campuses_simple(self, active_only: bool = True) -> List[Campus]:
-        """Get all campuses for dropdown (no classrooms)."""
-        query = select(Campus).order_by(Campus.sort_order, Campus.id)
+    async def get_all_campuses_simple(self, active_only: bool = True) -> List[CampusEntry]:
+        """Get all campuses for dropdown (no classrooms), served from the campus directory."""
         if active_only:
-            query = query.where(Campus.is_active == True)
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+            return await get_active_campuses(self.db)
+        return list(await get_campus_directory(self.db))
+
+    async def _campuses_changed(self) -> None:
+        """校区增删改后递增校区版本号并清空本地校区目录"""
+        await bump_version(self.db, CAMPUS_VERSION)
+        invalidate_campus_directory()
 
     async def create_campus(self, data: CampusCreate, created_by: str) -> Campus:
         """Create campus with optional classrooms."""
@@ -89,6 +96,7 @@ class CampusService:
 
         self.db.add(campus)
         await self.db.flush()
+        await self._campuses_changed()
         return campus
 
     async def update_campus(self, campus_id: int, data: CampusUpdate, updated_by: str) -> Campus:
@@ -109,12 +117,14 @@ class CampusService:
         campus.updated_by = updated_by
 
         await self.db.flush()
+        await self._campuses_changed()
         return campus
 
     async def delete_campus(self, campus_id: int) -> None:
         """Delete campus (cascade deletes classrooms)."""
         campus = await self.get_campus_by_id(campus_id)
         await self.db.delete(campus)
+        await self._campuses_changed()
 
     # ============ Classroom Operations ============
 
@@ -174,6 +184,7 @@ class CampusService:
         await self.db.flush()
         # 刷新对象以获取数据库生成的字段（如created_time, updated_time）
         await self.db.refresh(classroom)
+        await bump_version(self.db, CLASSROOM_VERSION)
         return classroom
 
     async def update_classroom(self, classroom_id: int, data: ClassroomUpdate, updated_by: str) -> Classroom:
@@ -188,9 +199,11 @@ class CampusService:
         await self.db.flush()
         # 刷新对象以获取更新后的字段
         await self.db.refresh(classroom)
+        await bump_version(self.db, CLASSROOM_VERSION)
         return classroom
 
     async def delete_classroom(self, classroom_id: int) -> None:
         """Delete classroom."""
         classroom = await self.get_classroom_by_id(classroom_id)
         await self.db.delete(classroom)
+        await bump_version(self.db, CLASSROOM_VERSION)
@@ -4,16 +4,56 @@ Class plan service with campus scope support.
 """
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.class_plan import ClassPlan
 from app.models.course import Course
+from app.models.student import Student
 from app.models.teacher import Teacher
 from app.models.campus import Campus, Classroom
 from app.schemas.class_plan import ClassPlanCreate, ClassPlanUpdate, ClassPlanWithDetailsResponse, ClassPlanBriefResponse, CourseBriefInfo
 from app.core.exceptions import NotFoundException, ForbiddenException
+from app.core.pagination import count_total
+from app.core.search import SearchSpec
+from app.core.typeahead import Typeahead, TypeaheadEntry, rows_in_order
+from app.core.versions import (
+    CLASS_PLAN_TYPEAHEAD_VERSION, CLASS_PLAN_VERSION, STUDENT_VERSION, bump_scoped_versions,
+)
+from app.database import get_dialect_name
+
+
+CLASS_PLAN_SEARCH = SearchSpec(
+    text_columns=[ClassPlan.name],
+    pinyin_columns=[ClassPlan.name_pinyin, ClassPlan.name_initials],
+)
+
+
+def _class_plan_entry(plan) -> TypeaheadEntry:
+    return TypeaheadEntry(
+        id=plan.id,
+        name=plan.name,
+        scope=plan.campus_id,
+        aliases=(plan.name_pinyin, plan.name_initials),
+        attrs={"is_active": plan.is_active, "teacher_id": plan.teacher_id},
+    )
+
+
+async def _load_class_plan_entries(db: AsyncSession, campus_id: Optional[int]) -> List[TypeaheadEntry]:
+    query = select(
+        ClassPlan.id, ClassPlan.name, ClassPlan.campus_id, ClassPlan.name_pinyin, ClassPlan.name_initials,
+        ClassPlan.is_active, ClassPlan.teacher_id,
+    )
+    if campus_id is not None:
+        query = query.where(ClassPlan.campus_id == campus_id)
+    result = await db.execute(query)
+    return [_class_plan_entry(row) for row in result.all()]
+
+
+CLASS_PLAN_TYPEAHEAD = Typeahead(
+    "typeahead_class_plans", CLASS_PLAN_TYPEAHEAD_VERSION, _load_class_plan_entries, _class_plan_entry
+)
 
 
 class ClassPlanService:
@@ -44,6 +84,21 @@ class ClassPlanService:
 
         return plan
 
+    async def get_by_ids(
+        self,
+        plan_ids: List[int],
+        campus_id_filter: Optional[int] = None
+    ) -> List[ClassPlan]:
+        """
+        Get class plans by IDs in one query.
+        如果提供campus_id_filter，只返回该校区的开班计划。
+        """
+        query = select(ClassPlan).where(ClassPlan.id.in_(plan_ids))
+        if campus_id_filter is not None:
+            query = query.where(ClassPlan.campus_id == campus_id_filter)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def get_all(
         self,
         page: int = 1,
@@ -56,7 +111,8 @@ class ClassPlanService:
         search: Optional[str] = None,
         start_date_from: Optional[str] = None,
         start_date_to: Optional[str] = None,
-    ) -> Tuple[List[ClassPlanWithDetailsResponse], int]:
+        include_total: bool = True,
+    ) -> Tuple[List[ClassPlanWithDetailsResponse], Optional[int]]:
         """Get class plans with pagination and filters."""
         query = select(ClassPlan)
 
@@ -71,17 +127,17 @@ class ClassPlanService:
         if is_active is not None:
             query = query.where(ClassPlan.is_active == is_active)
         if search:
-            query = query.where(ClassPlan.name.ilike(f"%{search}%"))
+            query = query.where(CLASS_PLAN_SEARCH.condition(search))
         # 开班日期范围过滤
         if start_date_from:
             query = query.where(ClassPlan.start_date >= start_date_from)
         if start_date_to:
             query = query.where(ClassPlan.start_date <= start_date_to)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
+        if search:
+            query = query.order_by(*CLASS_PLAN_SEARCH.rank(search, get_dialect_name(self.db)))
         query = (
             query
             .order_by(ClassPlan.id.desc())
@@ -142,9 +198,10 @@ class ClassPlanService:
         self,
         active_only: bool = True,
         campus_id: Optional[int] = None,
-        teacher_id: Optional[int] = None
+        teacher_id: Optional[int] = None,
+        search: Optional[str] = None,
     ) -> List[ClassPlanBriefResponse]:
-        """Get all class plans for dropdown."""
+        """Get all class plans for dropdown (search 支持名称、拼音首字母)."""
         query = select(ClassPlan)
 
         # 校区过滤
@@ -158,11 +215,34 @@ class ClassPlanService:
         if active_only:
             query = query.where(ClassPlan.is_active == True)
 
+        if search:
+            query = query.where(CLASS_PLAN_SEARCH.condition(search))
+            query = query.order_by(*CLASS_PLAN_SEARCH.rank(search, get_dialect_name(self.db)))
         query = query.order_by(ClassPlan.name)
         result = await self.db.execute(query)
         plans = list(result.scalars().all())
         return await self._enrich_with_course(plans)
 
+    async def typeahead(
+        self,
+        q: str,
+        limit: int = 20,
+        active_only: bool = True,
+        campus_id: Optional[int] = None,
+        teacher_id: Optional[int] = None,
+    ) -> List[ClassPlanBriefResponse]:
+        """下拉输入联想：在内存索引中取最匹配的 limit 个开班（名称、拼音）"""
+        filters = {}
+        if active_only:
+            filters["is_active"] = True
+        if teacher_id is not None:
+            filters["teacher_id"] = teacher_id
+        ids = await CLASS_PLAN_TYPEAHEAD.search(self.db, q, limit, scope=campus_id, **filters)
+        if not ids:
+            return []
+        result = await self.db.execute(select(ClassPlan).where(ClassPlan.id.in_(ids)))
+        return await self._enrich_with_course(rows_in_order(result.scalars().all(), ids))
+
     async def _enrich_with_course(self, plans: List[ClassPlan]) -> List[ClassPlanBriefResponse]:
         """Enrich class plans with course info for dropdown/brief response."""
         enriched = []
@@ -221,6 +301,8 @@ class ClassPlanService:
         )
         self.db.add(plan)
         await self.db.flush()
+        await CLASS_PLAN_TYPEAHEAD.changed(self.db, plan)
+        await bump_scoped_versions(self.db, CLASS_PLAN_VERSION, [plan.campus_id])
         return plan
 
     async def update(
@@ -238,6 +320,7 @@ class ClassPlanService:
         """
         plan = await self.get_by_id(plan_id, campus_id_filter=campus_id_filter)
         old_status = plan.status
+        previous = CLASS_PLAN_TYPEAHEAD.entry(plan)
 
         # Verify course exists if changed
         if data.course_id and data.course_id != plan.course_id:
@@ -281,6 +364,7 @@ class ClassPlanService:
                         .where(Student.id.in_(student_ids))
                         .values(status="studying", updated_by=updated_by)
                     )
+                    await self._students_changed(student_ids)
 
         elif new_status == "completed" and old_status != "completed":
             # 班级结班，更新报名学生为"已结业"
@@ -304,10 +388,20 @@ class ClassPlanService:
                         .where(Student.id.in_(student_ids))
                         .values(status="graduated", updated_by=updated_by)
                     )
+                    await self._students_changed(student_ids)
 
         await self.db.flush()
+        await CLASS_PLAN_TYPEAHEAD.changed(self.db, plan, previous)
+        await bump_scoped_versions(self.db, CLASS_PLAN_VERSION, [previous.scope, plan.campus_id])
         return plan
 
+    async def _students_changed(self, student_ids: List[int]) -> None:
+        """学生状态在学生下拉列表中展示，递增这些学生所在校区的版本号"""
+        result = await self.db.execute(
+            select(Student.campus_id).where(Student.id.in_(student_ids)).distinct()
+        )
+        await bump_scoped_versions(self.db, STUDENT_VERSION, result.scalars().all())
+
     async def delete(
         self,
         plan_id: int,
@@ -319,3 +413,5 @@ class ClassPlanService:
         """
         plan = await self.get_by_id(plan_id, campus_id_filter=campus_id_filter)
         await self.db.delete(plan)
+        await CLASS_PLAN_TYPEAHEAD.removed(self.db, plan)
+        await bump_scoped_versions(self.db, CLASS_PLAN_VERSION, [plan.campus_id])
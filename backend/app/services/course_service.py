@@ -4,13 +4,20 @@ Course product service with campus scope support.
 """
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate
 from app.core.exceptions import NotFoundException, ConflictException, ForbiddenException
+from app.core.pagination import count_total
+from app.core.search import SearchSpec
+from app.core.versions import COURSE_VERSION, bump_version
+from app.database import get_dialect_name
+
+
+COURSE_SEARCH = SearchSpec(text_columns=[Course.name, Course.code])
 
 
 class CourseService:
@@ -52,7 +59,8 @@ class CourseService:
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         campus_id: Optional[int] = None,
-    ) -> Tuple[List[Course], int]:
+        include_total: bool = True,
+    ) -> Tuple[List[Course], Optional[int]]:
         """
         Get courses with pagination and filters.
         支持校区过滤。
@@ -73,17 +81,14 @@ class CourseService:
         if is_active is not None:
             query = query.where(Course.is_active == is_active)
         if search:
-            query = query.where(
-                Course.name.ilike(f"%{search}%") |
-                Course.code.ilike(f"%{search}%")
-            )
+            query = query.where(COURSE_SEARCH.condition(search))
 
         # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
-        # Apply pagination and ordering
+        # Apply pagination and ordering (search results by relevance first)
+        if search:
+            query = query.order_by(*COURSE_SEARCH.rank(search, get_dialect_name(self.db)))
         query = (
             query
             .order_by(Course.sort_order, Course.id)
@@ -134,6 +139,7 @@ class CourseService:
         )
         self.db.add(course)
         await self.db.flush()
+        await bump_version(self.db, COURSE_VERSION)
         return course
 
     async def update(
@@ -164,6 +170,7 @@ class CourseService:
         course.updated_by = updated_by
 
         await self.db.flush()
+        await bump_version(self.db, COURSE_VERSION)
         return course
 
     async def delete(
@@ -177,3 +184,4 @@ class CourseService:
         """
         course = await self.get_by_id(course_id, campus_id_filter=campus_id_filter)
         await self.db.delete(course)
+        await bump_version(self.db, COURSE_VERSION)
@@ -0,0 +1,382 @@
+"""
+Dashboard service - builds dashboard payloads that can be precomputed.
+仪表盘数据构建服务。管理员概览和教师概览的数据构建逻辑放在这里，
+既供接口实时计算使用，也供后台快照任务预先计算使用。
+"""
+from datetime import datetime, timedelta, date
+from typing import Optional
+
+from sqlalchemy import func, select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.campus_directory import get_active_campuses, get_campus_names
+from app.core.timeseries import fetch_series
+from app.models.class_plan import ClassPlan
+from app.models.enrollment import Enrollment
+from app.models.schedule import Schedule
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.schemas.dashboard import (
+    KpiCard,
+    TeacherDashboardOverview,
+    TeacherScheduleItem,
+)
+
+
+class DashboardService:
+    """Service for building admin and teacher dashboard payloads."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def build_admin_overview(
+        self,
+        filter_campus_id: Optional[int],
+        show_campus_comparison: bool = False,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: Optional[str] = None,
+        series_format: str = "points",
+    ) -> dict:
+        """
+        构建管理员仪表盘概览数据。
+
+        Args:
+            filter_campus_id: 校区过滤ID，None表示全部校区
+            show_campus_comparison: 是否返回校区对比（超管未选校区时）
+            start_date: 趋势开始日期（默认近7天）
+            end_date: 趋势结束日期（默认今天）
+            granularity: 趋势粒度
+            series_format: 趋势数据格式
+
+        Returns:
+            概览数据 dict
+        """
+        today = date.today()
+        week_ago = today - timedelta(days=7)
+        month_start = today.replace(day=1)
+
+        # 如果有时间过滤，使用过滤时间
+        query_start = start_date if start_date else week_ago
+        query_end = end_date if end_date else today
+
+        # 1. 查询学生总数
+        student_query = select(func.count()).select_from(Student).where(Student.status == "active")
+        if filter_campus_id:
+            student_query = student_query.where(Student.campus_id == filter_campus_id)
+        total_students = (await self.db.execute(student_query)).scalar() or 0
+
+        # 2. 查询教师总数（教师无校区限制，但可以统计有排课的教师）
+        teacher_query = select(func.count()).select_from(Teacher).where(Teacher.is_active == True)
+        total_teachers = (await self.db.execute(teacher_query)).scalar() or 0
+
+        # 3. 查询进行中班级数
+        class_plan_query = (
+            select(func.count())
+            .select_from(ClassPlan)
+            .where(
+                and_(
+                    ClassPlan.is_active == True,
+                    ClassPlan.status == "ongoing",
+                )
+            )
+        )
+        if filter_campus_id:
+            class_plan_query = class_plan_query.where(ClassPlan.campus_id == filter_campus_id)
+        active_classes = (await self.db.execute(class_plan_query)).scalar() or 0
+
+        # 4. 查询本月收入（报名的paid_amount）
+        revenue_query = (
+            select(func.sum(Enrollment.paid_amount))
+            .where(
+                and_(
+                    Enrollment.created_time >= datetime.combine(month_start, datetime.min.time()),
+                    Enrollment.status == "active",
+                )
+            )
+        )
+        if filter_campus_id:
+            revenue_query = revenue_query.where(Enrollment.campus_id == filter_campus_id)
+        month_revenue = float((await self.db.execute(revenue_query)).scalar() or 0)
+
+        # 5. 构建KPI卡片
+        kpi_cards = [
+            KpiCard(
+                label="学生总数",
+                value=total_students,
+                unit="人",
+            ).model_dump(),
+            KpiCard(
+                label="教师总数",
+                value=total_teachers,
+                unit="人",
+            ).model_dump(),
+            KpiCard(
+                label="进行中班级",
+                value=active_classes,
+                unit="个",
+            ).model_dump(),
+            KpiCard(
+                label="本月收入",
+                value=month_revenue,
+                unit="元",
+                is_time_filtered=bool(start_date or end_date),
+            ).model_dump(),
+        ]
+
+        # 6. 查询报名趋势（默认近7天）
+        campus_conditions = [Enrollment.campus_id == filter_campus_id] if filter_campus_id else []
+        enrollment_trend = (await fetch_series(
+            self.db,
+            Enrollment.created_time,
+            func.count(Enrollment.id),
+            query_start,
+            query_end,
+            granularity=granularity,
+            conditions=campus_conditions,
+        )).render(series_format)
+
+        # 7. 查询收入趋势（默认近7天）
+        revenue_trend = (await fetch_series(
+            self.db,
+            Enrollment.created_time,
+            func.sum(Enrollment.paid_amount),
+            query_start,
+            query_end,
+            granularity=granularity,
+            conditions=[Enrollment.status == "active", *campus_conditions],
+        )).render(series_format)
+
+        # 8. 校区对比（仅超管不选校区时）
+        campus_comparison = None
+        if show_campus_comparison:
+            # 获取所有校区
+            campuses = await get_active_campuses(self.db)
+
+            campus_comparison = []
+            for campus in campuses:
+                # 查询每个校区的学生数
+                c_students = (await self.db.execute(
+                    select(func.count())
+                    .select_from(Student)
+                    .where(
+                        and_(
+                            Student.campus_id == campus.id,
+                            Student.status == "active",
+                        )
+                    )
+                )).scalar() or 0
+
+                # 查询每个校区的班级数
+                c_classes = (await self.db.execute(
+                    select(func.count())
+                    .select_from(ClassPlan)
+                    .where(
+                        and_(
+                            ClassPlan.campus_id == campus.id,
+                            ClassPlan.is_active == True,
+                            ClassPlan.status == "ongoing",
+                        )
+                    )
+                )).scalar() or 0
+
+                # 查询每个校区的本月收入
+                c_revenue = float((await self.db.execute(
+                    select(func.sum(Enrollment.paid_amount))
+                    .where(
+                        and_(
+                            Enrollment.campus_id == campus.id,
+                            Enrollment.created_time >= datetime.combine(month_start, datetime.min.time()),
+                            Enrollment.status == "active",
+                        )
+                    )
+                )).scalar() or 0)
+
+                campus_comparison.append({
+                    "campus_id": campus.id,
+                    "campus_name": campus.name,
+                    "students": c_students,
+                    "active_classes": c_classes,
+                    "month_revenue": c_revenue,
+                })
+
+        # 构建响应
+        response_data = {
+            "kpi_cards": kpi_cards,
+            "enrollment_trend": enrollment_trend,
+            "revenue_trend": revenue_trend,
+        }
+
+        if campus_comparison is not None:
+            response_data["campus_comparison"] = campus_comparison
+
+        return response_data
+
+    async def build_teacher_overview(self, teacher_id: int) -> dict:
+        """
+        构建教师仪表盘概览数据。
+
+        Args:
+            teacher_id: 教师ID
+
+        Returns:
+            概览数据 dict
+        """
+        today = date.today()
+        next_week = today + timedelta(days=7)
+        month_start = today.replace(day=1)
+        week_start = today - timedelta(days=today.weekday())
+
+        # 1. 查询教师的活跃班级
+        class_plan_result = await self.db.execute(
+            select(ClassPlan)
+            .where(
+                and_(
+                    ClassPlan.teacher_id == teacher_id,
+                    ClassPlan.is_active == True,
+                    ClassPlan.status.in_(["ongoing", "not_started"]),
+                )
+            )
+        )
+        active_class_plans = class_plan_result.scalars().all()
+
+        # 2. 查询今日排课
+        today_schedule_result = await self.db.execute(
+            select(Schedule)
+            .options(
+                selectinload(Schedule.class_plan).selectinload(ClassPlan.course),
+                selectinload(Schedule.classroom),
+            )
+            .where(
+                and_(
+                    Schedule.teacher_id == teacher_id,
+                    Schedule.schedule_date == today,
+                    Schedule.status != "cancelled",
+                )
+            )
+            .order_by(Schedule.start_time)
+        )
+        today_schedules_raw = today_schedule_result.scalars().all()
+
+        # 3. 查询本周课程数
+        week_schedule_count = (await self.db.execute(
+            select(func.count())
+            .select_from(Schedule)
+            .where(
+                and_(
+                    Schedule.teacher_id == teacher_id,
+                    Schedule.schedule_date >= week_start,
+                    Schedule.schedule_date <= week_start + timedelta(days=6),
+                    Schedule.status != "cancelled",
+                )
+            )
+        )).scalar() or 0
+
+        # 4. 查询本月已完成课时数
+        month_hours_result = await self.db.execute(
+            select(func.sum(Schedule.lesson_hours))
+            .where(
+                and_(
+                    Schedule.teacher_id == teacher_id,
+                    Schedule.schedule_date >= month_start,
+                    Schedule.schedule_date <= today,
+                    Schedule.status == "completed",
+                )
+            )
+        )
+        month_lesson_hours = float(month_hours_result.scalar() or 0)
+
+        # 5. 查询近期排课（未来7天，包括今日）
+        upcoming_result = await self.db.execute(
+            select(Schedule)
+            .options(
+                selectinload(Schedule.class_plan).selectinload(ClassPlan.course),
+                selectinload(Schedule.classroom),
+            )
+            .where(
+                and_(
+                    Schedule.teacher_id == teacher_id,
+                    Schedule.schedule_date >= today,
+                    Schedule.schedule_date <= next_week,
+                    Schedule.status != "cancelled",
+                )
+            )
+            .order_by(Schedule.schedule_date, Schedule.start_time)
+        )
+        upcoming_schedules_raw = upcoming_result.scalars().all()
+
+        # 6. 获取每个排课的学生人数
+        schedule_ids = [s.id for s in upcoming_schedules_raw]
+        student_counts = {}
+        if schedule_ids:
+            # 通过 class_plan 获取报名人数
+            class_plan_ids = list(set(s.class_plan_id for s in upcoming_schedules_raw))
+            enrollment_counts = await self.db.execute(
+                select(
+                    Enrollment.class_plan_id,
+                    func.count(Enrollment.id).label("count")
+                )
+                .where(
+                    and_(
+                        Enrollment.class_plan_id.in_(class_plan_ids),
+                        Enrollment.status == "active",
+                    )
+                )
+                .group_by(Enrollment.class_plan_id)
+            )
+            class_plan_student_counts = {row.class_plan_id: row.count for row in enrollment_counts}
+            for s in upcoming_schedules_raw:
+                student_counts[s.id] = class_plan_student_counts.get(s.class_plan_id, 0)
+
+        # 构建排课列表
+        campus_names = await get_campus_names(self.db)
+
+        def _build_teacher_schedule_item(schedule: Schedule) -> TeacherScheduleItem:
+            class_plan = schedule.class_plan
+            course = class_plan.course if class_plan else None
+            return TeacherScheduleItem(
+                schedule_id=schedule.id,
+                schedule_date=schedule.schedule_date,
+                start_time=schedule.start_time,
+                end_time=schedule.end_time,
+                lesson_hours=float(schedule.lesson_hours or 0),
+                class_plan_id=schedule.class_plan_id,
+                class_plan_name=class_plan.name if class_plan else "",
+                course_name=course.name if course else "",
+                classroom_name=schedule.classroom.name if schedule.classroom else None,
+                campus_name=campus_names.get(class_plan.campus_id) if class_plan else None,
+                student_count=student_counts.get(schedule.id, 0),
+                status=schedule.status,
+            )
+
+        today_schedules = [_build_teacher_schedule_item(s) for s in today_schedules_raw]
+        upcoming_schedules = [_build_teacher_schedule_item(s) for s in upcoming_schedules_raw]
+
+        # 构建响应
+        response = TeacherDashboardOverview(
+            today_class_count=KpiCard(
+                label="今日课程",
+                value=len(today_schedules),
+                unit="节",
+            ),
+            week_class_count=KpiCard(
+                label="本周课程",
+                value=week_schedule_count,
+                unit="节",
+            ),
+            month_lesson_hours=KpiCard(
+                label="本月课时",
+                value=month_lesson_hours,
+                unit="课时",
+            ),
+            active_class_count=KpiCard(
+                label="在教班级",
+                value=len(active_class_plans),
+                unit="个",
+            ),
+            upcoming_schedules=upcoming_schedules,
+            today_schedules=today_schedules,
+        )
+
+        return response.model_dump()
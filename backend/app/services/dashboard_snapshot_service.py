@@ -0,0 +1,130 @@
+"""
+Dashboard snapshot service.
+仪表盘快照服务：后台定时预先计算各校区的管理员概览和各教师的教师概览，
+接口直接返回快照（附带 as_of 计算时间），需要最新数据时可用 fresh=true 重新计算。
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Hashable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.campus import Campus
+from app.models.teacher import Teacher
+from app.services.dashboard_service import DashboardService
+
+logger = logging.getLogger(__name__)
+
+# 进程内快照存储：key 为 ("admin", campus_id, 是否含校区对比) 或 ("teacher", teacher_id)
+# 校区对比只给未选校区的超管，未选校区的校区管理员与超管分开缓存
+snapshot_store = TTLCache(
+    "dashboard_snapshots",
+    maxsize=settings.dashboard_snapshot_max_entries,
+    ttl=settings.dashboard_snapshot_ttl_seconds,
+)
+
+
+class DashboardSnapshotService:
+    """Service for serving and refreshing precomputed dashboard snapshots."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.dashboard_service = DashboardService(db)
+
+    @staticmethod
+    def _store(key: Hashable, payload: dict) -> dict:
+        """保存快照并附加计算时间"""
+        snapshot = {**payload, "as_of": datetime.now(timezone.utc)}
+        snapshot_store.set(key, snapshot)
+        return snapshot
+
+    async def _get_or_build(
+        self,
+        key: Hashable,
+        builder: Callable[[], Awaitable[dict]],
+        fresh: bool = False,
+    ) -> dict:
+        """优先返回未过期的快照，fresh=True 或快照不存在时重新计算"""
+        if not fresh:
+            snapshot = snapshot_store.get(key)
+            if snapshot is not None:
+                return snapshot
+        return self._store(key, await builder())
+
+    async def get_admin_overview(
+        self,
+        filter_campus_id: Optional[int],
+        show_campus_comparison: bool = False,
+        fresh: bool = False,
+    ) -> dict:
+        """获取管理员概览快照（默认时间范围）"""
+        return await self._get_or_build(
+            ("admin", filter_campus_id, show_campus_comparison),
+            lambda: self.dashboard_service.build_admin_overview(
+                filter_campus_id, show_campus_comparison=show_campus_comparison
+            ),
+            fresh=fresh,
+        )
+
+    async def get_teacher_overview(self, teacher_id: int, fresh: bool = False) -> dict:
+        """获取教师概览快照"""
+        return await self._get_or_build(
+            ("teacher", teacher_id),
+            lambda: self.dashboard_service.build_teacher_overview(teacher_id),
+            fresh=fresh,
+        )
+
+    async def _refresh(self, key: Hashable, builder: Callable[[], Awaitable[dict]]) -> bool:
+        """
+        重新计算单个快照。
+        在保存点中计算，失败时记录日志并回滚到保存点，会话仍可继续刷新其他快照，原快照保留。
+        """
+        try:
+            async with self.db.begin_nested():
+                payload = await builder()
+        except Exception:
+            logger.exception("仪表盘快照刷新失败: %s", key)
+            return False
+        self._store(key, payload)
+        return True
+
+    async def refresh_all(self) -> int:
+        """
+        重新计算所有快照：全部校区汇总、每个启用的校区、每个关联了账号的在职教师。
+        单个快照计算失败不影响其他快照。
+
+        Returns:
+            成功刷新的快照数量
+        """
+        result = await self.db.execute(
+            select(Campus.id).where(Campus.is_active == True)
+        )
+        campus_ids = list(result.scalars().all())
+
+        result = await self.db.execute(
+            select(Teacher.id).where(
+                Teacher.user_id.isnot(None),
+                Teacher.is_active == True,
+            )
+        )
+        teacher_ids = list(result.scalars().all())
+
+        count = 0
+        for campus_id in [None, *campus_ids]:
+            count += await self._refresh(
+                ("admin", campus_id, campus_id is None),
+                lambda campus_id=campus_id: self.dashboard_service.build_admin_overview(
+                    campus_id, show_campus_comparison=campus_id is None
+                ),
+            )
+
+        for teacher_id in teacher_ids:
+            count += await self._refresh(
+                ("teacher", teacher_id),
+                lambda teacher_id=teacher_id: self.dashboard_service.build_teacher_overview(teacher_id),
+            )
+
+        return count
@@ -14,6 +14,7 @@ from app.schemas.dictionary import (
     DictItemCreate, DictItemUpdate
 )
 from app.core.exceptions import NotFoundException, ConflictException, BadRequestException
+from app.core.versions import DICT_VERSION, bump_version
 
 
 class DictionaryService:
@@ -22,6 +23,10 @@ class DictionaryService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _changed(self) -> None:
+        """字典增删改后递增字典版本号（字典接口的 ETag 随之变化）"""
+        await bump_version(self.db, DICT_VERSION)
+
     # ============ DictType Operations ============
 
     async def get_type_by_id(self, type_id: int) -> DictType:
@@ -88,6 +93,7 @@ class DictionaryService:
 
         self.db.add(dict_type)
         await self.db.flush()
+        await self._changed()
         return dict_type
 
     async def update_type(self, type_id: int, data: DictTypeUpdate, updated_by: str) -> DictType:
@@ -101,6 +107,7 @@ class DictionaryService:
         dict_type.updated_by = updated_by
 
         await self.db.flush()
+        await self._changed()
         return dict_type
 
     async def delete_type(self, type_id: int) -> None:
@@ -109,6 +116,7 @@ class DictionaryService:
         if dict_type.is_system:
             raise BadRequestException("系统内置字典类型不可删除")
         await self.db.delete(dict_type)
+        await self._changed()
 
     # ============ DictItem Operations ============
 
@@ -156,6 +164,7 @@ class DictionaryService:
 
         self.db.add(item)
         await self.db.flush()
+        await self._changed()
         return item
 
     async def update_item(self, item_id: int, data: DictItemUpdate, updated_by: str) -> DictItem:
@@ -173,12 +182,14 @@ class DictionaryService:
         item.updated_by = updated_by
 
         await self.db.flush()
+        await self._changed()
         return item
 
     async def delete_item(self, item_id: int) -> None:
         """Delete dict item."""
         item = await self.get_item_by_id(item_id)
         await self.db.delete(item)
+        await self._changed()
 
     async def batch_create_items(self, type_id: int, items: List[DictItemCreate], created_by: str) -> List[DictItem]:
         """Batch create items for a type."""
@@ -201,6 +212,7 @@ class DictionaryService:
             created_items.append(item)
 
         await self.db.flush()
+        await self._changed()
         return created_items
 
     async def reorder_items(self, type_id: int, item_ids: List[int], updated_by: str) -> None:
@@ -217,6 +229,7 @@ class DictionaryService:
                 item.updated_by = updated_by
 
         await self.db.flush()
+        await self._changed()
 
     async def _unset_other_defaults(self, type_id: int, exclude_id: Optional[int] = None) -> None:
         """Unset default flag for all items in a type except the excluded one."""
@@ -4,7 +4,7 @@ Enrollment service with campus scope support.
 """
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +16,22 @@ from app.models.class_plan import ClassPlan
 from app.models.schedule import Schedule
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentUpdate, EnrollmentResponse
 from app.core.exceptions import NotFoundException, ForbiddenException
+from app.core.pagination import Keyset, count_total
+from app.core.projection import Projection
+from app.core.versions import CLASS_PLAN_VERSION, STUDENT_VERSION, bump_scoped_versions
+
+
+ENROLLMENT_KEYSET = Keyset(Enrollment.id.desc())
+# 报名列表的 fields= 可选字段；scheduled_hours 由排课汇总得出
+ENROLLMENT_FIELDS = Projection(
+    Enrollment,
+    EnrollmentResponse,
+    relations={
+        "student": (Student, Enrollment.student_id, ("id", "name", "phone")),
+        "class_plan": (ClassPlan, Enrollment.class_plan_id, ("id", "name")),
+    },
+    computed=("scheduled_hours",),
+)
 
 
 class EnrollmentService:
@@ -24,15 +40,9 @@ class EnrollmentService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def _enrich_with_scheduled_hours(self, enrollments: List[Enrollment]) -> List[EnrollmentResponse]:
-        """为报名记录添加已排课时信息"""
-        if not enrollments:
-            return []
-
-        # 获取所有班级计划ID
-        class_plan_ids = list(set(e.class_plan_id for e in enrollments if e.class_plan_id))
-
-        # 批量查询每个班级计划的已排课时总数（只统计scheduled状态，不含已完成的）
+    async def _scheduled_hours_map(self, class_plan_ids) -> Dict[int, Any]:
+        """批量查询每个班级计划的已排课时总数（只统计scheduled状态，不含已完成的）"""
+        class_plan_ids = list(set(cid for cid in class_plan_ids if cid))
         scheduled_hours_map = {}
         if class_plan_ids:
             result = await self.db.execute(
@@ -46,6 +56,14 @@ class EnrollmentService:
             )
             for row in result.fetchall():
                 scheduled_hours_map[row[0]] = row[1]
+        return scheduled_hours_map
+
+    async def _enrich_with_scheduled_hours(self, enrollments: List[Enrollment]) -> List[EnrollmentResponse]:
+        """为报名记录添加已排课时信息"""
+        if not enrollments:
+            return []
+
+        scheduled_hours_map = await self._scheduled_hours_map(e.class_plan_id for e in enrollments)
 
         # 构建响应列表
         responses = []
@@ -97,6 +115,28 @@ class EnrollmentService:
 
         return enrollment
 
+    async def get_by_ids(
+        self,
+        enrollment_ids: List[int],
+        campus_id_filter: Optional[int] = None
+    ) -> List[EnrollmentResponse]:
+        """
+        Get enrollments by IDs in one query, with scheduled hours.
+        如果提供campus_id_filter，只返回该校区的报名记录。
+        """
+        query = (
+            select(Enrollment)
+            .options(
+                selectinload(Enrollment.student),
+                selectinload(Enrollment.class_plan)
+            )
+            .where(Enrollment.id.in_(enrollment_ids))
+        )
+        if campus_id_filter is not None:
+            query = query.where(Enrollment.campus_id == campus_id_filter)
+        result = await self.db.execute(query)
+        return await self._enrich_with_scheduled_hours(list(result.scalars().all()))
+
     async def get_all(
         self,
         page: int = 1,
@@ -108,15 +148,18 @@ class EnrollmentService:
         teacher_id: Optional[int] = None,
         enroll_date_from: Optional[str] = None,
         enroll_date_to: Optional[str] = None,
-    ) -> Tuple[List[Enrollment], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
         """
         Get enrollments with pagination and filters.
-        支持校区过滤、教师过滤和报名日期范围过滤。
+        支持校区过滤、教师过滤和报名日期范围过滤；传入 cursor 时按游标分页。
+        列级查询，直接返回字典列表（结构同 EnrollmentResponse，含 scheduled_hours）；
+        传入 fields（ENROLLMENT_FIELDS.parse 的结果）时只查询这些字段。
         """
-        query = select(Enrollment).options(
-            selectinload(Enrollment.student),
-            selectinload(Enrollment.class_plan)
-        )
+        fields = fields or ENROLLMENT_FIELDS.allowed
+        query = select(Enrollment)
 
         # 校区过滤
         if campus_id is not None:
@@ -139,19 +182,22 @@ class EnrollmentService:
         if enroll_date_to:
             query = query.where(Enrollment.enroll_date <= enroll_date_to)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
-        query = (
-            query
-            .order_by(Enrollment.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
+        extra = ENROLLMENT_KEYSET.columns()
+        if "scheduled_hours" in fields:
+            extra.append(Enrollment.class_plan_id)
+        query = ENROLLMENT_FIELDS.apply(query, fields, extra)
+        query = ENROLLMENT_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        return list(result.scalars().all()), total_count
+        rows, next_cursor = ENROLLMENT_KEYSET.page(result.all(), page_size)
+        items = ENROLLMENT_FIELDS.to_dicts(rows, fields)
+        if "scheduled_hours" in fields:
+            hours = await self._scheduled_hours_map(row.class_plan_id for row in rows)
+            for row, item in zip(rows, items):
+                item["scheduled_hours"] = Decimal(str(hours.get(row.class_plan_id, 0)))
+        return items, total_count, next_cursor
 
     async def create(
         self,
@@ -206,6 +252,10 @@ class EnrollmentService:
         class_plan.current_students = (class_plan.current_students or 0) + 1
 
         await self.db.flush()
+        # 学生课时/状态、班级人数在下拉列表中展示，同步递增所在校区的版本号（不影响输入联想索引）
+        if student:
+            await bump_scoped_versions(self.db, STUDENT_VERSION, [student.campus_id])
+        await bump_scoped_versions(self.db, CLASS_PLAN_VERSION, [class_plan.campus_id])
 
         # Reload with relationships
         return await self.get_by_id(enrollment.id)
@@ -251,6 +301,7 @@ class EnrollmentService:
                 if student:
                     student.status = "unenrolled"
                     student.updated_by = updated_by
+                    await bump_scoped_versions(self.db, STUDENT_VERSION, [student.campus_id])
 
         await self.db.flush()
         return await self.get_by_id(enrollment_id)
@@ -5,15 +5,48 @@ from datetime import date
 from decimal import Decimal
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.pagination import Keyset, count_total
+from app.core.read_model import ReadModel
+from app.core.versions import STUDENT_VERSION, bump_scoped_versions
+from app.models.class_plan import ClassPlan
 from app.models.lesson_record import LessonRecord
 from app.models.enrollment import Enrollment
 from app.models.schedule import Schedule
 from app.models.student import Student
-from app.schemas.lesson_record import LessonRecordCreate, LessonRecordResponse
+from app.models.teacher import Teacher
+from app.schemas.lesson_record import LessonRecordCreate
+
+
+LESSON_RECORD_KEYSET = Keyset(LessonRecord.record_date.desc(), LessonRecord.id.desc())
+
+
+class LessonRecordRow(ReadModel):
+    """课时消耗历史的一条记录（只读行，字段同 LessonRecordResponse）"""
+
+    __slots__ = (
+        "enrollment_id", "schedule_id", "record_date", "hours", "type", "notes", "id", "created_time",
+        "student_name", "class_plan_name", "teacher_name", "schedule_date",
+    )
+
+
+LESSON_RECORD_COLUMNS = LessonRecordRow.columns(
+    enrollment_id=LessonRecord.enrollment_id,
+    schedule_id=LessonRecord.schedule_id,
+    record_date=LessonRecord.record_date,
+    hours=LessonRecord.hours,
+    type=LessonRecord.type,
+    notes=LessonRecord.notes,
+    id=LessonRecord.id,
+    created_time=LessonRecord.created_time,
+    student_name=Student.name,
+    class_plan_name=ClassPlan.name,
+    teacher_name=Teacher.name,
+    schedule_date=Schedule.schedule_date,
+)
 
 
 class LessonRecordService:
@@ -45,6 +78,8 @@ class LessonRecordService:
 
         created_records: List[LessonRecord] = []
         hours = Decimal(str(schedule.lesson_hours))
+        # 剩余课时有变化的学生所在校区
+        changed_campuses = set()
 
         for enrollment in enrollments:
             # 创建消耗记录
@@ -65,12 +100,14 @@ class LessonRecordService:
 
             # 更新学生的剩余课时
             if enrollment.student:
-                enrollment.student.remaining_hours = max(
-                    Decimal("0"),
-                    Decimal(str(enrollment.student.remaining_hours or 0)) - hours
-                )
+                remaining = Decimal(str(enrollment.student.remaining_hours or 0))
+                enrollment.student.remaining_hours = max(Decimal("0"), remaining - hours)
+                if enrollment.student.remaining_hours != remaining:
+                    changed_campuses.add(enrollment.student.campus_id)
 
         await self.db.flush()
+        # 剩余课时在学生下拉列表中展示，同步递增这些学生所在校区的版本号
+        await bump_scoped_versions(self.db, STUDENT_VERSION, changed_campuses)
         return created_records
 
     async def reverse_from_schedule(
@@ -109,58 +146,43 @@ class LessonRecordService:
             await self.db.delete(record)
 
         await self.db.flush()
+        await bump_scoped_versions(
+            self.db,
+            STUDENT_VERSION,
+            [r.enrollment.student.campus_id for r in records if r.enrollment and r.enrollment.student],
+        )
         return len(records)
 
+    def _history_query(self):
+        """课时消耗历史：按列查询并 join 学生、班级、排课、教师名称"""
+        return (
+            select(*LESSON_RECORD_COLUMNS)
+            .select_from(LessonRecord)
+            .join(Enrollment, LessonRecord.enrollment_id == Enrollment.id)
+            .outerjoin(Student, Enrollment.student_id == Student.id)
+            .outerjoin(ClassPlan, Enrollment.class_plan_id == ClassPlan.id)
+            .outerjoin(Schedule, LessonRecord.schedule_id == Schedule.id)
+            .outerjoin(Teacher, Schedule.teacher_id == Teacher.id)
+        )
+
     async def get_by_enrollment(
         self,
         enrollment_id: int,
         page: int = 1,
         page_size: int = 20,
-    ) -> Tuple[List[LessonRecordResponse], int]:
-        """获取某个报名记录的课时消耗历史"""
-        query = (
-            select(LessonRecord)
-            .options(
-                selectinload(LessonRecord.enrollment).selectinload(Enrollment.student),
-                selectinload(LessonRecord.enrollment).selectinload(Enrollment.class_plan),
-                selectinload(LessonRecord.schedule).selectinload(Schedule.teacher),
-            )
-            .where(LessonRecord.enrollment_id == enrollment_id)
-        )
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[LessonRecordRow], Optional[int], Optional[str]]:
+        """获取某个报名记录的课时消耗历史（传入 cursor 时按游标分页）"""
+        query = self._history_query().where(LessonRecord.enrollment_id == enrollment_id)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = await count_total(self.db, query, include_total)
 
-        query = (
-            query
-            .order_by(LessonRecord.record_date.desc(), LessonRecord.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
+        query = LESSON_RECORD_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        records = list(result.scalars().all())
-
-        # 转换为响应格式
-        items = []
-        for r in records:
-            item = LessonRecordResponse(
-                id=r.id,
-                enrollment_id=r.enrollment_id,
-                schedule_id=r.schedule_id,
-                record_date=r.record_date,
-                hours=r.hours,
-                type=r.type,
-                notes=r.notes,
-                created_time=r.created_time,
-                student_name=r.enrollment.student.name if r.enrollment and r.enrollment.student else None,
-                class_plan_name=r.enrollment.class_plan.name if r.enrollment and r.enrollment.class_plan else None,
-                teacher_name=r.schedule.teacher.name if r.schedule and r.schedule.teacher else None,
-                schedule_date=r.schedule.schedule_date if r.schedule else None,
-            )
-            items.append(item)
-
-        return items, total
+        records, next_cursor = LESSON_RECORD_KEYSET.page(LessonRecordRow.from_rows(result.all()), page_size)
+        return records, total, next_cursor
 
     async def get_by_student(
         self,
@@ -168,52 +190,19 @@ class LessonRecordService:
         page: int = 1,
         page_size: int = 20,
         class_plan_id: Optional[int] = None,
-    ) -> Tuple[List[LessonRecordResponse], int]:
-        """获取某个学生的所有课时消耗历史"""
-        query = (
-            select(LessonRecord)
-            .join(Enrollment)
-            .options(
-                selectinload(LessonRecord.enrollment).selectinload(Enrollment.student),
-                selectinload(LessonRecord.enrollment).selectinload(Enrollment.class_plan),
-                selectinload(LessonRecord.schedule).selectinload(Schedule.teacher),
-            )
-            .where(Enrollment.student_id == student_id)
-        )
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[LessonRecordRow], Optional[int], Optional[str]]:
+        """获取某个学生的所有课时消耗历史（传入 cursor 时按游标分页）"""
+        query = self._history_query().where(Enrollment.student_id == student_id)
 
         if class_plan_id:
             query = query.where(Enrollment.class_plan_id == class_plan_id)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = await count_total(self.db, query, include_total)
 
-        query = (
-            query
-            .order_by(LessonRecord.record_date.desc(), LessonRecord.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
+        query = LESSON_RECORD_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        records = list(result.scalars().all())
-
-        # 转换为响应格式
-        items = []
-        for r in records:
-            item = LessonRecordResponse(
-                id=r.id,
-                enrollment_id=r.enrollment_id,
-                schedule_id=r.schedule_id,
-                record_date=r.record_date,
-                hours=r.hours,
-                type=r.type,
-                notes=r.notes,
-                created_time=r.created_time,
-                student_name=r.enrollment.student.name if r.enrollment and r.enrollment.student else None,
-                class_plan_name=r.enrollment.class_plan.name if r.enrollment and r.enrollment.class_plan else None,
-                teacher_name=r.schedule.teacher.name if r.schedule and r.schedule.teacher else None,
-                schedule_date=r.schedule.schedule_date if r.schedule else None,
-            )
-            items.append(item)
-
-        return items, total
+        records, next_cursor = LESSON_RECORD_KEYSET.page(LessonRecordRow.from_rows(result.all()), page_size)
+        return records, total, next_cursor
@@ -14,6 +14,8 @@ from app.schemas.permission import (
     RoleCreate, RoleUpdate, ResourceWithPermissions, RoleWithPermissions
 )
 from app.api.deps import clear_permission_cache
+from app.core.principal import invalidate_principal
+from app.core.versions import PERMISSION_VERSION, bump_version
 
 
 class PermissionService:
@@ -151,11 +153,13 @@ class PermissionService:
             setattr(role, field, value)
 
         role.updated_by = updated_by
+        await bump_version(self.db, PERMISSION_VERSION)
         await self.db.commit()
         await self.db.refresh(role)
 
-        # 清除权限缓存
+        # 清除权限缓存；登录用户缓存中带有角色名称和编码，一并清除
         clear_permission_cache()
+        invalidate_principal()
 
         return role
 
@@ -178,6 +182,7 @@ class PermissionService:
             raise BadRequestException(f"有 {user_count} 个用户正在使用此角色，无法删除")
 
         await self.db.delete(role)
+        await bump_version(self.db, PERMISSION_VERSION)
         await self.db.commit()
 
         # 清除权限缓存
@@ -190,6 +195,8 @@ class PermissionService:
             raise NotFoundException("角色不存在")
 
         await self._update_role_permissions(role_id, permission_ids)
+        # 递增权限版本号，其他工作进程据此失效本地权限缓存
+        await bump_version(self.db, PERMISSION_VERSION)
         await self.db.commit()
 
         # 清除权限缓存
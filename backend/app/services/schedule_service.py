@@ -4,13 +4,16 @@ Schedule service for CRUD operations with campus scope support.
 """
 import uuid
 from datetime import date, timedelta
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import func, select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exceptions import NotFoundException, ForbiddenException, BadRequestException
+from app.core.pagination import Keyset, count_total
+from app.core.projection import Projection
+from app.core.read_model import ReadModel
 from app.models.schedule import Schedule
 from app.models.class_plan import ClassPlan
 from app.models.teacher import Teacher
@@ -18,11 +21,50 @@ from app.models.campus import Classroom
 from app.models.enrollment import Enrollment
 from app.schemas.schedule import (
     ScheduleCreate, ScheduleUpdate, ScheduleBatchCreate, ScheduleBatchUpdate,
-    ConflictCheckRequest, ConflictCheckResponse, ConflictDetail
+    ConflictCheckRequest, ConflictCheckResponse, ConflictDetail, ScheduleResponse
 )
 from app.services.lesson_record_service import LessonRecordService
 
 
+# 排课列表：日期倒序、同日按开始时间
+SCHEDULE_KEYSET = Keyset(Schedule.schedule_date.desc(), Schedule.start_time, Schedule.id)
+# 排课列表的 fields= 可选字段
+SCHEDULE_FIELDS = Projection(Schedule, ScheduleResponse, relations={
+    "class_plan": (ClassPlan, Schedule.class_plan_id, ("id", "name")),
+    "teacher": (Teacher, Schedule.teacher_id, ("id", "name")),
+    "classroom": (Classroom, Schedule.classroom_id, ("id", "name")),
+})
+
+
+class CalendarRow(ReadModel):
+    """日历视图的一条排课（只读行）"""
+
+    __slots__ = (
+        "id", "class_plan_id", "teacher_id", "classroom_id",
+        "schedule_date", "start_time", "end_time", "lesson_hours", "title", "status", "notes", "batch_no",
+        "class_plan_name", "teacher_name", "classroom_name",
+    )
+
+
+CALENDAR_COLUMNS = CalendarRow.columns(
+    id=Schedule.id,
+    class_plan_id=Schedule.class_plan_id,
+    teacher_id=Schedule.teacher_id,
+    classroom_id=Schedule.classroom_id,
+    schedule_date=Schedule.schedule_date,
+    start_time=Schedule.start_time,
+    end_time=Schedule.end_time,
+    lesson_hours=Schedule.lesson_hours,
+    title=Schedule.title,
+    status=Schedule.status,
+    notes=Schedule.notes,
+    batch_no=Schedule.batch_no,
+    class_plan_name=ClassPlan.name,
+    teacher_name=Teacher.name,
+    classroom_name=Classroom.name,
+)
+
+
 class ScheduleService:
     """Service for handling schedule operations with campus scope support."""
 
@@ -104,6 +146,29 @@ class ScheduleService:
 
         return schedule
 
+    async def get_schedules_by_ids(
+        self,
+        schedule_ids: List[int],
+        campus_id_filter: Optional[int] = None
+    ) -> List[Schedule]:
+        """
+        Get schedules by IDs in one query, with relationships.
+        如果提供campus_id_filter，只返回该校区的排课。
+        """
+        query = (
+            select(Schedule)
+            .options(
+                selectinload(Schedule.class_plan),
+                selectinload(Schedule.teacher),
+                selectinload(Schedule.classroom),
+            )
+            .where(Schedule.id.in_(schedule_ids))
+        )
+        if campus_id_filter is not None:
+            query = query.where(Schedule.campus_id == campus_id_filter)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def get_schedules(
         self,
         page: int = 1,
@@ -115,16 +180,21 @@ class ScheduleService:
         status: Optional[str] = None,
         campus_id: Optional[int] = None,
         batch_no: Optional[str] = None,
-    ) -> tuple[List[Schedule], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
+    ) -> tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
         """
         Get paginated list of schedules with filters.
-        支持校区过滤和批次号过滤。
+        支持校区过滤和批次号过滤；传入 cursor 时按游标分页。
+        列级查询，直接返回字典列表（结构同 ScheduleResponse）；
+        传入 fields（SCHEDULE_FIELDS.parse 的结果）时只查询这些字段。
+
+        Returns:
+            Tuple of (schedules, total count, next cursor)
         """
-        query = select(Schedule).options(
-            selectinload(Schedule.class_plan),
-            selectinload(Schedule.teacher),
-            selectinload(Schedule.classroom),
-        )
+        fields = fields or SCHEDULE_FIELDS.allowed
+        query = select(Schedule)
 
         # 校区过滤
         if campus_id is not None:
@@ -145,17 +215,15 @@ class ScheduleService:
             query = query.where(Schedule.batch_no == batch_no)
 
         # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = await count_total(self.db, query, include_total)
 
         # Apply pagination
-        offset = (page - 1) * page_size
-        query = query.order_by(Schedule.schedule_date.desc(), Schedule.start_time).offset(offset).limit(page_size)
+        query = SCHEDULE_FIELDS.apply(query, fields, SCHEDULE_KEYSET.columns())
+        query = SCHEDULE_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        schedules = list(result.scalars().all())
-
-        return schedules, total
+        rows, next_cursor = SCHEDULE_KEYSET.page(result.all(), page_size)
+        return SCHEDULE_FIELDS.to_dicts(rows, fields), total, next_cursor
 
     async def get_calendar_events(
         self,
@@ -164,18 +232,21 @@ class ScheduleService:
         class_plan_id: Optional[int] = None,
         teacher_id: Optional[int] = None,
         campus_id: Optional[int] = None,
-    ) -> List[Schedule]:
+    ) -> List[CalendarRow]:
         """
         Get schedules for calendar view (no pagination).
-        支持校区过滤。
+        支持校区过滤。日历一次取整段日期，按列查询并 join 班级/教师/教室名称，返回只读行。
         """
-        query = select(Schedule).options(
-            selectinload(Schedule.class_plan),
-            selectinload(Schedule.teacher),
-            selectinload(Schedule.classroom),
-        ).where(
-            Schedule.schedule_date >= start_date,
-            Schedule.schedule_date <= end_date,
+        query = (
+            select(*CALENDAR_COLUMNS)
+            .select_from(Schedule)
+            .outerjoin(ClassPlan, Schedule.class_plan_id == ClassPlan.id)
+            .outerjoin(Teacher, Schedule.teacher_id == Teacher.id)
+            .outerjoin(Classroom, Schedule.classroom_id == Classroom.id)
+            .where(
+                Schedule.schedule_date >= start_date,
+                Schedule.schedule_date <= end_date,
+            )
         )
 
         # 校区过滤
@@ -189,7 +260,7 @@ class ScheduleService:
 
         query = query.order_by(Schedule.schedule_date, Schedule.start_time)
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return CalendarRow.from_rows(result.all())
 
     async def update_schedule(
         self,
@@ -4,7 +4,7 @@ Student Attendance service.
 from datetime import datetime
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -19,6 +19,10 @@ from app.schemas.student_attendance import (
     AttendanceMarkRequest,
 )
 from app.core.exceptions import NotFoundException, ConflictException, BadRequestException
+from app.core.pagination import Keyset, count_total
+
+
+ATTENDANCE_KEYSET = Keyset(StudentAttendance.id.desc())
 
 
 class StudentAttendanceService:
@@ -55,8 +59,10 @@ class StudentAttendanceService:
         page: int = 1,
         page_size: int = 20,
         status: Optional[str] = None,
-    ) -> Tuple[List[dict], int]:
-        """Get student's attendance records with detailed info."""
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        """Get student's attendance records with detailed info (cursor pagination when cursor is given)."""
         # 先获取学生的所有报名
         enrollment_result = await self.db.execute(
             select(Enrollment.id).where(Enrollment.student_id == student_id)
@@ -64,7 +70,7 @@ class StudentAttendanceService:
         enrollment_ids = [row[0] for row in enrollment_result.fetchall()]
 
         if not enrollment_ids:
-            return [], 0
+            return [], 0, None
 
         # 查询出勤记录
         query = (
@@ -80,19 +86,13 @@ class StudentAttendanceService:
             query = query.where(StudentAttendance.status == status)
 
         # Count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
         # Paginate
-        query = (
-            query.order_by(StudentAttendance.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
+        query = ATTENDANCE_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        attendances = result.scalars().all()
+        attendances, next_cursor = ATTENDANCE_KEYSET.page(result.scalars().all(), page_size)
 
         # 构造详细响应
         items = []
@@ -118,7 +118,7 @@ class StudentAttendanceService:
                 "class_plan_name": class_plan_name,
             })
 
-        return items, total_count
+        return items, total_count, next_cursor
 
     async def get_schedule_attendance_list(
         self, schedule_id: int
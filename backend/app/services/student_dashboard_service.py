@@ -0,0 +1,445 @@
+"""
+Student dashboard service.
+学生仪表盘服务：概览、我的课程、学习记录三个 Tab 共用同一组联表查询和 SQL 聚合，
+并按学生做短时缓存（学生通常会连续打开这三个 Tab）。
+学习记录为出勤与课消的 UNION ALL 时间线，游标分页，响应大小与学员在读时长无关。
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import (
+    Boolean, Numeric, String, Text, and_, cast, func, literal, null, or_, select, union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import BadRequestException
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.timeseries import as_date
+from app.models.campus import Classroom
+from app.models.class_plan import ClassPlan
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson_record import LessonRecord
+from app.models.schedule import Schedule
+from app.models.student_attendance import StudentAttendance
+from app.models.teacher import Teacher
+from app.schemas.dashboard import (
+    KpiCard,
+    StudentAttendanceRecord,
+    StudentDashboardCourses,
+    StudentDashboardOverview,
+    StudentDashboardRecords,
+    StudentEnrollmentItem,
+    StudentLessonRecord,
+    StudentScheduleItem,
+    StudentTimelineItem,
+)
+
+# 按学生缓存的公共数据：key 为 (类型, student_id)
+# 过期时间很短，报名、出勤变化后最多延迟一个 TTL 可见
+student_summary_cache = TTLCache(
+    "student_dashboard",
+    maxsize=settings.student_dashboard_cache_max_entries,
+    ttl=settings.student_dashboard_cache_ttl_seconds,
+)
+
+ATTENDANCE_STATUSES = ("normal", "leave", "absent")
+
+
+class StudentDashboardService:
+    """Service for student dashboard tabs."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_enrollments(self, student_id: int) -> List[dict]:
+        """
+        获取学生的全部报名（含班级、课程、主讲教师名称），按报名时间倒序。
+        单次联表查询，结果按学生缓存。
+        """
+        key = ("enrollments", student_id)
+        rows = student_summary_cache.get(key)
+        if rows is not None:
+            return rows
+
+        result = await self.db.execute(
+            select(
+                Enrollment.id,
+                Enrollment.class_plan_id,
+                Enrollment.purchased_hours,
+                Enrollment.used_hours,
+                Enrollment.status,
+                Enrollment.enroll_date,
+                ClassPlan.name.label("class_plan_name"),
+                Course.name.label("course_name"),
+                Teacher.name.label("teacher_name"),
+            )
+            .outerjoin(ClassPlan, ClassPlan.id == Enrollment.class_plan_id)
+            .outerjoin(Course, Course.id == ClassPlan.course_id)
+            .outerjoin(Teacher, Teacher.id == ClassPlan.teacher_id)
+            .where(Enrollment.student_id == student_id)
+            .order_by(Enrollment.created_time.desc())
+        )
+        rows = [dict(row._mapping) for row in result.all()]
+        student_summary_cache.set(key, rows)
+        return rows
+
+    async def get_attendance_counts(self, student_id: int) -> dict:
+        """
+        按报名状态和出勤状态聚合学生的出勤次数。
+
+        Returns:
+            {"all": {status: count}, "active": {status: count}}，
+            active 只统计在读报名下的出勤
+        """
+        key = ("attendance", student_id)
+        counts = student_summary_cache.get(key)
+        if counts is not None:
+            return counts
+
+        result = await self.db.execute(
+            select(
+                Enrollment.status,
+                StudentAttendance.status,
+                func.count(StudentAttendance.id),
+            )
+            .join(Enrollment, Enrollment.id == StudentAttendance.enrollment_id)
+            .where(Enrollment.student_id == student_id)
+            .group_by(Enrollment.status, StudentAttendance.status)
+        )
+
+        counts = {"all": {}, "active": {}}
+        for enrollment_status, attendance_status, count in result.all():
+            counts["all"][attendance_status] = counts["all"].get(attendance_status, 0) + count
+            if enrollment_status == "active":
+                counts["active"][attendance_status] = counts["active"].get(attendance_status, 0) + count
+        student_summary_cache.set(key, counts)
+        return counts
+
+    async def _get_upcoming_schedules(
+        self,
+        active_enrollments: List[dict],
+        start: date,
+        end: date,
+    ) -> List[StudentScheduleItem]:
+        """查询在读班级的近期排课，同时带出教室、教师和学生的出勤状态"""
+        if not active_enrollments:
+            return []
+
+        class_plan_ids = [e["class_plan_id"] for e in active_enrollments]
+        enrollment_ids = [e["id"] for e in active_enrollments]
+        schedule_teacher = aliased(Teacher)
+        plan_teacher = aliased(Teacher)
+
+        result = await self.db.execute(
+            select(
+                Schedule.id,
+                Schedule.schedule_date,
+                Schedule.start_time,
+                Schedule.end_time,
+                Schedule.class_plan_id,
+                Schedule.status,
+                ClassPlan.name.label("class_plan_name"),
+                Course.name.label("course_name"),
+                func.coalesce(schedule_teacher.name, plan_teacher.name).label("teacher_name"),
+                Classroom.name.label("classroom_name"),
+                StudentAttendance.status.label("attendance_status"),
+            )
+            .outerjoin(ClassPlan, ClassPlan.id == Schedule.class_plan_id)
+            .outerjoin(Course, Course.id == ClassPlan.course_id)
+            .outerjoin(schedule_teacher, schedule_teacher.id == Schedule.teacher_id)
+            .outerjoin(plan_teacher, plan_teacher.id == ClassPlan.teacher_id)
+            .outerjoin(Classroom, Classroom.id == Schedule.classroom_id)
+            .outerjoin(
+                StudentAttendance,
+                and_(
+                    StudentAttendance.schedule_id == Schedule.id,
+                    StudentAttendance.enrollment_id.in_(enrollment_ids),
+                ),
+            )
+            .where(
+                and_(
+                    Schedule.class_plan_id.in_(class_plan_ids),
+                    Schedule.schedule_date >= start,
+                    Schedule.schedule_date <= end,
+                    Schedule.status != "cancelled",
+                )
+            )
+            .order_by(Schedule.schedule_date, Schedule.start_time)
+        )
+
+        return [
+            StudentScheduleItem(
+                schedule_id=row.id,
+                schedule_date=row.schedule_date,
+                start_time=row.start_time,
+                end_time=row.end_time,
+                class_plan_id=row.class_plan_id,
+                class_plan_name=row.class_plan_name or "",
+                course_name=row.course_name or "",
+                teacher_name=row.teacher_name,
+                classroom_name=row.classroom_name,
+                status=row.status,
+                attendance_status=row.attendance_status,
+            )
+            for row in result.all()
+        ]
+
+    async def build_overview(self, student_id: int) -> dict:
+        """学生仪表盘概览：KPI 卡片 + 未来7天排课"""
+        today = date.today()
+        enrollments = await self.get_enrollments(student_id)
+        active_enrollments = [e for e in enrollments if e["status"] == "active"]
+
+        total_remaining = sum(
+            (e["purchased_hours"] - e["used_hours"] for e in active_enrollments),
+            Decimal("0"),
+        )
+        upcoming_schedules = await self._get_upcoming_schedules(
+            active_enrollments, today, today + timedelta(days=7)
+        )
+
+        active_counts = (await self.get_attendance_counts(student_id))["active"]
+        total_attendance = sum(active_counts.values())
+        attendance_rate = 0.0
+        if total_attendance > 0:
+            attendance_rate = round(active_counts.get("normal", 0) / total_attendance * 100, 1)
+
+        return StudentDashboardOverview(
+            total_remaining_hours=KpiCard(
+                label="剩余课时",
+                value=float(total_remaining),
+                unit="课时",
+            ),
+            upcoming_class_count=KpiCard(
+                label="近7天课程",
+                value=len(upcoming_schedules),
+                unit="节",
+            ),
+            attendance_rate=KpiCard(
+                label="出勤率",
+                value=attendance_rate,
+                unit="%",
+            ),
+            active_enrollment_count=KpiCard(
+                label="在读班级",
+                value=len(active_enrollments),
+                unit="个",
+            ),
+            upcoming_schedules=upcoming_schedules,
+        ).model_dump()
+
+    async def build_courses(self, student_id: int) -> dict:
+        """我的课程：每个报名班级的课时进度"""
+        enrollment_items = []
+        for e in await self.get_enrollments(student_id):
+            total = float(e["purchased_hours"])
+            used = float(e["used_hours"])
+            progress = round((used / total * 100) if total > 0 else 0, 1)
+
+            enrollment_items.append(StudentEnrollmentItem(
+                enrollment_id=e["id"],
+                class_plan_id=e["class_plan_id"],
+                class_plan_name=e["class_plan_name"] or "",
+                course_name=e["course_name"] or "",
+                teacher_name=e["teacher_name"],
+                total_hours=e["purchased_hours"],
+                remaining_hours=Decimal(str(total - used)),
+                consumed_hours=e["used_hours"],
+                progress_percent=progress,
+                status=e["status"],
+                enroll_date=e["enroll_date"] or date.today(),
+            ))
+
+        return StudentDashboardCourses(
+            enrollments=enrollment_items,
+            hours_by_course=[],  # 可以后续扩展
+            progress_trend=[],   # 可以后续扩展
+        ).model_dump()
+
+    def _timeline_query(
+        self,
+        enrollment_ids: List[int],
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ):
+        """
+        出勤事件与课消事件的 UNION ALL 子查询，两边列结构一致。
+        """
+        attendance_query = (
+            select(
+                literal("attendance").label("event_type"),
+                StudentAttendance.id.label("event_id"),
+                Schedule.schedule_date.label("event_date"),
+                StudentAttendance.schedule_id.label("schedule_id"),
+                ClassPlan.name.label("class_plan_name"),
+                Course.name.label("course_name"),
+                Teacher.name.label("teacher_name"),
+                StudentAttendance.status.label("status"),
+                StudentAttendance.leave_reason.label("leave_reason"),
+                StudentAttendance.deduct_hours.label("deduct_hours"),
+                cast(null(), Numeric(10, 1)).label("hours"),
+                cast(null(), String(20)).label("type"),
+                StudentAttendance.notes.label("notes"),
+            )
+            .join(Schedule, Schedule.id == StudentAttendance.schedule_id)
+            .join(Enrollment, Enrollment.id == StudentAttendance.enrollment_id)
+            .outerjoin(ClassPlan, ClassPlan.id == Enrollment.class_plan_id)
+            .outerjoin(Course, Course.id == ClassPlan.course_id)
+            .outerjoin(Teacher, Teacher.id == ClassPlan.teacher_id)
+            .where(StudentAttendance.enrollment_id.in_(enrollment_ids))
+        )
+        lesson_query = (
+            select(
+                literal("lesson").label("event_type"),
+                LessonRecord.id.label("event_id"),
+                LessonRecord.record_date.label("event_date"),
+                LessonRecord.schedule_id.label("schedule_id"),
+                ClassPlan.name.label("class_plan_name"),
+                Course.name.label("course_name"),
+                Teacher.name.label("teacher_name"),
+                cast(null(), String(20)).label("status"),
+                cast(null(), Text).label("leave_reason"),
+                cast(null(), Boolean).label("deduct_hours"),
+                LessonRecord.hours.label("hours"),
+                LessonRecord.type.label("type"),
+                LessonRecord.notes.label("notes"),
+            )
+            .join(Enrollment, Enrollment.id == LessonRecord.enrollment_id)
+            .outerjoin(ClassPlan, ClassPlan.id == Enrollment.class_plan_id)
+            .outerjoin(Course, Course.id == ClassPlan.course_id)
+            .outerjoin(Teacher, Teacher.id == ClassPlan.teacher_id)
+            .where(LessonRecord.enrollment_id.in_(enrollment_ids))
+        )
+
+        if start_date:
+            attendance_query = attendance_query.where(Schedule.schedule_date >= start_date)
+            lesson_query = lesson_query.where(LessonRecord.record_date >= start_date)
+        if end_date:
+            attendance_query = attendance_query.where(Schedule.schedule_date <= end_date)
+            lesson_query = lesson_query.where(LessonRecord.record_date <= end_date)
+
+        return union_all(attendance_query, lesson_query).subquery("timeline")
+
+    async def build_records(
+        self,
+        student_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+    ) -> dict:
+        """
+        学习记录：出勤统计 + 出勤/课消合并时间线。
+        时间线按 (日期, 事件类型, ID) 倒序做游标分页，每次只返回一页；
+        出勤统计由单独的聚合查询得出，与分页无关。
+        """
+        enrollments = await self.get_enrollments(student_id)
+        enrollment_ids = [e["id"] for e in enrollments]
+
+        all_counts = (await self.get_attendance_counts(student_id))["all"]
+        attendance_summary = {"total": sum(all_counts.values())}
+        for status in ATTENDANCE_STATUSES:
+            attendance_summary[status] = all_counts.get(status, 0)
+
+        if not enrollment_ids:
+            return StudentDashboardRecords(
+                attendance_summary=attendance_summary,
+                consumption_trend=[],
+            ).model_dump()
+
+        timeline = self._timeline_query(enrollment_ids, start_date, end_date)
+        query = select(timeline)
+
+        after = decode_cursor(cursor)
+        if after is not None:
+            try:
+                after_date = date.fromisoformat(after["d"])
+                after_type = str(after["t"])
+                after_id = int(after["id"])
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException("无效的分页游标")
+            c = timeline.c
+            query = query.where(
+                or_(
+                    c.event_date < after_date,
+                    and_(c.event_date == after_date, c.event_type < after_type),
+                    and_(
+                        c.event_date == after_date,
+                        c.event_type == after_type,
+                        c.event_id < after_id,
+                    ),
+                )
+            )
+
+        result = await self.db.execute(
+            query.order_by(
+                timeline.c.event_date.desc(),
+                timeline.c.event_type.desc(),
+                timeline.c.event_id.desc(),
+            ).limit(page_size + 1)
+        )
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                {"d": as_date(last.event_date), "t": last.event_type, "id": last.event_id}
+            )
+
+        items = []
+        recent_attendance = []
+        lesson_records = []
+        for row in rows:
+            item = StudentTimelineItem(
+                event_type=row.event_type,
+                event_id=row.event_id,
+                event_date=as_date(row.event_date),
+                schedule_id=row.schedule_id,
+                class_plan_name=row.class_plan_name or "",
+                course_name=row.course_name or "",
+                teacher_name=row.teacher_name,
+                status=row.status,
+                leave_reason=row.leave_reason,
+                deduct_hours=row.deduct_hours,
+                hours=row.hours,
+                type=row.type,
+                notes=row.notes,
+            )
+            items.append(item)
+            if item.event_type == "attendance":
+                recent_attendance.append(StudentAttendanceRecord(
+                    attendance_id=item.event_id,
+                    schedule_id=item.schedule_id,
+                    schedule_date=item.event_date,
+                    class_plan_name=item.class_plan_name,
+                    status=item.status,
+                    leave_reason=item.leave_reason,
+                    deduct_hours=bool(item.deduct_hours),
+                ))
+            else:
+                lesson_records.append(StudentLessonRecord(
+                    record_id=item.event_id,
+                    record_date=item.event_date,
+                    hours=item.hours,
+                    class_plan_name=item.class_plan_name,
+                    course_name=item.course_name,
+                    teacher_name=item.teacher_name,
+                    type=item.type,
+                    notes=item.notes,
+                ))
+
+        return StudentDashboardRecords(
+            attendance_summary=attendance_summary,
+            timeline=items,
+            next_cursor=next_cursor,
+            recent_attendance=recent_attendance,
+            lesson_records=lesson_records,
+            consumption_trend=[],  # 可以后续扩展
+        ).model_dump()
@@ -2,17 +2,60 @@
 Student service with campus scope support.
 学生服务层，支持校区数据隔离。
 """
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.student import Student
 from app.models.user import User
-from app.schemas.student import StudentCreate, StudentUpdate
+from app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
 from app.core.exceptions import NotFoundException, ConflictException, ForbiddenException
-from app.core.security import get_password_hash
+from app.core.pagination import Keyset, count_total
+from app.core.projection import Projection
+from app.core.search import SearchSpec
+from app.core.security import get_password_hash_async
+from app.core.typeahead import Typeahead, TypeaheadEntry, rows_in_order
+from app.core.versions import STUDENT_TYPEAHEAD_VERSION, STUDENT_VERSION, bump_scoped_versions
+from app.database import get_dialect_name
+
+
+STUDENT_KEYSET = Keyset(Student.id.desc())
+STUDENT_SEARCH = SearchSpec(
+    text_columns=[Student.name],
+    digit_columns=[Student.phone_digits, Student.parent_phone_digits],
+    pinyin_columns=[Student.name_pinyin, Student.name_initials],
+)
+# 学生列表的 fields= 可选字段
+STUDENT_FIELDS = Projection(Student, StudentResponse)
+
+
+def _student_entry(student) -> TypeaheadEntry:
+    return TypeaheadEntry(
+        id=student.id,
+        name=student.name,
+        scope=student.campus_id,
+        aliases=(student.name_pinyin, student.name_initials),
+        phones=(student.phone, student.parent_phone),
+        attrs={"is_active": student.is_active},
+    )
+
+
+async def _load_student_entries(db: AsyncSession, campus_id: Optional[int]) -> List[TypeaheadEntry]:
+    query = select(
+        Student.id, Student.name, Student.campus_id, Student.name_pinyin, Student.name_initials,
+        Student.phone, Student.parent_phone, Student.is_active,
+    )
+    if campus_id is not None:
+        query = query.where(Student.campus_id == campus_id)
+    result = await db.execute(query)
+    return [_student_entry(row) for row in result.all()]
+
+
+STUDENT_TYPEAHEAD = Typeahead(
+    "typeahead_students", STUDENT_TYPEAHEAD_VERSION, _load_student_entries, _student_entry
+)
 
 
 class StudentService:
@@ -44,6 +87,21 @@ class StudentService:
 
         return student
 
+    async def get_by_ids(
+        self,
+        student_ids: List[int],
+        campus_id_filter: Optional[int] = None
+    ) -> List[Student]:
+        """
+        Get students by IDs in one query.
+        如果提供campus_id_filter，只返回该校区的学生（其他校区的学生视为不存在）。
+        """
+        query = select(Student).options(selectinload(Student.campus)).where(Student.id.in_(student_ids))
+        if campus_id_filter is not None:
+            query = query.where(Student.campus_id == campus_id_filter)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def get_all(
         self,
         page: int = 1,
@@ -54,12 +112,19 @@ class StudentService:
         campus_id: Optional[int] = None,
         grade: Optional[str] = None,
         source: Optional[str] = None,
-    ) -> Tuple[List[Student], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Any], Optional[int], Optional[str]]:
         """
         Get students with pagination and filters.
-        支持校区过滤、年级过滤、来源过滤。
+        支持校区过滤、年级过滤、来源过滤；传入 cursor 时按游标分页。
+        search 匹配姓名、姓名拼音、学生电话、家长电话，结果按相关度排序（按相关度排序时不返回游标）。
+        传入 fields（STUDENT_FIELDS.parse 的结果）时只查询这些字段，返回字典列表。
         """
-        query = select(Student).options(selectinload(Student.campus))
+        query = select(Student)
+        if fields is None:
+            query = query.options(selectinload(Student.campus))
 
         # 校区过滤
         if campus_id is not None:
@@ -74,25 +139,24 @@ class StudentService:
         if source:
             query = query.where(Student.source == source)
         if search:
-            query = query.where(
-                Student.name.ilike(f"%{search}%") |
-                Student.phone.ilike(f"%{search}%") |
-                Student.parent_phone.ilike(f"%{search}%")
-            )
+            query = query.where(STUDENT_SEARCH.condition(search))
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
-        query = (
-            query
-            .order_by(Student.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
+        # 搜索结果按相关度排序，相关度不属于游标排序键，因此只支持页码分页
+        ranked = bool(search) and not cursor
+        if ranked:
+            query = query.order_by(*STUDENT_SEARCH.rank(search, get_dialect_name(self.db)))
+        if fields is not None:
+            query = STUDENT_FIELDS.apply(query, fields, STUDENT_KEYSET.columns())
+        query = STUDENT_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        return list(result.scalars().all()), total_count
+        if fields is not None:
+            rows, next_cursor = STUDENT_KEYSET.page(result.all(), page_size)
+            return STUDENT_FIELDS.to_dicts(rows, fields), total_count, None if ranked else next_cursor
+        students, next_cursor = STUDENT_KEYSET.page(result.scalars().all(), page_size)
+        return students, total_count, None if ranked else next_cursor
 
     async def get_all_active(self, campus_id: Optional[int] = None) -> List[Student]:
         """Get all active students (for dropdowns)."""
@@ -109,10 +173,11 @@ class StudentService:
     async def get_all_dropdown(
         self,
         active_only: bool = True,
-        campus_id: Optional[int] = None
+        campus_id: Optional[int] = None,
+        search: Optional[str] = None,
     ) -> List[Student]:
-        """Get all students for dropdown."""
-        query = select(Student).order_by(Student.name)
+        """Get all students for dropdown (search 支持姓名、拼音首字母、电话)."""
+        query = select(Student)
 
         # 校区过滤
         if campus_id is not None:
@@ -121,9 +186,29 @@ class StudentService:
         if active_only:
             query = query.where(Student.is_active == True)
 
+        if search:
+            query = query.where(STUDENT_SEARCH.condition(search))
+            query = query.order_by(*STUDENT_SEARCH.rank(search, get_dialect_name(self.db)))
+        query = query.order_by(Student.name)
+
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def typeahead(
+        self,
+        q: str,
+        limit: int = 20,
+        active_only: bool = True,
+        campus_id: Optional[int] = None,
+    ) -> List[Student]:
+        """下拉输入联想：在内存索引中取最匹配的 limit 个学生（姓名、拼音、电话）"""
+        filters = {"is_active": True} if active_only else {}
+        ids = await STUDENT_TYPEAHEAD.search(self.db, q, limit, scope=campus_id, **filters)
+        if not ids:
+            return []
+        result = await self.db.execute(select(Student).where(Student.id.in_(ids)))
+        return rows_in_order(result.scalars().all(), ids)
+
     async def create(self, data: StudentCreate, created_by: str) -> Student:
         """
         Create student with auto-created user account.
@@ -152,7 +237,7 @@ class StudentService:
 
             # 密码为手机号后6位
             password = data.phone[-6:]
-            hashed_password = get_password_hash(password)
+            hashed_password = await get_password_hash_async(password)
 
             # 创建用户（关联校区）
             user = User(
@@ -191,6 +276,8 @@ class StudentService:
         )
         self.db.add(student)
         await self.db.flush()
+        await STUDENT_TYPEAHEAD.changed(self.db, student)
+        await bump_scoped_versions(self.db, STUDENT_VERSION, [student.campus_id])
         return student
 
     async def update(
@@ -205,6 +292,7 @@ class StudentService:
         如果提供campus_id_filter，会检查学生是否属于该校区。
         """
         student = await self.get_by_id(student_id, campus_id_filter=campus_id_filter)
+        previous = STUDENT_TYPEAHEAD.entry(student)
 
         update_data = data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -212,6 +300,8 @@ class StudentService:
         student.updated_by = updated_by
 
         await self.db.flush()
+        await STUDENT_TYPEAHEAD.changed(self.db, student, previous)
+        await bump_scoped_versions(self.db, STUDENT_VERSION, [previous.scope, student.campus_id])
         return student
 
     async def delete(
@@ -225,6 +315,8 @@ class StudentService:
         """
         student = await self.get_by_id(student_id, campus_id_filter=campus_id_filter)
         await self.db.delete(student)
+        await STUDENT_TYPEAHEAD.removed(self.db, student)
+        await bump_scoped_versions(self.db, STUDENT_VERSION, [student.campus_id])
 
     async def update_status(
         self,
@@ -250,6 +342,7 @@ class StudentService:
         student.status = status
         student.updated_by = updated_by
         await self.db.flush()
+        await bump_scoped_versions(self.db, STUDENT_VERSION, [student.campus_id])
         return student
 
     async def update_students_status_by_enrollment(
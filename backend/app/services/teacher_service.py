@@ -3,14 +3,49 @@ Teacher service.
 """
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.teacher import Teacher
 from app.models.user import User
 from app.schemas.teacher import TeacherCreate, TeacherUpdate
 from app.core.exceptions import NotFoundException, ConflictException
-from app.core.security import get_password_hash
+from app.core.pagination import count_total
+from app.core.search import SearchSpec
+from app.core.security import get_password_hash_async
+from app.core.typeahead import Typeahead, TypeaheadEntry, rows_in_order
+from app.core.versions import TEACHER_TYPEAHEAD_VERSION, TEACHER_VERSION, bump_version
+from app.database import get_dialect_name
+
+
+TEACHER_SEARCH = SearchSpec(
+    text_columns=[Teacher.name],
+    digit_columns=[Teacher.phone_digits],
+    pinyin_columns=[Teacher.name_pinyin, Teacher.name_initials],
+)
+
+
+def _teacher_entry(teacher) -> TypeaheadEntry:
+    return TypeaheadEntry(
+        id=teacher.id,
+        name=teacher.name,
+        aliases=(teacher.name_pinyin, teacher.name_initials),
+        phones=(teacher.phone,),
+        attrs={"is_active": teacher.is_active},
+    )
+
+
+async def _load_teacher_entries(db: AsyncSession, scope: Optional[int]) -> List[TypeaheadEntry]:
+    # 教师不分校区，只有一个全局索引
+    result = await db.execute(select(
+        Teacher.id, Teacher.name, Teacher.name_pinyin, Teacher.name_initials, Teacher.phone, Teacher.is_active,
+    ))
+    return [_teacher_entry(row) for row in result.all()]
+
+
+TEACHER_TYPEAHEAD = Typeahead(
+    "typeahead_teachers", TEACHER_TYPEAHEAD_VERSION, _load_teacher_entries, _teacher_entry, scoped=False
+)
 
 
 class TeacherService:
@@ -29,6 +64,13 @@ class TeacherService:
             raise NotFoundException(f"教师不存在: {teacher_id}")
         return teacher
 
+    async def get_by_ids(self, teacher_ids: List[int]) -> List[Teacher]:
+        """按ID列表一次查询多个教师"""
+        result = await self.db.execute(
+            select(Teacher).where(Teacher.id.in_(teacher_ids))
+        )
+        return list(result.scalars().all())
+
     async def get_all(
         self,
         page: int = 1,
@@ -38,7 +80,8 @@ class TeacherService:
         search: Optional[str] = None,
         subjects: Optional[List[str]] = None,
         grade_levels: Optional[List[str]] = None,
-    ) -> Tuple[List[Teacher], int]:
+        include_total: bool = True,
+    ) -> Tuple[List[Teacher], Optional[int]]:
         """Get teachers with pagination and filters."""
         query = select(Teacher)
 
@@ -47,10 +90,7 @@ class TeacherService:
         if is_active is not None:
             query = query.where(Teacher.is_active == is_active)
         if search:
-            query = query.where(
-                Teacher.name.ilike(f"%{search}%") |
-                Teacher.phone.ilike(f"%{search}%")
-            )
+            query = query.where(TEACHER_SEARCH.condition(search))
         # 科目过滤：使用 overlap 操作符检查是否有交集
         if subjects:
             query = query.where(Teacher.subjects.overlap(subjects))
@@ -58,10 +98,10 @@ class TeacherService:
         if grade_levels:
             query = query.where(Teacher.grade_levels.overlap(grade_levels))
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
-        total_count = total.scalar() or 0
+        total_count = await count_total(self.db, query, include_total)
 
+        if search:
+            query = query.order_by(*TEACHER_SEARCH.rank(search, get_dialect_name(self.db)))
         query = (
             query
             .order_by(Teacher.id.desc())
@@ -81,15 +121,31 @@ class TeacherService:
         )
         return list(result.scalars().all())
 
-    async def get_all_dropdown(self, active_only: bool = True) -> List[Teacher]:
-        """Get all teachers for dropdown (optionally filtered by active status)."""
+    async def get_all_dropdown(
+        self,
+        active_only: bool = True,
+        search: Optional[str] = None,
+    ) -> List[Teacher]:
+        """Get all teachers for dropdown (optionally filtered by active status and search)."""
         query = select(Teacher)
         if active_only:
             query = query.where(Teacher.is_active == True)
+        if search:
+            query = query.where(TEACHER_SEARCH.condition(search))
+            query = query.order_by(*TEACHER_SEARCH.rank(search, get_dialect_name(self.db)))
         query = query.order_by(Teacher.name)
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def typeahead(self, q: str, limit: int = 20, active_only: bool = True) -> List[Teacher]:
+        """下拉输入联想：在内存索引中取最匹配的 limit 个教师（姓名、拼音、电话）"""
+        filters = {"is_active": True} if active_only else {}
+        ids = await TEACHER_TYPEAHEAD.search(self.db, q, limit, **filters)
+        if not ids:
+            return []
+        result = await self.db.execute(select(Teacher).where(Teacher.id.in_(ids)))
+        return rows_in_order(result.scalars().all(), ids)
+
     async def create(self, data: TeacherCreate, created_by: str) -> Teacher:
         """
         Create teacher with auto-created user account.
@@ -118,7 +174,7 @@ class TeacherService:
 
             # 密码为手机号后6位
             password = data.phone[-6:]
-            hashed_password = get_password_hash(password)
+            hashed_password = await get_password_hash_async(password)
 
             # 创建用户
             user = User(
@@ -154,11 +210,14 @@ class TeacherService:
         )
         self.db.add(teacher)
         await self.db.flush()
+        await TEACHER_TYPEAHEAD.changed(self.db, teacher)
+        await bump_version(self.db, TEACHER_VERSION)
         return teacher
 
     async def update(self, teacher_id: int, data: TeacherUpdate, updated_by: str) -> Teacher:
         """Update teacher."""
         teacher = await self.get_by_id(teacher_id)
+        previous = TEACHER_TYPEAHEAD.entry(teacher)
 
         update_data = data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -166,9 +225,13 @@ class TeacherService:
         teacher.updated_by = updated_by
 
         await self.db.flush()
+        await TEACHER_TYPEAHEAD.changed(self.db, teacher, previous)
+        await bump_version(self.db, TEACHER_VERSION)
         return teacher
 
     async def delete(self, teacher_id: int) -> None:
         """Delete teacher."""
         teacher = await self.get_by_id(teacher_id)
         await self.db.delete(teacher)
+        await TEACHER_TYPEAHEAD.removed(self.db, teacher)
+        await bump_version(self.db, TEACHER_VERSION)
@@ -4,16 +4,29 @@ User management service for CRUD operations.
 """
 from typing import List, Optional
 
-from sqlalchemy import func, select, update, delete
+from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exceptions import BadRequestException, ConflictException, NotFoundException
-from app.core.security import get_password_hash
+from app.core.pagination import Keyset, count_total
+from app.core.presence import presence
+from app.core.principal import invalidate_principal
+from app.core.search import SearchSpec, digits_only
+from app.core.security import get_password_hash_async
+from app.core.versions import USER_VERSION, bump_version
 from app.models.user import LoginLog, Role, User
 from app.models.permission import UserRole
 from app.models.campus import Campus
 from app.schemas.user import UserCreate, UserUpdate
+from app.database import get_dialect_name
+
+
+USER_SEARCH = SearchSpec(
+    text_columns=[User.username, User.email],
+    digit_columns=[User.phone_digits],
+)
+LOGIN_LOG_KEYSET = Keyset(LoginLog.login_time.desc(), LoginLog.id.desc())
 
 
 class UserService:
@@ -64,7 +77,7 @@ class UserService:
             username=user_data.username,
             email=user_data.email,
             phone=user_data.phone,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash_async(user_data.password),
             role=user_data.role.value,
             role_id=user_data.role_id,  # RBAC角色ID
             campus_id=user_data.campus_id,  # 所属校区
@@ -116,7 +129,8 @@ class UserService:
         is_active: Optional[bool] = None,
         is_online: Optional[bool] = None,
         search: Optional[str] = None,
-    ) -> tuple[List[User], int]:
+        include_total: bool = True,
+    ) -> tuple[List[User], Optional[int]]:
         """
         Get paginated list of users with filters.
 
@@ -126,8 +140,9 @@ class UserService:
             role: Filter by role (legacy)
             role_id: Filter by RBAC role ID
             is_active: Filter by active status
-            is_online: Filter by online status
+            is_online: Filter by online status (in-memory presence)
             search: Search by username/email/phone
+            include_total: Whether to count matching rows (None when skipped)
 
         Returns:
             Tuple of (users list, total count)
@@ -136,6 +151,7 @@ class UserService:
             selectinload(User.user_role),  # 预加载RBAC角色
             selectinload(User.campus),  # 预加载校区
         )
+        online_ids = presence.online_user_ids() if is_online is not None else None
 
         # Apply filters
         if role:
@@ -145,36 +161,16 @@ class UserService:
         if is_active is not None:
             query = query.where(User.is_active == is_active)
         if is_online is not None:
-            query = query.where(User.is_online == is_online)
+            query = query.where(User.id.in_(online_ids) if is_online else User.id.notin_(online_ids))
         if search:
-            search_pattern = f"%{search}%"
-            query = query.where(
-                (User.username.ilike(search_pattern)) |
-                (User.email.ilike(search_pattern)) |
-                (User.phone.ilike(search_pattern))
-            )
+            query = query.where(USER_SEARCH.condition(search))
 
-        # Get total count (without options for efficiency)
-        count_subquery = select(User.id)
-        if role:
-            count_subquery = count_subquery.where(User.role == role)
-        if role_id:
-            count_subquery = count_subquery.where(User.role_id == role_id)
-        if is_active is not None:
-            count_subquery = count_subquery.where(User.is_active == is_active)
-        if is_online is not None:
-            count_subquery = count_subquery.where(User.is_online == is_online)
-        if search:
-            search_pattern = f"%{search}%"
-            count_subquery = count_subquery.where(
-                (User.username.ilike(search_pattern)) |
-                (User.email.ilike(search_pattern)) |
-                (User.phone.ilike(search_pattern))
-            )
-        count_query = select(func.count()).select_from(count_subquery.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        # Get total count (count_total strips loader options and ordering)
+        total = await count_total(self.db, query, include_total)
 
-        # Apply pagination
+        # Apply pagination (search results by relevance first)
+        if search:
+            query = query.order_by(*USER_SEARCH.rank(search, get_dialect_name(self.db)))
         offset = (page - 1) * page_size
         query = query.order_by(User.created_time.desc()).offset(offset).limit(page_size)
 
@@ -230,6 +226,10 @@ class UserService:
             if existing.scalar_one_or_none():
                 raise ConflictException(f"手机号 '{update_dict['phone']}' 已被使用")
 
+        # 批量 UPDATE 不经过模型的 validates，需手动同步纯数字列
+        if "phone" in update_dict:
+            update_dict["phone_digits"] = digits_only(update_dict["phone"])
+
         # Convert role enum to string if present
         if "role" in update_dict and update_dict["role"]:
             update_dict["role"] = update_dict["role"].value
@@ -240,6 +240,8 @@ class UserService:
             update(User).where(User.id == user_id).values(**update_dict)
         )
         await self.db.refresh(user)
+        await bump_version(self.db, USER_VERSION)
+        invalidate_principal(user_id)
         return user
 
     async def delete_user(self, user_id: int) -> None:
@@ -254,6 +256,8 @@ class UserService:
         """
         user = await self.get_user_by_id(user_id)
         await self.db.delete(user)
+        await bump_version(self.db, USER_VERSION)
+        invalidate_principal(user_id)
 
     async def reset_password(
         self,
@@ -271,19 +275,22 @@ class UserService:
         """
         await self.get_user_by_id(user_id)
 
-        hashed = get_password_hash(new_password)
+        hashed = await get_password_hash_async(new_password)
         await self.db.execute(
             update(User)
             .where(User.id == user_id)
             .values(hashed_password=hashed, updated_by=updated_by)
         )
+        await bump_version(self.db, USER_VERSION)
+        invalidate_principal(user_id)
 
     async def get_login_logs(
         self,
         user_id: int,
         page: int = 1,
         page_size: int = 20,
-    ) -> tuple[List[LoginLog], int]:
+        include_total: bool = True,
+    ) -> tuple[List[LoginLog], Optional[int]]:
         """
         Get user's login logs.
 
@@ -301,8 +308,7 @@ class UserService:
         query = select(LoginLog).where(LoginLog.user_id == user_id)
 
         # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = await count_total(self.db, query, include_total)
 
         # Apply pagination
         offset = (page - 1) * page_size
@@ -315,15 +321,18 @@ class UserService:
 
     async def get_online_users(self) -> List[User]:
         """
-        Get all online users.
+        Get all online users (most recently active first).
+        在线用户来自内存中的在线状态，只按主键加载用户。
 
         Returns:
             List of online users
         """
-        result = await self.db.execute(
-            select(User).where(User.is_online == True).order_by(User.last_login.desc())
-        )
-        return list(result.scalars().all())
+        online_ids = presence.online_user_ids()
+        if not online_ids:
+            return []
+        result = await self.db.execute(select(User).where(User.id.in_(online_ids)))
+        users = {user.id: user for user in result.scalars().all()}
+        return [users[user_id] for user_id in online_ids if user_id in users]
 
     async def get_all_login_logs(
         self,
@@ -332,9 +341,12 @@ class UserService:
         user_id: Optional[int] = None,
         status: Optional[str] = None,
         search: Optional[str] = None,
-    ) -> tuple[List[LoginLog], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> tuple[List[LoginLog], Optional[int], Optional[str]]:
         """
         Get all login logs with filters (admin view).
+        传入 cursor 时按游标分页。
 
         Args:
             page: Page number
@@ -342,9 +354,10 @@ class UserService:
             user_id: Filter by user ID
             status: Filter by status (success/failed)
             search: Search by username/IP
+            cursor: Cursor from the previous page
 
         Returns:
-            Tuple of (logs list, total count)
+            Tuple of (logs list, total count, next cursor)
         """
         from sqlalchemy.orm import selectinload
 
@@ -363,14 +376,12 @@ class UserService:
             )
 
         # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = await count_total(self.db, query, include_total)
 
         # Apply pagination
-        offset = (page - 1) * page_size
-        query = query.order_by(LoginLog.login_time.desc()).offset(offset).limit(page_size)
+        query = LOGIN_LOG_KEYSET.paginate(query, cursor, page, page_size)
 
         result = await self.db.execute(query)
-        logs = list(result.scalars().all())
+        logs, next_cursor = LOGIN_LOG_KEYSET.page(result.scalars().all(), page_size)
 
-        return logs, total
+        return logs, total, next_cursor
@@ -0,0 +1,25 @@
+-- =====================================================
+-- Migration: 全局版本号表
+-- Version: 005
+-- Date: 2026-10-19
+-- Description:
+--   1. 新增 system_versions 表，记录各类数据的变更版本号
+--   2. 初始化权限版本号（角色权限变更时递增，各工作进程据此失效本地权限缓存）
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS system_versions (
+    key VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    created_time TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_time TIMESTAMP WITH TIME ZONE,
+    created_by VARCHAR(150),
+    updated_by VARCHAR(150)
+);
+
+COMMENT ON TABLE system_versions IS '全局版本号表';
+COMMENT ON COLUMN system_versions.key IS '版本类别(如permission)';
+COMMENT ON COLUMN system_versions.version IS '版本号，每次变更加1';
+
+INSERT INTO system_versions (key, version, created_by)
+VALUES ('permission', 0, 'migration')
+ON CONFLICT (key) DO NOTHING;
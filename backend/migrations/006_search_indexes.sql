@@ -0,0 +1,54 @@
+-- =====================================================
+-- Migration: 列表搜索索引
+-- Version: 006
+-- Date: 2026-10-19
+-- Description:
+--   1. 启用 pg_trgm 扩展，为学生/教师/用户/课程/开班的搜索列建立三元组 GIN 索引，
+--      ILIKE '%关键词%' 和 similarity() 排序可以走索引，不再全表扫描
+--   2. 新增电话号码纯数字列（去掉空格、横线等），电话搜索按数字匹配并建立索引
+--   3. 回填现有数据的纯数字列
+-- 注意: 中文按字符建三元组需要数据库使用 UTF-8 编码及非 C 的 LC_CTYPE；
+--       少于3个字符的搜索词无法利用三元组索引，会退化为扫描索引
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- =====================================================
+-- 1. 电话号码纯数字列
+-- =====================================================
+
+ALTER TABLE students ADD COLUMN IF NOT EXISTS phone_digits VARCHAR(20);
+ALTER TABLE students ADD COLUMN IF NOT EXISTS parent_phone_digits VARCHAR(20);
+ALTER TABLE teachers ADD COLUMN IF NOT EXISTS phone_digits VARCHAR(20);
+ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_digits VARCHAR(20);
+
+COMMENT ON COLUMN students.phone_digits IS '联系电话纯数字（搜索用）';
+COMMENT ON COLUMN students.parent_phone_digits IS '家长电话纯数字（搜索用）';
+COMMENT ON COLUMN teachers.phone_digits IS '联系电话纯数字（搜索用）';
+COMMENT ON COLUMN users.phone_digits IS '手机号纯数字（搜索用）';
+
+UPDATE students SET
+    phone_digits = NULLIF(regexp_replace(phone, '\D', '', 'g'), ''),
+    parent_phone_digits = NULLIF(regexp_replace(parent_phone, '\D', '', 'g'), '');
+UPDATE teachers SET phone_digits = NULLIF(regexp_replace(phone, '\D', '', 'g'), '');
+UPDATE users SET phone_digits = NULLIF(regexp_replace(phone, '\D', '', 'g'), '');
+
+-- =====================================================
+-- 2. 三元组索引
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_students_name_trgm ON students USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_phone_digits_trgm ON students USING gin (phone_digits gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_parent_phone_digits_trgm ON students USING gin (parent_phone_digits gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_teachers_name_trgm ON teachers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_teachers_phone_digits_trgm ON teachers USING gin (phone_digits gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON users USING gin (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_phone_digits_trgm ON users USING gin (phone_digits gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_courses_name_trgm ON courses USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_courses_code_trgm ON courses USING gin (code gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_class_plans_name_trgm ON class_plans USING gin (name gin_trgm_ops);
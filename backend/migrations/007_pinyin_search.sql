@@ -0,0 +1,31 @@
+-- =====================================================
+-- Migration: 姓名拼音搜索列
+-- Version: 007
+-- Date: 2026-10-19
+-- Description:
+--   1. 学生、教师、开班新增拼音全拼和首字母列，支持输入 zs / zhangs 搜索 张三
+--   2. 建立 text_pattern_ops 索引，LIKE 'zs%' 前缀查询可以走索引
+-- 注意: 拼音由应用计算（pypinyin），执行本迁移后需运行
+--       python scripts/backfill_pinyin.py 回填现有数据
+-- =====================================================
+
+ALTER TABLE students ADD COLUMN IF NOT EXISTS name_pinyin VARCHAR(255);
+ALTER TABLE students ADD COLUMN IF NOT EXISTS name_initials VARCHAR(100);
+ALTER TABLE teachers ADD COLUMN IF NOT EXISTS name_pinyin VARCHAR(255);
+ALTER TABLE teachers ADD COLUMN IF NOT EXISTS name_initials VARCHAR(100);
+ALTER TABLE class_plans ADD COLUMN IF NOT EXISTS name_pinyin VARCHAR(255);
+ALTER TABLE class_plans ADD COLUMN IF NOT EXISTS name_initials VARCHAR(100);
+
+COMMENT ON COLUMN students.name_pinyin IS '姓名拼音全拼（搜索用）';
+COMMENT ON COLUMN students.name_initials IS '姓名拼音首字母（搜索用）';
+COMMENT ON COLUMN teachers.name_pinyin IS '姓名拼音全拼（搜索用）';
+COMMENT ON COLUMN teachers.name_initials IS '姓名拼音首字母（搜索用）';
+COMMENT ON COLUMN class_plans.name_pinyin IS '班级名称拼音全拼（搜索用）';
+COMMENT ON COLUMN class_plans.name_initials IS '班级名称拼音首字母（搜索用）';
+
+CREATE INDEX IF NOT EXISTS ix_students_name_pinyin ON students (name_pinyin text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_students_name_initials ON students (name_initials text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_teachers_name_pinyin ON teachers (name_pinyin text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_teachers_name_initials ON teachers (name_initials text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_class_plans_name_pinyin ON class_plans (name_pinyin text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_class_plans_name_initials ON class_plans (name_initials text_pattern_ops);
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Backfill pinyin search columns for students, teachers and class plans.
+回填学生、教师、开班的拼音搜索列（name_pinyin / name_initials）。
+执行 migrations/007_pinyin_search.sql 之后运行一次；升级 pypinyin 后可加 --all 全量重算。
+
+Run: cd backend && python scripts/backfill_pinyin.py [--all] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update
+
+from app.core.search import name_pinyin
+from app.database import async_session_maker
+from app.models.class_plan import ClassPlan
+from app.models.student import Student
+from app.models.teacher import Teacher
+
+
+async def backfill(model, recompute: bool, batch_size: int) -> int:
+    """按主键分批回填一张表，返回更新行数"""
+    updated = 0
+    last_id = 0
+    async with async_session_maker() as session:
+        while True:
+            query = (
+                select(model.id, model.name)
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+            if not recompute:
+                query = query.where(model.name_pinyin.is_(None))
+            rows = (await session.execute(query)).all()
+            if not rows:
+                break
+
+            values = []
+            for row_id, name in rows:
+                full, initials = name_pinyin(name)
+                values.append({"id": row_id, "name_pinyin": full, "name_initials": initials})
+            # 按主键批量 UPDATE
+            await session.execute(update(model), values)
+            await session.commit()
+
+            updated += len(values)
+            last_id = rows[-1].id
+    return updated
+
+
+async def main(recompute: bool, batch_size: int):
+    for model in (Student, Teacher, ClassPlan):
+        count = await backfill(model, recompute, batch_size)
+        print(f"{model.__tablename__}: {count} 行已更新")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="回填拼音搜索列")
+    parser.add_argument("--all", action="store_true", help="全量重算（默认只回填为空的行）")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.all, args.batch_size))
@@ -0,0 +1,177 @@
+"""
+Benchmark script - 日历查询吞吐量对比（ORM 实体 + Pydantic 转换 / 列级查询只读行）
+在内存 SQLite 中生成排课数据，对同一日期范围分别执行两种读取方式，统计每秒处理的行数
+（从执行查询到编码成 JSON 响应体）。
+Run: cd backend && python scripts/bench_read_path.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import JSON, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.api.v1.schedule import CALENDAR_COLORS, schedule_to_calendar_event
+from app.models.base import Base
+from app.models.campus import Campus, Classroom
+from app.models.class_plan import ClassPlan
+from app.models.course import Course
+from app.models.schedule import Schedule
+from app.models.teacher import Teacher
+from app.schemas.common import success_response
+from app.schemas.schedule import CalendarEventResponse
+from app.services.schedule_service import ScheduleService
+
+START_DATE = date(2024, 1, 1)
+CLASS_PLANS = 50
+SLOTS_PER_DAY = 20
+
+
+def orm_calendar_event(schedule, color_index: int) -> CalendarEventResponse:
+    """改造前的转换方式：从 ORM 实体及其关系对象构造 Pydantic 模型"""
+    color = CALENDAR_COLORS[color_index % len(CALENDAR_COLORS)]
+    teacher_name = schedule.teacher.name if schedule.teacher else None
+    location = schedule.classroom.name if schedule.classroom else None
+    return CalendarEventResponse(
+        id=str(schedule.id),
+        calendarId=str(schedule.class_plan_id),
+        title=schedule.title or (schedule.class_plan.name if schedule.class_plan else "课程"),
+        start=datetime.combine(schedule.schedule_date, schedule.start_time).isoformat(),
+        end=datetime.combine(schedule.schedule_date, schedule.end_time).isoformat(),
+        location=location,
+        attendees=[teacher_name] if teacher_name else None,
+        state=schedule.status,
+        backgroundColor=color,
+        borderColor=color,
+        raw={
+            "schedule_id": schedule.id,
+            "class_plan_id": schedule.class_plan_id,
+            "class_plan_name": schedule.class_plan.name if schedule.class_plan else None,
+            "teacher_id": schedule.teacher_id,
+            "teacher_name": teacher_name,
+            "classroom_id": schedule.classroom_id,
+            "classroom_name": location,
+            "lesson_hours": schedule.lesson_hours,
+            "status": schedule.status,
+            "notes": schedule.notes,
+            "student_count": 0,
+            "leave_count": 0,
+            "absent_count": 0,
+            "batch_no": schedule.batch_no,
+        },
+    )
+
+
+async def read_orm(session, end_date: date) -> bytes:
+    """改造前：select(Schedule) + selectinload 关系 + Pydantic 模型"""
+    result = await session.execute(
+        select(Schedule)
+        .options(
+            selectinload(Schedule.class_plan),
+            selectinload(Schedule.teacher),
+            selectinload(Schedule.classroom),
+        )
+        .where(Schedule.schedule_date >= START_DATE, Schedule.schedule_date <= end_date)
+        .order_by(Schedule.schedule_date, Schedule.start_time)
+    )
+    events = [orm_calendar_event(s, s.class_plan_id).model_dump() for s in result.scalars().all()]
+    return json.dumps(jsonable_encoder(success_response(events))).encode()
+
+
+async def read_rows(session, end_date: date) -> bytes:
+    """改造后：ScheduleService.get_calendar_events 列级查询 + 只读行"""
+    rows = await ScheduleService(session).get_calendar_events(START_DATE, end_date)
+    events = [schedule_to_calendar_event(row, row.class_plan_id) for row in rows]
+    return json.dumps(jsonable_encoder(success_response(events))).encode()
+
+
+async def seed(session_maker, rows: int) -> date:
+    """生成 rows 条排课，返回覆盖全部排课的结束日期"""
+    async with session_maker() as session:
+        campus = Campus(name="基准校区", is_active=True, created_by="bench")
+        session.add(campus)
+        await session.flush()
+        teachers = [Teacher(name=f"老师{i}", phone=f"139{i:08d}", created_by="bench") for i in range(10)]
+        classrooms = [Classroom(name=f"{i}教室", campus_id=campus.id, created_by="bench") for i in range(10)]
+        course = Course(name="基准课程", code="BENCH-001", campus_id=campus.id, created_by="bench")
+        session.add_all([*teachers, *classrooms, course])
+        await session.flush()
+        plans = [
+            ClassPlan(
+                name=f"基准班{i}", course_id=course.id, campus_id=campus.id,
+                teacher_id=teachers[i % 10].id, classroom_id=classrooms[i % 10].id, created_by="bench",
+            )
+            for i in range(CLASS_PLANS)
+        ]
+        session.add_all(plans)
+        await session.flush()
+
+        values = []
+        for i in range(rows):
+            plan = plans[i % CLASS_PLANS]
+            start = dt_time(8 + (i % SLOTS_PER_DAY) // 2, 30 * (i % 2))
+            values.append({
+                "class_plan_id": plan.id,
+                "campus_id": campus.id,
+                "teacher_id": plan.teacher_id,
+                "classroom_id": plan.classroom_id,
+                "schedule_date": START_DATE + timedelta(days=i // SLOTS_PER_DAY),
+                "start_time": start,
+                "end_time": dt_time(start.hour + 1, start.minute),
+                "lesson_hours": 1,
+                "status": "scheduled",
+                "created_by": "bench",
+            })
+        await session.execute(insert(Schedule), values)
+        await session.commit()
+    return START_DATE + timedelta(days=(rows - 1) // SLOTS_PER_DAY)
+
+
+async def main(rows: int, repeat: int):
+    # SQLite 不支持 ARRAY，与测试一样换成 JSON
+    for table in Base.metadata.tables.values():
+        for column in table.columns:
+            if isinstance(column.type, ARRAY):
+                column.type = JSON()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    end_date = await seed(session_maker, rows)
+
+    print(f"rows: {rows}, range: {START_DATE} ~ {end_date}, repeat: {repeat}")
+    results = {}
+    for label, read in (("ORM + Pydantic", read_orm), ("列级查询只读行", read_rows)):
+        best = float("inf")
+        for _ in range(repeat):
+            # 每次使用新会话，避免 identity map 复用上一轮加载的实体
+            async with session_maker() as session:
+                start = time.perf_counter()
+                body = await read(session, end_date)
+                best = min(best, time.perf_counter() - start)
+        results[label] = rows / best
+        print(f"  {label}: {rows / best:>12,.0f} 行/秒  ({best * 1000:.0f} ms, {len(body):,} bytes)")
+
+    before, after = results.values()
+    print(f"  提升: {after / before:.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="日历查询读取方式吞吐量对比")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -28,6 +28,7 @@ from app.models.class_plan import ClassPlan
 from app.models.schedule import Schedule
 from app.models.enrollment import Enrollment
 from app.core.security import get_password_hash, create_access_token
+from app.core.cache import clear_all_caches
 
 
 # 使用内存SQLite进行测试
@@ -69,6 +70,14 @@ def event_loop() -> Generator:
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """每个测试前后清空进程内缓存（各测试的数据库ID会重复）"""
+    clear_all_caches()
+    yield
+    clear_all_caches()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_engine():
     """Create async engine for testing."""
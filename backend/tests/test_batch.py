@@ -0,0 +1,155 @@
+"""
+Composite batch request tests.
+批量请求接口测试：子请求各自返回状态码和响应体、鉴权只解析一次、白名单外的接口被拒绝。
+
+测试环境所有请求共用同一个数据库会话（见 conftest 的 client），同一会话不能并发使用，
+因此这里把子请求并发数设为 1；并发执行的用例改为每个请求使用独立会话。
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api import deps
+from app.api.v1 import batch as batch_api
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.models.student import Student
+from app.schemas.batch import BATCH_MAX_REQUESTS
+
+
+@pytest.fixture(autouse=True)
+def sequential_batch(monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_concurrency", 1)
+
+
+class TestBatch:
+    """POST /api/v1/batch"""
+
+    @pytest.mark.asyncio
+    async def test_sub_requests(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """按请求顺序返回每个子请求的结果，查询参数原样传递"""
+        response = await client.post(
+            "/api/v1/batch",
+            json={"requests": [
+                {"id": "types", "path": "/dict/types"},
+                {"id": "students", "path": "/students/all?active_only=false"},
+                {"id": "me", "path": "/auth/me"},
+            ]},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        results = response.json()["data"]["items"]
+        assert [r["id"] for r in results] == ["types", "students", "me"]
+        assert [r["status"] for r in results] == [200, 200, 200]
+        # 超管登录时选择了北京校区，下拉只返回该校区的学生
+        assert [s["name"] for s in results[1]["body"]["data"]["items"]] == ["小明"]
+        assert results[2]["body"]["data"]["username"] == "admin"
+
+    @pytest.mark.asyncio
+    async def test_per_item_status(self, client: AsyncClient, teacher_token: str):
+        """子请求的权限检查与单独调用相同，失败不影响其他子请求"""
+        response = await client.post(
+            "/api/v1/batch",
+            json={"requests": [
+                {"id": "enrollments", "path": "/enrollments"},
+                {"id": "teachers", "path": "/teachers/all"},
+                {"id": "detail", "path": "/dict/types/99999"},
+                {"id": "write", "path": "/users"},
+            ]},
+            headers={"Authorization": f"Bearer {teacher_token}"}
+        )
+        assert response.status_code == 200
+        statuses = {r["id"]: r["status"] for r in response.json()["data"]["items"]}
+        assert statuses == {"enrollments": 403, "teachers": 200, "detail": 400, "write": 400}
+
+    @pytest.mark.asyncio
+    async def test_auth_resolved_once(self, client: AsyncClient, super_admin_token: str, monkeypatch):
+        """子请求复用批量请求的鉴权结果，不再解析令牌"""
+        calls = []
+        authenticate = deps._authenticate
+
+        async def counting_authenticate(*args, **kwargs):
+            calls.append(1)
+            return await authenticate(*args, **kwargs)
+
+        monkeypatch.setattr(deps, "_authenticate", counting_authenticate)
+        response = await client.post(
+            "/api/v1/batch",
+            json={"requests": [{"id": str(i), "path": "/campuses/all"} for i in range(3)]},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert [r["status"] for r in response.json()["data"]["items"]] == [200] * 3
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_validation(self, client: AsyncClient, super_admin_token: str):
+        """需要登录；子请求数超过上限、标识重复、外部地址均被拒绝"""
+        response = await client.post("/api/v1/batch", json={"requests": [{"id": "a", "path": "/dict/types"}]})
+        assert response.status_code == 401
+
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        too_many = [{"id": str(i), "path": "/dict/types"} for i in range(BATCH_MAX_REQUESTS + 1)]
+        duplicated = [{"id": "a", "path": "/dict/types"}] * 2
+        for requests in (too_many, duplicated):
+            response = await client.post("/api/v1/batch", json={"requests": requests}, headers=headers)
+            assert response.status_code == 422
+
+        response = await client.post(
+            "/api/v1/batch",
+            json={"requests": [{"id": "a", "path": "http://example.com/dict/types"}]},
+            headers=headers
+        )
+        assert response.json()["data"]["items"][0]["status"] == 400
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sub_requests(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        super_admin_token: str,
+        monkeypatch
+    ):
+        """子请求各自使用独立会话并发执行，同时执行的数量不超过进程内的并发上限"""
+        monkeypatch.setattr(settings, "batch_max_concurrency", 3)
+        await db_session.commit()
+        session_maker = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+        async def separate_session():
+            async with session_maker() as session:
+                yield session
+                await session.commit()
+
+        monkeypatch.setitem(app.dependency_overrides, get_db, separate_session)
+
+        running, peak = 0, 0
+        call = batch_api._call
+
+        async def tracking_call(*args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                await asyncio.sleep(0.01)
+                return await call(*args)
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(batch_api, "_call", tracking_call)
+        paths = ["/dict/types", "/students/all", "/campuses/all", "/teachers/all", "/auth/me", "/courses/active"]
+        response = await client.post(
+            "/api/v1/batch",
+            json={"requests": [{"id": str(i), "path": path} for i, path in enumerate(paths)]},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["data"]["items"]] == [200] * len(paths)
+        assert 1 < peak <= 3
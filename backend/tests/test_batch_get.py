@@ -0,0 +1,107 @@
+"""
+Batch get tests.
+按ID批量查询接口测试：按请求顺序返回、其他校区的记录视为不存在、ID数量上限。
+"""
+from datetime import date, time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.class_plan import ClassPlan
+from app.models.enrollment import Enrollment
+from app.models.schedule import Schedule
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.schemas.common import BATCH_GET_MAX_IDS
+
+
+class TestBatchGet:
+    """POST /<entity>/batch-get"""
+
+    @pytest.mark.asyncio
+    async def test_in_request_order(
+        self,
+        client: AsyncClient,
+        test_teachers: list[Teacher],
+        teacher_token: str
+    ):
+        """按请求的ID顺序返回并去重，不存在的ID放在 missing_ids"""
+        ids = [test_teachers[1].id, test_teachers[0].id, test_teachers[1].id, 99999]
+        response = await client.post(
+            "/api/v1/teachers/batch-get",
+            json={"ids": ids},
+            headers={"Authorization": f"Bearer {teacher_token}"}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [item["name"] for item in data["items"]] == ["李老师", "张老师"]
+        assert data["missing_ids"] == [99999]
+
+    @pytest.mark.asyncio
+    async def test_campus_scope_applied(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        test_class_plans: list[ClassPlan],
+        bj_admin_token: str
+    ):
+        """校区管理员拿不到其他校区的记录，与单条查询不同，不报 403 而是放在 missing_ids"""
+        headers = {"Authorization": f"Bearer {bj_admin_token}"}
+        response = await client.post(
+            "/api/v1/students/batch-get",
+            json={"ids": [s.id for s in test_students]},
+            headers=headers
+        )
+        data = response.json()["data"]
+        assert [item["name"] for item in data["items"]] == ["小明"]
+        assert data["missing_ids"] == [test_students[1].id]
+
+        response = await client.post(
+            "/api/v1/class-plans/batch-get",
+            json={"ids": [p.id for p in test_class_plans]},
+            headers=headers
+        )
+        data = response.json()["data"]
+        assert [item["id"] for item in data["items"]] == [test_class_plans[0].id]
+        assert data["missing_ids"] == [test_class_plans[1].id]
+
+    @pytest.mark.asyncio
+    async def test_schedules_and_enrollments(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        test_class_plans: list[ClassPlan],
+        super_admin_token: str
+    ):
+        """排课带关联对象，报名带已排课时数"""
+        plan = test_class_plans[0]
+        schedule = Schedule(
+            class_plan_id=plan.id, campus_id=plan.campus_id, schedule_date=date(2024, 3, 1),
+            start_time=time(9, 0), end_time=time(11, 0), lesson_hours=2, status="scheduled", created_by="test",
+        )
+        enrollment = Enrollment(
+            student_id=test_students[0].id, class_plan_id=plan.id, campus_id=plan.campus_id,
+            paid_amount=3000, purchased_hours=20, used_hours=0, status="active", created_by="test",
+        )
+        db_session.add_all([schedule, enrollment])
+        await db_session.flush()
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+
+        response = await client.post("/api/v1/schedules/batch-get", json={"ids": [schedule.id]}, headers=headers)
+        [item] = response.json()["data"]["items"]
+        assert item["class_plan"] == {"id": plan.id, "name": plan.name}
+
+        response = await client.post("/api/v1/enrollments/batch-get", json={"ids": [enrollment.id]}, headers=headers)
+        [item] = response.json()["data"]["items"]
+        assert item["student_id"] == test_students[0].id
+        assert float(item["scheduled_hours"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_id_limit(self, client: AsyncClient, super_admin_token: str):
+        """空列表或超过上限返回 422"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        for ids in ([], list(range(1, BATCH_GET_MAX_IDS + 2))):
+            response = await client.post("/api/v1/schedules/batch-get", json={"ids": ids}, headers=headers)
+            assert response.status_code == 422
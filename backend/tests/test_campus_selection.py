@@ -407,6 +407,57 @@ class TestTeacherCampusSelection:
         assert response.status_code == 200
 
 
+class TestCampusDirectory:
+    """测试校区目录缓存"""
+
+    @pytest.mark.asyncio
+    async def test_directory_cached(
+        self,
+        db_session: AsyncSession,
+        test_campuses: list[Campus]
+    ):
+        """校区目录加载后不再查询数据库"""
+        from unittest.mock import patch
+        from app.core.campus_directory import get_active_campuses
+
+        campuses = await get_active_campuses(db_session)
+        assert [c.id for c in campuses] == sorted(c.id for c in test_campuses)
+
+        with patch.object(db_session, "execute") as execute:
+            assert await get_active_campuses(db_session) == campuses
+        execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_campus_update_invalidates_directory(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_campuses: list[Campus],
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """修改校区后下拉列表和校区名称立即更新"""
+        from app.core.campus_directory import get_campus_names
+        from app.schemas.campus import CampusUpdate
+        from app.services.campus_service import CampusService
+
+        campus = test_campuses[1]
+        assert (await get_campus_names(db_session))[campus.id] == campus.name
+
+        await CampusService(db_session).update_campus(
+            campus.id, CampusUpdate(name="上海新校区", is_active=False), updated_by="test"
+        )
+
+        assert (await get_campus_names(db_session))[campus.id] == "上海新校区"
+        response = await client.get(
+            "/api/v1/campuses/all",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.json()["data"]["items"]]
+        assert campus.id not in ids
+
+
 class TestCampusScopedDataFiltering:
     """测试基于JWT campus_id的数据过滤"""
 
@@ -0,0 +1,149 @@
+"""
+Conditional GET tests.
+参考数据接口的 ETag 测试：命中 If-None-Match 返回 304，数据变更或换用户/校区后 ETag 变化。
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import _etag_matches
+from app.models.campus import Campus
+from app.models.course import Course
+from app.models.student import Student
+from app.schemas.course import CourseUpdate
+from app.services.course_service import CourseService
+
+
+class TestEtagMatches:
+    """If-None-Match 比较"""
+
+    def test_weak_comparison(self):
+        assert _etag_matches('W/"abc"', 'W/"abc"')
+        assert _etag_matches('"abc"', 'W/"abc"')
+        assert _etag_matches('"x", W/"abc"', 'W/"abc"')
+        assert _etag_matches("*", 'W/"abc"')
+        assert not _etag_matches(None, 'W/"abc"')
+        assert not _etag_matches('W/"abd"', 'W/"abc"')
+
+
+class TestConditionalGet:
+    """条件请求"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self, client: AsyncClient, super_admin_token: str):
+        """带上次的 ETag 请求返回 304，无响应体"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        first = await client.get("/api/v1/dict/types", headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        second = await client.get("/api/v1/dict/types", headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_etag_changes_after_write(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_courses: list[Course],
+        super_admin_token: str
+    ):
+        """课程修改后 ETag 变化，旧 ETag 返回完整响应；Last-Modified 随版本更新"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        first = await client.get("/api/v1/courses/active", headers=headers)
+        etag = first.headers["etag"]
+
+        await CourseService(db_session).update(test_courses[0].id, CourseUpdate(name="改名课程"), "test")
+
+        second = await client.get("/api/v1/courses/active", headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 200
+        assert second.headers["etag"] != etag
+        assert "last-modified" in second.headers
+        assert "改名课程" in [item["name"] for item in second.json()["data"]["items"]]
+
+    @pytest.mark.asyncio
+    async def test_etag_varies_by_user_and_params(
+        self,
+        client: AsyncClient,
+        test_campuses: list[Campus],
+        super_admin_token: str,
+        bj_admin_token: str
+    ):
+        """不同用户、不同查询参数的 ETag 不同，避免返回其他校区的缓存"""
+        super_headers = {"Authorization": f"Bearer {super_admin_token}"}
+        bj_headers = {"Authorization": f"Bearer {bj_admin_token}"}
+        etag = (await client.get("/api/v1/campuses/all", headers=super_headers)).headers["etag"]
+        other_user = await client.get("/api/v1/campuses/all", headers={**bj_headers, "If-None-Match": etag})
+        assert other_user.status_code == 200
+
+        etag = (await client.get("/api/v1/classrooms/all", headers=super_headers)).headers["etag"]
+        other_params = await client.get(
+            "/api/v1/classrooms/all", params={"active_only": "false"}, headers={**super_headers, "If-None-Match": etag}
+        )
+        assert other_params.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_enrollment_bumps_dropdowns(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        test_class_plans,
+        super_admin_token: str
+    ):
+        """报名会修改学生剩余课时和班级人数，学生、班级下拉的 ETag 随之变化"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        students_etag = (await client.get("/api/v1/students/all", headers=headers)).headers["etag"]
+        plans_etag = (await client.get("/api/v1/class-plans/all", headers=headers)).headers["etag"]
+
+        response = await client.post(
+            "/api/v1/enrollments",
+            json={
+                "student_id": test_students[0].id,
+                "class_plan_id": test_class_plans[0].id,
+                "paid_amount": 3000,
+                "purchased_hours": 20,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+        students = await client.get("/api/v1/students/all", headers={**headers, "If-None-Match": students_etag})
+        plans = await client.get("/api/v1/class-plans/all", headers={**headers, "If-None-Match": plans_etag})
+        assert students.status_code == 200
+        assert plans.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_enrollment_keeps_other_campus_etag(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        test_class_plans,
+        super_admin_token: str,
+        sh_admin_token: str
+    ):
+        """下拉列表的版本号按校区递增，北京校区报名后上海校区的 ETag 不变"""
+        sh_headers = {"Authorization": f"Bearer {sh_admin_token}"}
+        etags = {
+            path: (await client.get(path, headers=sh_headers)).headers["etag"]
+            for path in ("/api/v1/students/all", "/api/v1/class-plans/all")
+        }
+
+        response = await client.post(
+            "/api/v1/enrollments",
+            json={
+                "student_id": test_students[0].id,
+                "class_plan_id": test_class_plans[0].id,
+                "paid_amount": 3000,
+                "purchased_hours": 20,
+            },
+            headers={"Authorization": f"Bearer {super_admin_token}"},
+        )
+        assert response.status_code == 200
+
+        for path, etag in etags.items():
+            response = await client.get(path, headers={**sh_headers, "If-None-Match": etag})
+            assert response.status_code == 304
@@ -876,3 +876,231 @@ class TestAdminDashboardClasses:
             headers={"Authorization": f"Bearer {super_admin_token}"}
         )
         assert response.status_code == 200
+
+
+class TestAdminDashboardAggregations:
+    """管理员仪表盘 - 分布与排名在数据库中聚合"""
+
+    async def test_teacher_subject_distribution_counts(
+        self,
+        client: AsyncClient,
+        super_admin_token: str,
+        admin_test_teachers: list[Teacher],
+        admin_test_schedules: list[Schedule],
+    ):
+        """科目分布按展开后的科目计数，且只统计本校区有排课的教师"""
+        response = await client.get(
+            "/api/v1/dashboard/admin/teachers",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        distribution = {
+            item["name"]: item["value"]
+            for item in response.json()["data"]["subject_distribution"]
+        }
+        # 北京校区只有测试教师1有排课
+        assert distribution == {"数学": 1.0, "物理": 1.0}
+
+    async def test_class_occupancy_and_progress_ranking(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        super_admin_token: str,
+        test_campuses: list,
+        test_courses: list,
+    ):
+        """上座率分桶和进度排名由数据库计算"""
+        plans = [
+            ClassPlan(
+                name=f"进度班{i}",
+                course_id=test_courses[0].id,
+                campus_id=test_campuses[0].id,
+                max_students=10,
+                current_students=current,
+                total_lessons=Decimal("10.0"),
+                completed_lessons=completed,
+                status="ongoing",
+                is_active=True,
+                created_by="test",
+            )
+            for i, (current, completed) in enumerate([(2, 3), (6, 9), (9, 5), (10, 1)])
+        ]
+        db_session.add_all(plans)
+        await db_session.flush()
+
+        response = await client.get(
+            "/api/v1/dashboard/admin/classes",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+
+        occupancy = {item["name"]: item["value"] for item in data["occupancy_distribution"]}
+        assert occupancy == {"低(<50%)": 1.0, "中(50-80%)": 1.0, "高(>80%)": 2.0}
+
+        ranking = data["progress_ranking"]
+        assert [item["name"] for item in ranking] == ["进度班1", "进度班2", "进度班0", "进度班3"]
+        assert [item["value"] for item in ranking] == [90.0, 50.0, 30.0, 10.0]
+        assert [item["rank"] for item in ranking] == [1, 2, 3, 4]
+
+
+class TestAdminDashboardTrendSeries:
+    """管理员仪表盘 - 趋势数据粒度与列式格式"""
+
+    async def test_default_trend_is_daily_points(
+        self,
+        client: AsyncClient,
+        super_admin_token: str,
+        admin_test_enrollments: list[Enrollment],
+    ):
+        """默认返回按日补齐的点列表（近7天共8个点）"""
+        response = await client.get(
+            "/api/v1/dashboard/admin",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        trend = response.json()["data"]["enrollment_trend"]
+        assert len(trend) == 8
+        assert trend[-1]["date"] == date.today().isoformat()
+        # 北京校区的3个报名都是今天创建的
+        assert trend[-1]["value"] == 3.0
+
+    async def test_columnar_trend_with_auto_granularity(
+        self,
+        client: AsyncClient,
+        super_admin_token: str,
+        admin_test_enrollments: list[Enrollment],
+    ):
+        """较长的时间范围自动按周分桶，并支持列式格式"""
+        start = date.today() - timedelta(days=120)
+        response = await client.get(
+            f"/api/v1/dashboard/admin?start_date={start.isoformat()}"
+            f"&end_date={date.today().isoformat()}&series_format=columnar",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        trend = response.json()["data"]["enrollment_trend"]
+        assert trend["granularity"] == "week"
+        assert len(trend["dates"]) == len(trend["values"]) == len(trend["labels"])
+        # 周桶从周一开始，且覆盖整个范围
+        first = date.fromisoformat(trend["dates"][0])
+        assert first.weekday() == 0
+        assert first <= start
+        # 北京校区的3个报名都落在最后一个周桶内
+        assert trend["values"][-1] == 3.0
+        assert sum(trend["values"]) == 3.0
+
+    async def test_monthly_student_trend(
+        self,
+        client: AsyncClient,
+        super_admin_token: str,
+        admin_test_students: list[Student],
+    ):
+        """可以显式指定按月粒度"""
+        start = date.today() - timedelta(days=40)
+        response = await client.get(
+            f"/api/v1/dashboard/admin/students?start_date={start.isoformat()}"
+            f"&end_date={date.today().isoformat()}&granularity=month",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        trend = response.json()["data"]["new_student_trend"]
+        assert trend[-1]["date"] == date.today().strftime("%Y-%m")
+        assert sum(point["value"] for point in trend) == 3.0
+
+
+class TestAdminDashboardSnapshot:
+    """管理员仪表盘 - 快照"""
+
+    async def test_overview_served_from_snapshot(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        super_admin_token: str,
+        admin_test_students: list[Student],
+        test_campuses: list,
+    ):
+        """概览返回快照及 as_of，fresh=true 时重新计算"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        first = (await client.get("/api/v1/dashboard/admin", headers=headers)).json()["data"]
+        assert "as_of" in first
+        assert first["kpi_cards"][0]["value"] == 3
+
+        db_session.add(Student(
+            name="北京学生新",
+            phone="13800000199",
+            campus_id=test_campuses[0].id,
+            status="active",
+            is_active=True,
+            created_by="test",
+        ))
+        await db_session.flush()
+
+        cached = (await client.get("/api/v1/dashboard/admin", headers=headers)).json()["data"]
+        assert cached["as_of"] == first["as_of"]
+        assert cached["kpi_cards"][0]["value"] == 3
+
+        fresh = (await client.get("/api/v1/dashboard/admin?fresh=true", headers=headers)).json()["data"]
+        assert fresh["as_of"] != first["as_of"]
+        assert fresh["kpi_cards"][0]["value"] == 4
+
+    async def test_custom_range_is_computed_live(
+        self,
+        client: AsyncClient,
+        super_admin_token: str,
+        admin_test_students: list[Student],
+    ):
+        """自定义时间范围不使用快照"""
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        start = (date.today() - timedelta(days=3)).isoformat()
+        first = (await client.get(f"/api/v1/dashboard/admin?start_date={start}", headers=headers)).json()["data"]
+        second = (await client.get(f"/api/v1/dashboard/admin?start_date={start}", headers=headers)).json()["data"]
+        assert first["as_of"] != second["as_of"]
+
+    async def test_refresh_continues_after_failure(
+        self,
+        db_session: AsyncSession,
+        test_campuses,
+        monkeypatch,
+    ):
+        """某个校区的快照计算失败时记录日志并继续刷新其他快照，原快照保留"""
+        from app.services.dashboard_service import DashboardService
+        from app.services.dashboard_snapshot_service import DashboardSnapshotService, snapshot_store
+
+        failing_campus_id = test_campuses[0].id
+        snapshot_store.set(("admin", failing_campus_id, False), {"as_of": "old"})
+        build = DashboardService.build_admin_overview
+
+        async def flaky_build(self, campus_id, **kwargs):
+            if campus_id == failing_campus_id:
+                raise RuntimeError("boom")
+            return await build(self, campus_id, **kwargs)
+
+        monkeypatch.setattr(DashboardService, "build_admin_overview", flaky_build)
+        count = await DashboardSnapshotService(db_session).refresh_all()
+
+        # 全部校区汇总 + 另一个启用的校区
+        assert count == len(test_campuses)
+        assert snapshot_store.get(("admin", failing_campus_id, False)) == {"as_of": "old"}
+        assert snapshot_store.get(("admin", None, True)) is not None
+        assert snapshot_store.get(("admin", test_campuses[1].id, False)) is not None
+
+    async def test_campus_admin_without_campus_gets_no_comparison(
+        self,
+        client: AsyncClient,
+        test_users,
+        admin_test_students: list[Student],
+    ):
+        """未选校区的校区管理员不会拿到超管快照中的校区对比"""
+        from app.core.security import create_access_token
+
+        super_token, token = (
+            create_access_token({"sub": str(test_users[name].id), "role_code": role_code})
+            for name, role_code in (("super_admin", "super_admin"), ("bj_campus_admin", "campus_admin"))
+        )
+        admin = await client.get("/api/v1/dashboard/admin", headers={"Authorization": f"Bearer {super_token}"})
+        assert admin.json()["data"]["campus_comparison"]
+
+        response = await client.get("/api/v1/dashboard/admin", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert not response.json()["data"].get("campus_comparison")
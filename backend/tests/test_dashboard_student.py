@@ -343,3 +343,111 @@ class TestStudentDashboardRecords:
         # 时间过滤后，课时消耗记录数应该减少
         # 因为只有2天范围内的记录
         assert "lesson_records" in result
+
+
+class TestStudentDashboardSummary:
+    """三个 Tab 共用的汇总数据"""
+
+    @pytest.mark.asyncio
+    async def test_tabs_share_consistent_aggregates(
+        self,
+        client: AsyncClient,
+        student_token: str,
+        student_linked_to_user: Student,
+        student_enrollment: Enrollment,
+        student_schedules: list[Schedule],
+        student_attendance_records: list[StudentAttendance],
+        student_lesson_records: list[LessonRecord],
+    ):
+        """概览、课程、记录的统计口径一致"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        overview = (await client.get("/api/v1/dashboard/student", headers=headers)).json()["data"]
+        courses = (await client.get("/api/v1/dashboard/student/courses", headers=headers)).json()["data"]
+        records = (await client.get("/api/v1/dashboard/student/records", headers=headers)).json()["data"]
+
+        # 2次正常，1次请假
+        assert overview["attendance_rate"]["value"] == 66.7
+        assert records["attendance_summary"] == {"total": 3, "normal": 2, "leave": 1, "absent": 0}
+        assert overview["total_remaining_hours"]["value"] == 15.0
+        assert overview["active_enrollment_count"]["value"] == len(courses["enrollments"]) == 1
+        assert courses["enrollments"][0]["progress_percent"] == 25.0
+        assert len(overview["upcoming_schedules"]) == 5
+        assert overview["upcoming_schedules"][0]["classroom_name"] is not None
+        # 课消记录按日期倒序
+        dates = [r["record_date"] for r in records["lesson_records"]]
+        assert dates == sorted(dates, reverse=True)
+
+
+class TestStudentRecordsTimeline:
+    """学习记录时间线游标分页"""
+
+    @pytest.mark.asyncio
+    async def test_timeline_cursor_pagination(
+        self,
+        client: AsyncClient,
+        student_token: str,
+        student_linked_to_user: Student,
+        student_enrollment: Enrollment,
+        student_attendance_records: list[StudentAttendance],
+        student_lesson_records: list[LessonRecord],
+    ):
+        """逐页翻完时间线，不重复不遗漏，统计不受分页影响"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            url = "/api/v1/dashboard/student/records?page_size=4"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200
+            result = response.json()["data"]
+            assert result["attendance_summary"]["total"] == 3
+            seen.extend((item["event_type"], item["event_id"]) for item in result["timeline"])
+            pages += 1
+            cursor = result["next_cursor"]
+            if not cursor:
+                break
+
+        # 3条出勤 + 3条课消
+        assert pages == 2
+        assert len(seen) == len(set(seen)) == 6
+
+    @pytest.mark.asyncio
+    async def test_timeline_is_date_ordered(
+        self,
+        client: AsyncClient,
+        student_token: str,
+        student_linked_to_user: Student,
+        student_enrollment: Enrollment,
+        student_attendance_records: list[StudentAttendance],
+        student_lesson_records: list[LessonRecord],
+    ):
+        """时间线按日期倒序合并两类事件"""
+        response = await client.get(
+            "/api/v1/dashboard/student/records",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        timeline = response.json()["data"]["timeline"]
+        dates = [item["event_date"] for item in timeline]
+        assert dates == sorted(dates, reverse=True)
+        assert timeline[0]["event_date"] == (date.today() - timedelta(days=1)).isoformat()
+        assert {item["event_type"] for item in timeline[:2]} == {"attendance", "lesson"}
+        leave = [item for item in timeline if item["status"] == "leave"]
+        assert leave[0]["deduct_hours"] is False
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(
+        self,
+        client: AsyncClient,
+        student_token: str,
+        student_linked_to_user: Student,
+        student_enrollment: Enrollment,
+    ):
+        """无效游标返回400"""
+        response = await client.get(
+            "/api/v1/dashboard/student/records?cursor=not-a-cursor",
+            headers={"Authorization": f"Bearer {student_token}"},
+        )
+        assert response.status_code == 400
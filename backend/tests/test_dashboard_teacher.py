@@ -8,6 +8,7 @@ from datetime import date, time, timedelta
 from decimal import Decimal
 
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.teacher import Teacher
@@ -274,6 +275,35 @@ class TestTeacherDashboardOverview:
         # 验证未来7天排课（今日1 + 未来4 = 5）
         assert len(result["upcoming_schedules"]) == 5
 
+    @pytest.mark.asyncio
+    async def test_linked_teacher_resolved_once(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        teacher_token: str,
+        teacher_linked_to_user: Teacher,
+    ):
+        """关联教师ID取自鉴权上下文（请求内缓存），接口不再自行加载教师记录"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                "/api/v1/dashboard/teacher",
+                headers={"Authorization": f"Bearer {teacher_token}"},
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        lookups = [s for s in statements if "FROM teachers" in s and "teachers.user_id = " in s]
+        assert len(lookups) == 1
+        assert lookups[0].split()[:3] == ["SELECT", "teachers.id", "FROM"]
+
     @pytest.mark.asyncio
     async def test_student_cannot_access_teacher_dashboard(
         self,
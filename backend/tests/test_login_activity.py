@@ -0,0 +1,139 @@
+"""
+Tests for the login activity write-behind buffer.
+登录活动异步写入缓冲测试。
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.write_behind import LoginActivityBuffer
+from app.models.user import LoginLog, User
+
+
+def _make_buffer(async_engine, **kwargs) -> LoginActivityBuffer:
+    options = {"flush_seconds": 60, "flush_size": 100, "max_entries": 100}
+    options.update(kwargs)
+    return LoginActivityBuffer(
+        session_factory=async_sessionmaker(async_engine, class_=AsyncSession),
+        **options,
+    )
+
+
+async def _count_logs(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(LoginLog).where(LoginLog.user_id == user_id)
+    )
+    return result.scalar()
+
+
+class TestLoginActivityBuffer:
+    """登录活动写入缓冲"""
+
+    @pytest.mark.asyncio
+    async def test_writes_synchronously_when_not_started(
+        self,
+        db_session: AsyncSession,
+        async_engine,
+        test_users: dict[str, User]
+    ):
+        """未启动时在调用方会话中同步写入"""
+        user = test_users["teacher"]
+        buffer = _make_buffer(async_engine)
+
+        await buffer.add_log(db_session, LoginLog(user_id=user.id, status="success"))
+        await buffer.set_presence(db_session, user.id, is_online=True)
+        await db_session.flush()
+
+        assert await _count_logs(db_session, user.id) == 1
+        await db_session.refresh(user)
+        assert user.is_online is True
+        assert buffer.stats()["synchronous"] == 2
+
+    @pytest.mark.asyncio
+    async def test_buffers_and_coalesces_until_flush(
+        self,
+        db_session: AsyncSession,
+        async_engine,
+        test_users: dict[str, User]
+    ):
+        """启动后日志批量写入，同一用户的在线状态更新合并为一次"""
+        user = test_users["teacher"]
+        await db_session.commit()
+        buffer = _make_buffer(async_engine)
+        buffer.start()
+
+        last_login = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+        for _ in range(3):
+            await buffer.add_log(db_session, LoginLog(user_id=user.id, status="success"))
+        await buffer.set_presence(db_session, user.id, is_online=True, last_login=last_login)
+        await buffer.set_presence(db_session, user.id, is_online=False)
+
+        stats = buffer.stats()
+        assert stats["pending_logs"] == 3
+        assert stats["pending_presence"] == 1
+        assert await _count_logs(db_session, user.id) == 0
+
+        await buffer.stop()
+
+        assert await _count_logs(db_session, user.id) == 3
+        await db_session.refresh(user)
+        assert user.is_online is False
+        assert user.last_login.replace(tzinfo=timezone.utc) == last_login
+        assert buffer.stats()["flushed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_applies_backpressure(
+        self,
+        db_session: AsyncSession,
+        async_engine,
+        test_users: dict[str, User]
+    ):
+        """缓冲已满时由调用方同步写入"""
+        user = test_users["teacher"]
+        buffer = _make_buffer(async_engine, max_entries=2)
+        buffer.start()
+
+        for _ in range(3):
+            await buffer.add_log(db_session, LoginLog(user_id=user.id, status="success"))
+
+        stats = buffer.stats()
+        assert stats["pending_logs"] == 2
+        assert stats["synchronous"] == 1
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_within_capacity(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User]
+    ):
+        """落库失败时放回缓冲，超出容量的部分丢弃"""
+        user = test_users["teacher"]
+
+        def broken_session():
+            # 写入期间有新的在线状态更新进入缓冲
+            buffer._presence[user.id] = {"is_online": False}
+            raise RuntimeError("database unavailable")
+
+        buffer = LoginActivityBuffer(
+            flush_seconds=60, flush_size=100, max_entries=3,
+            session_factory=broken_session,
+        )
+        buffer.start()
+
+        for _ in range(3):
+            await buffer.add_log(db_session, LoginLog(user_id=user.id, status="success"))
+        await buffer.flush()
+
+        stats = buffer.stats()
+        assert stats["failures"] == 1
+        assert stats["pending_presence"] == 1
+        assert stats["pending_logs"] == 2
+        assert stats["dropped"] == 1
+
+        buffer._session_factory = None
+        buffer._presence.clear()
+        buffer._logs.clear()
+        await buffer.stop()
@@ -0,0 +1,148 @@
+"""
+Cursor (keyset) pagination and total count tests.
+游标分页测试：游标翻页与 OFFSET 分页结果一致；总数统计策略。
+"""
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.pagination import COUNT_CACHED, build_count_query, count_total
+from app.models.student import Student
+from app.models.user import LoginLog, User
+
+
+async def _walk(client: AsyncClient, url: str, token: str, page_size: int) -> list[int]:
+    """按游标翻完所有页，返回各页ID"""
+    ids = []
+    params = {"page_size": page_size}
+    while True:
+        response = await client.get(url, params=params, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        data = response.json()["data"]
+        ids.extend(item["id"] for item in data["items"])
+        if "next_cursor" not in data:
+            return ids
+        params = {"page_size": page_size, "cursor": data["next_cursor"]}
+
+
+class TestCursorPagination:
+    """列表接口游标分页"""
+
+    @pytest.mark.asyncio
+    async def test_student_cursor_matches_offset(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """游标翻页与一次性查询的顺序一致，最后一页不返回游标"""
+        campus_id = test_students[0].campus_id
+        db_session.add_all([
+            Student(name=f"学生{i}", phone=f"1390000000{i}", campus_id=campus_id, created_by="test")
+            for i in range(3)
+        ])
+        await db_session.flush()
+
+        response = await client.get(
+            "/api/v1/students",
+            params={"page_size": 100},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        expected = [item["id"] for item in response.json()["data"]["items"]]
+        assert len(expected) >= 4
+        assert expected == sorted(expected, reverse=True)
+
+        assert await _walk(client, "/api/v1/students", super_admin_token, page_size=1) == expected
+
+    @pytest.mark.asyncio
+    async def test_login_log_cursor_breaks_ties_by_id(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """登录时间相同的记录按ID倒序，翻页不重复不遗漏"""
+        user = test_users["teacher"]
+        same_time = datetime(2024, 3, 1, 8, 0)
+        logs = [LoginLog(user_id=user.id, login_time=same_time, status="success") for _ in range(3)]
+        logs.append(LoginLog(user_id=user.id, login_time=datetime(2024, 3, 2, 8, 0), status="success"))
+        db_session.add_all(logs)
+        await db_session.flush()
+
+        ids = await _walk(client, "/api/v1/login-logs", super_admin_token, page_size=2)
+        assert ids == [logs[3].id, logs[2].id, logs[1].id, logs[0].id]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_rejected(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """无法解析的游标返回400"""
+        response = await client.get(
+            "/api/v1/login-logs",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 400
+
+
+class TestCountTotal:
+    """列表总数统计"""
+
+    def test_count_query_strips_order_and_options(self):
+        """COUNT 查询去掉加载选项、排序和分页"""
+        query = (
+            select(User)
+            .options(selectinload(User.campus))
+            .where(User.is_active.is_(True))
+            .order_by(User.created_time.desc())
+            .offset(20)
+            .limit(10)
+        )
+        sql = str(build_count_query(query))
+        assert "count(*)" in sql
+        assert "ORDER BY" not in sql
+        assert "LIMIT" not in sql
+        assert "is_active" in sql
+
+    @pytest.mark.asyncio
+    async def test_cached_count_reused_within_ttl(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User]
+    ):
+        """cached 策略下相同过滤条件在有效期内复用总数"""
+        query = select(User).where(User.is_active.is_(True))
+        first = await count_total(db_session, query, mode=COUNT_CACHED)
+        assert first == len(test_users)
+
+        db_session.add(User(username="extra_user", hashed_password="x", is_active=True, created_by="test"))
+        await db_session.flush()
+        assert await count_total(db_session, query, mode=COUNT_CACHED) == first
+        assert await count_total(db_session, query) == first + 1
+
+    @pytest.mark.asyncio
+    async def test_include_total_false_skips_count(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """include_total=false 时不统计总数，列表照常返回"""
+        response = await client.get(
+            "/api/v1/users",
+            params={"include_total": False},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["total"] is None
+        assert len(data["items"]) == len(test_users)
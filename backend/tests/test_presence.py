@@ -0,0 +1,123 @@
+"""
+Tests for in-memory presence tracking.
+在线状态测试。
+"""
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.presence import PresenceTracker, persist_presence_snapshot, presence
+from app.models.user import User
+
+
+class TestPresenceTracker:
+    """在线状态记录"""
+
+    def test_touch_is_throttled(self):
+        """节流间隔内重复访问不更新访问时间"""
+        tracker = PresenceTracker("presence_test", maxsize=10, ttl=60, touch_interval=30)
+        tracker.touch(1)
+        first = tracker.get(1)
+        tracker.touch(1)
+        assert tracker.get(1) == first
+
+    def test_expired_users_go_offline(self):
+        """超过有效期未访问的用户视为离线，并等待同步到数据库"""
+        tracker = PresenceTracker("presence_test", maxsize=10, ttl=0, touch_interval=30)
+        tracker.touch(1)
+        assert tracker.online_user_ids() == []
+        assert tracker.drain_offline() == {1}
+
+    def test_evicted_users_go_offline(self):
+        """超出容量被淘汰的用户同样等待同步为离线"""
+        tracker = PresenceTracker("presence_test", maxsize=1, ttl=60, touch_interval=30)
+        tracker.touch(1)
+        tracker.touch(2)
+        assert tracker.drain_offline() == {1}
+
+    @pytest.mark.asyncio
+    async def test_authenticated_request_marks_user_online(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        teacher_token: str,
+        super_admin_token: str
+    ):
+        """鉴权通过的请求记录在线状态，在线用户列表直接读内存"""
+        teacher = test_users["teacher"]
+        await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {teacher_token}"})
+        assert presence.is_online(teacher.id)
+
+        response = await client.get(
+            "/api/v1/users/online",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        online = {item["id"]: item for item in response.json()["data"]["items"]}
+        assert set(online) == {teacher.id, test_users["super_admin"].id}
+        assert online[teacher.id]["last_seen"] is not None
+
+    @pytest.mark.asyncio
+    async def test_online_filter_uses_presence(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """用户列表的在线筛选以内存在线状态为准"""
+        teacher = test_users["teacher"]
+        teacher.is_online = True  # 数据库中残留的在线标记不再生效
+        presence.touch(test_users["student"].id)
+
+        response = await client.get(
+            "/api/v1/users",
+            params={"is_online": True},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        ids = {item["id"] for item in data["items"]}
+        assert ids == {test_users["student"].id, test_users["super_admin"].id}
+        assert data["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_snapshot_persists_online_and_offline(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User]
+    ):
+        """快照把在线、已登出的用户写回数据库"""
+        teacher = test_users["teacher"]
+        student = test_users["student"]
+        student.is_online = True
+        await db_session.flush()
+
+        presence.touch(teacher.id)
+        presence.touch(student.id)
+        presence.mark_offline(student.id)
+
+        assert await persist_presence_snapshot(db_session) == 2
+        await db_session.refresh(teacher)
+        await db_session.refresh(student)
+        assert teacher.is_online is True
+        assert student.is_online is False
+
+    @pytest.mark.asyncio
+    async def test_snapshot_persists_user_expired_on_read(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User]
+    ):
+        """在 is_online 读取时过期清理的用户，快照同样写回离线"""
+        student = test_users["student"]
+        student.is_online = True
+        await db_session.flush()
+
+        presence.set(student.id, time.time(), ttl=0)
+        assert not presence.is_online(student.id)
+
+        await persist_presence_snapshot(db_session)
+        await db_session.refresh(student)
+        assert student.is_online is False
@@ -0,0 +1,153 @@
+"""
+Sparse fieldset tests.
+列表接口 fields= 参数测试：只返回请求的字段、关联对象按需 join、游标分页和权限过滤不受影响。
+"""
+from datetime import date, time
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BadRequestException
+from app.models.class_plan import ClassPlan
+from app.models.enrollment import Enrollment
+from app.models.schedule import Schedule
+from app.models.student import Student
+from app.services.enrollment_service import ENROLLMENT_FIELDS, EnrollmentService
+from app.services.schedule_service import SCHEDULE_FIELDS
+
+
+async def _add_schedules(db_session: AsyncSession, class_plan: ClassPlan, days: int) -> list[Schedule]:
+    schedules = [
+        Schedule(
+            class_plan_id=class_plan.id,
+            campus_id=class_plan.campus_id,
+            teacher_id=class_plan.teacher_id if day % 2 == 0 else None,
+            schedule_date=date(2024, 3, day),
+            start_time=time(9, 0),
+            end_time=time(11, 0),
+            lesson_hours=2,
+            status="scheduled",
+            created_by="test",
+        )
+        for day in range(1, days + 1)
+    ]
+    db_session.add_all(schedules)
+    await db_session.flush()
+    return schedules
+
+
+class TestProjection:
+    """字段解析"""
+
+    def test_parse_keeps_order_and_dedupes(self):
+        assert SCHEDULE_FIELDS.parse(None) is None
+        assert SCHEDULE_FIELDS.parse(" , ") is None
+        assert SCHEDULE_FIELDS.parse("teacher, id,teacher") == ("teacher", "id")
+
+    def test_parse_rejects_unknown_field(self):
+        with pytest.raises(BadRequestException):
+            SCHEDULE_FIELDS.parse("id,hashed_password")
+
+
+class TestSparseFieldsets:
+    """列表接口的 fields 参数"""
+
+    @pytest.mark.asyncio
+    async def test_schedule_fields_with_relation(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        super_admin_token: str
+    ):
+        """只返回请求的字段，关联对象为 {id, name}，没有关联时为 null"""
+        plan = test_class_plans[0]
+        await _add_schedules(db_session, plan, 2)
+        response = await client.get(
+            "/api/v1/schedules",
+            params={"fields": "id,schedule_date,teacher"},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        items = response.json()["data"]["items"]
+        assert [set(item) for item in items] == [{"id", "schedule_date", "teacher"}] * 2
+        # 日期倒序：3月2日（有教师）在前
+        assert items[0]["schedule_date"] == "2024-03-02"
+        assert items[0]["teacher"]["id"] == plan.teacher_id
+        assert items[1]["teacher"] is None
+
+    @pytest.mark.asyncio
+    async def test_schedule_fields_cursor_matches_full_list(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        super_admin_token: str
+    ):
+        """未请求游标排序键时仍能按游标翻页，结果与完整列表一致"""
+        await _add_schedules(db_session, test_class_plans[0], 5)
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        full = await client.get("/api/v1/schedules", params={"page_size": 10}, headers=headers)
+        expected = [item["id"] for item in full.json()["data"]["items"]]
+
+        ids = []
+        params = {"page_size": 2, "fields": "id"}
+        while True:
+            data = (await client.get("/api/v1/schedules", params=params, headers=headers)).json()["data"]
+            ids.extend(item["id"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            params = {"page_size": 2, "fields": "id", "cursor": data["next_cursor"]}
+        assert ids == expected
+
+    @pytest.mark.asyncio
+    async def test_enrollment_fields_with_teacher_filter(
+        self,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        test_students: list[Student]
+    ):
+        """教师过滤已 join 班级表时，仍可请求 class_plan；scheduled_hours 按排课汇总"""
+        plan = test_class_plans[0]
+        enrollment = Enrollment(
+            student_id=test_students[0].id,
+            class_plan_id=plan.id,
+            campus_id=plan.campus_id,
+            enroll_date=date(2024, 1, 1),
+            paid_amount=3000,
+            purchased_hours=20,
+            used_hours=0,
+            status="active",
+            created_by="test",
+        )
+        db_session.add(enrollment)
+        await _add_schedules(db_session, plan, 3)
+
+        fields = ENROLLMENT_FIELDS.parse("id,class_plan,student,scheduled_hours")
+        items, total, _ = await EnrollmentService(db_session).get_all(
+            teacher_id=plan.teacher_id, fields=fields
+        )
+        assert total == 1
+        assert items == [{
+            "id": enrollment.id,
+            "class_plan": {"id": plan.id, "name": plan.name},
+            "student": {"id": test_students[0].id, "name": test_students[0].name, "phone": test_students[0].phone},
+            "scheduled_hours": Decimal("6"),
+        }]
+
+    @pytest.mark.asyncio
+    async def test_student_unknown_field_rejected(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """不支持的字段返回 400"""
+        response = await client.get(
+            "/api/v1/students",
+            params={"fields": "id,name_pinyin"},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 400
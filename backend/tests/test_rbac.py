@@ -7,14 +7,19 @@ import pytest_asyncio
 from unittest.mock import patch
 
 from httpx import AsyncClient
+from sqlalchemy import delete, update as sa_update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (
     PermissionChecker, CampusScopedQuery, get_user_permissions,
     clear_permission_cache
 )
+from app.core.principal import principal_cache
+from app.core.versions import PERMISSION_VERSION, USER_VERSION, _version_cache, bump_version, get_version
 from app.models.user import User
-from app.models.permission import UserRole
+from app.models.permission import UserRole, RolePermission
+from app.models.system_version import SystemVersion
+from app.services.permission_service import PermissionService
 
 
 class TestPermissionChecker:
@@ -281,6 +286,318 @@ class TestPermissionCache:
         assert len(perms) > 0
 
 
+    @pytest.mark.asyncio
+    async def test_permission_cache_is_role_keyed(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_permissions
+    ):
+        """同一角色的用户共享缓存项"""
+        bj_admin = test_users["bj_campus_admin"]
+        sh_admin = test_users["sh_campus_admin"]
+        assert bj_admin.role_id == sh_admin.role_id
+
+        perms1 = await get_user_permissions(db_session, bj_admin.id, bj_admin.role_id)
+        perms2 = await get_user_permissions(db_session, sh_admin.id, sh_admin.role_id)
+        assert perms1 is perms2
+
+    @pytest.mark.asyncio
+    async def test_permission_version_invalidates_cache(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_permissions
+    ):
+        """其他进程修改角色权限并递增版本号后，本进程在版本号缓存过期后重新加载"""
+        bj_admin = test_users["bj_campus_admin"]
+        perms = await get_user_permissions(db_session, bj_admin.id, bj_admin.role_id)
+        assert "student:read" in perms
+
+        # 模拟其他工作进程：清空该角色权限并写入新版本号
+        await db_session.execute(
+            delete(RolePermission).where(RolePermission.role_id == bj_admin.role_id)
+        )
+        db_session.add(SystemVersion(key=PERMISSION_VERSION, version=1))
+        await db_session.flush()
+
+        # 版本号缓存未过期前仍使用本地缓存
+        perms = await get_user_permissions(db_session, bj_admin.id, bj_admin.role_id)
+        assert "student:read" in perms
+
+        # 版本号缓存过期后读到新版本，重新加载
+        _version_cache.clear()
+        perms = await get_user_permissions(db_session, bj_admin.id, bj_admin.role_id)
+        assert perms == frozenset()
+
+
+    @pytest.mark.asyncio
+    async def test_update_role_permissions_bumps_version(
+        self,
+        db_session: AsyncSession,
+        test_roles: dict[str, UserRole],
+        test_permissions
+    ):
+        """更新角色权限时递增权限版本号"""
+        service = PermissionService(db_session)
+        role = test_roles["campus_admin"]
+
+        await service.update_role_permissions(role.id, [test_permissions[0].id])
+        await service.update_role_permissions(role.id, [test_permissions[1].id])
+
+        version = await db_session.get(SystemVersion, PERMISSION_VERSION)
+        assert version.version == 2
+
+    @pytest.mark.asyncio
+    async def test_bumped_version_published_after_commit(self, db_session: AsyncSession):
+        """递增的版本号提交后才写入本进程缓存，回滚则丢弃"""
+        assert await get_version(db_session, PERMISSION_VERSION) == 0
+
+        await bump_version(db_session, PERMISSION_VERSION)
+        assert _version_cache.get(PERMISSION_VERSION) is None
+        await db_session.commit()
+        assert _version_cache.get(PERMISSION_VERSION)[0] == 1
+
+        await bump_version(db_session, PERMISSION_VERSION)
+        await db_session.rollback()
+        assert _version_cache.get(PERMISSION_VERSION) is None
+        assert await get_version(db_session, PERMISSION_VERSION) == 1
+
+
+class TestPrincipalCache:
+    """测试登录用户（Principal）缓存"""
+
+    @pytest.mark.asyncio
+    async def test_principal_cached_after_first_request(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        bj_admin_token: str
+    ):
+        """首次请求后缓存 Principal，后续请求不再查询用户"""
+        bj_admin = test_users["bj_campus_admin"]
+        headers = {"Authorization": f"Bearer {bj_admin_token}"}
+
+        response = await client.get("/api/v1/permissions/current", headers=headers)
+        assert response.status_code == 200
+        cached = principal_cache.get(bj_admin.id)
+        assert cached is not None
+        _, principal = cached
+        assert principal.user_role.code == "campus_admin"
+        assert principal.campus.id == bj_admin.campus_id
+
+        with patch("app.core.principal.Principal.from_user") as from_user:
+            response = await client.get("/api/v1/permissions/current", headers=headers)
+        assert response.status_code == 200
+        from_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabling_user_invalidates_principal(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str,
+        bj_admin_token: str
+    ):
+        """禁用用户后缓存失效，已签发的令牌立即不可用"""
+        bj_admin = test_users["bj_campus_admin"]
+        bj_headers = {"Authorization": f"Bearer {bj_admin_token}"}
+
+        response = await client.get("/api/v1/permissions/current", headers=bj_headers)
+        assert response.status_code == 200
+
+        response = await client.put(
+            f"/api/v1/users/{bj_admin.id}",
+            json={"is_active": False},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        assert principal_cache.get(bj_admin.id) is None
+
+        response = await client.get("/api/v1/permissions/current", headers=bj_headers)
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_other_worker_disabling_user_invalidates_principal(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        bj_admin_token: str
+    ):
+        """其他工作进程禁用用户：本进程缓存未清除，用户版本号变化后重新加载"""
+        bj_admin = test_users["bj_campus_admin"]
+        bj_headers = {"Authorization": f"Bearer {bj_admin_token}"}
+
+        response = await client.get("/api/v1/permissions/current", headers=bj_headers)
+        assert response.status_code == 200
+
+        # 模拟其他进程：直接修改数据库并递增版本号，不调用本进程的 invalidate_principal
+        await db_session.execute(sa_update(User).where(User.id == bj_admin.id).values(is_active=False))
+        await bump_version(db_session, USER_VERSION)
+        _version_cache.clear()  # 版本号读取缓存过期
+        assert principal_cache.get(bj_admin.id) is not None
+
+        response = await client.get("/api/v1/permissions/current", headers=bj_headers)
+        assert response.status_code == 401
+
+
+class TestAuthContext:
+    """测试请求级鉴权上下文"""
+
+    @pytest.mark.asyncio
+    async def test_token_resolved_once_per_request(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        bj_admin_token: str
+    ):
+        """同一请求的多个鉴权依赖只解析一次令牌"""
+        from app.api import deps
+
+        # 仪表盘接口同时依赖 CurrentUser 和 Auth
+        with patch.object(deps, "_authenticate", wraps=deps._authenticate) as authenticate:
+            response = await client.get(
+                "/api/v1/dashboard/student",
+                headers={"Authorization": f"Bearer {bj_admin_token}"}
+            )
+        assert response.status_code == 403
+        assert authenticate.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_linked_teacher_id_memoized(
+        self,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_teachers
+    ):
+        """关联教师ID在同一请求内只查询一次"""
+        from app.api.deps import AuthContext
+        from app.core.principal import load_principal
+
+        teacher_user = test_users["teacher"]
+        test_teachers[0].user_id = teacher_user.id
+        await db_session.flush()
+        principal = (await load_principal(db_session, teacher_user.id)).with_token(
+            {"role_code": "teacher"}
+        )
+        auth = AuthContext(principal)
+        scope = CampusScopedQuery()
+
+        teacher_id = await auth.get_teacher_id(db_session)
+        assert teacher_id is not None
+        with patch.object(db_session, "execute") as execute:
+            assert await scope.get_teacher_id_for_user(db_session, principal) == teacher_id
+        execute.assert_not_called()
+
+
+class TestTokenPermissionMask:
+    """测试访问令牌中的权限位图"""
+
+    @pytest.mark.asyncio
+    async def test_login_token_contains_permission_mask(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        test_permissions
+    ):
+        """登录签发的访问令牌包含权限位图和权限版本号，刷新令牌不包含"""
+        from app.core.security import verify_token
+
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"username": "bj_admin", "password": "123456"}
+        )
+        data = response.json()["data"]
+
+        payload = verify_token(data["access_token"])
+        assert payload["perms"]
+        assert payload["pv"] == 0
+        assert "perms" not in verify_token(data["refresh_token"], token_type="refresh")
+
+    @pytest.mark.asyncio
+    async def test_mask_authorizes_without_role_lookup(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_permissions
+    ):
+        """权限版本一致时按位判断，不查询角色权限"""
+        from app.api import deps
+        from app.core.permission_mask import build_permission_claims
+        from app.core.security import create_access_token
+
+        user = test_users["bj_campus_admin"]
+        claims = await build_permission_claims(db_session, user.role_id)
+        token = create_access_token({"sub": str(user.id), "role_code": "campus_admin", **claims})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with patch.object(deps, "get_user_permissions") as lookup:
+            allowed = await client.get("/api/v1/students", headers=headers)
+            denied = await client.get("/api/v1/permissions/roles", headers=headers)
+        assert allowed.status_code != 403
+        assert denied.status_code == 403
+        lookup.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_mask_falls_back_to_role_permissions(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_permissions
+    ):
+        """权限版本变更后忽略令牌中的位图，按最新角色权限判断"""
+        from app.core.permission_mask import build_permission_claims
+        from app.core.security import create_access_token
+
+        user = test_users["bj_campus_admin"]
+        claims = await build_permission_claims(db_session, user.role_id)
+        token = create_access_token({"sub": str(user.id), "role_code": "campus_admin", **claims})
+
+        # 模拟撤销该角色全部权限
+        await db_session.execute(
+            delete(RolePermission).where(RolePermission.role_id == user.role_id)
+        )
+        db_session.add(SystemVersion(key=PERMISSION_VERSION, version=1))
+        await db_session.flush()
+        _version_cache.clear()
+
+        response = await client.get(
+            "/api/v1/students",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_role_change_invalidates_mask(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_users: dict[str, User],
+        test_roles,
+    ):
+        """用户被降级后，旧令牌中的位图不再生效，按新角色的权限判断"""
+        from app.core.permission_mask import build_permission_claims
+        from app.core.security import create_access_token
+        from app.schemas.user import UserUpdate
+        from app.services.user_service import UserService
+
+        user = test_users["bj_campus_admin"]
+        claims = await build_permission_claims(db_session, user.role_id)
+        token = create_access_token({"sub": str(user.id), "role_code": "campus_admin", **claims})
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await client.get("/api/v1/students", headers=headers)).status_code == 200
+
+        await UserService(db_session).update_user(
+            user.id, UserUpdate(role_id=test_roles["student"].id), "test"
+        )
+
+        assert (await client.get("/api/v1/students", headers=headers)).status_code == 403
+        assert (await client.delete("/api/v1/students/99999", headers=headers)).status_code == 403
+
+
 class TestCrossRolePermissions:
     """测试跨角色权限边界"""
 
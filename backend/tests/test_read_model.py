@@ -0,0 +1,176 @@
+"""
+Read model tests.
+只读行测试：列级查询的日历、课时消耗历史、排课列表与原响应结构一致。
+"""
+from datetime import date, time
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.read_model import ReadModel
+from app.models.class_plan import ClassPlan
+from app.models.enrollment import Enrollment
+from app.models.lesson_record import LessonRecord
+from app.models.schedule import Schedule
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.schemas.lesson_record import LessonRecordResponse
+from app.schemas.schedule import CalendarEventResponse, ScheduleResponse
+
+
+class _Row(ReadModel):
+    __slots__ = ("id", "name")
+
+
+async def _add_schedule(db_session: AsyncSession, plan: ClassPlan, **values) -> Schedule:
+    schedule = Schedule(
+        class_plan_id=plan.id,
+        campus_id=plan.campus_id,
+        schedule_date=date(2024, 3, 1),
+        start_time=time(9, 0),
+        end_time=time(11, 0),
+        status="scheduled",
+        created_by="test",
+        **{"lesson_hours": 2, **values},
+    )
+    db_session.add(schedule)
+    await db_session.flush()
+    return schedule
+
+
+class TestReadModel:
+    """只读行基类"""
+
+    def test_columns_must_match_slots(self):
+        with pytest.raises(ValueError):
+            _Row.columns(id=Student.id)
+        assert [column.name for column in _Row.columns(name=Student.name, id=Student.id)] == ["id", "name"]
+
+    def test_to_dict(self):
+        row = _Row({"id": 1, "name": "张三", "phone": "ignored"})
+        assert row.to_dict() == {"id": 1, "name": "张三"}
+        assert row == _Row({"id": 1, "name": "张三"})
+
+
+class TestReadPaths:
+    """列级查询接口"""
+
+    @pytest.mark.asyncio
+    async def test_calendar_event_fields(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        test_teachers: list[Teacher],
+        super_admin_token: str
+    ):
+        """标题缺省取班级名称，教室、教师名称来自 join"""
+        plan = test_class_plans[0]
+        schedule = await _add_schedule(
+            db_session, plan, teacher_id=test_teachers[0].id, classroom_id=plan.classroom_id, batch_no="BATCH-1"
+        )
+        response = await client.get(
+            "/api/v1/schedules/calendar",
+            params={"start_date": "2024-03-01", "end_date": "2024-03-31"},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        [event] = response.json()["data"]["items"]
+        assert set(event) == set(CalendarEventResponse.model_fields)
+        assert event["id"] == str(schedule.id)
+        assert event["title"] == plan.name
+        assert event["start"] == "2024-03-01T09:00:00"
+        assert event["location"] == "101教室"
+        assert event["attendees"] == [test_teachers[0].name]
+        assert event["raw"]["batch_no"] == "BATCH-1"
+
+    @pytest.mark.asyncio
+    async def test_schedule_list_matches_response_schema(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        super_admin_token: str
+    ):
+        """未传 fields 时列表项字段与 ScheduleResponse 一致"""
+        plan = test_class_plans[0]
+        await _add_schedule(db_session, plan)
+        response = await client.get(
+            "/api/v1/schedules",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        [item] = response.json()["data"]["items"]
+        assert list(item) == list(ScheduleResponse.model_fields)
+        assert item["class_plan"] == {"id": plan.id, "name": plan.name}
+        assert item["teacher"] is None
+
+    @pytest.mark.asyncio
+    async def test_schedule_list_lesson_hours_is_number(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        super_admin_token: str
+    ):
+        """课时数与 ScheduleResponse 一样输出为数字（Numeric 列不输出为字符串），传 fields 时同样"""
+        await _add_schedule(db_session, test_class_plans[0], lesson_hours=Decimal("1.5"))
+        headers = {"Authorization": f"Bearer {super_admin_token}"}
+        for params in ({}, {"fields": "id,lesson_hours"}):
+            response = await client.get("/api/v1/schedules", params=params, headers=headers)
+            items = response.json()["data"]["items"]
+            assert items[0]["lesson_hours"] == 1.5
+            assert isinstance(items[0]["lesson_hours"], float)
+
+    @pytest.mark.asyncio
+    async def test_lesson_records_by_enrollment(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_class_plans: list[ClassPlan],
+        test_students: list[Student],
+        test_teachers: list[Teacher],
+        super_admin_token: str
+    ):
+        """关联名称来自 join；手动调整的记录没有排课，教师和上课日期为 null"""
+        plan = test_class_plans[0]
+        enrollment = Enrollment(
+            student_id=test_students[0].id,
+            class_plan_id=plan.id,
+            campus_id=plan.campus_id,
+            paid_amount=3000,
+            purchased_hours=20,
+            used_hours=0,
+            status="active",
+            created_by="test",
+        )
+        db_session.add(enrollment)
+        await db_session.flush()
+        schedule = await _add_schedule(db_session, plan, teacher_id=test_teachers[0].id)
+        db_session.add_all([
+            LessonRecord(
+                enrollment_id=enrollment.id, schedule_id=schedule.id,
+                record_date=date(2024, 3, 1), hours=Decimal("2"), type="schedule", created_by="test",
+            ),
+            LessonRecord(
+                enrollment_id=enrollment.id, record_date=date(2024, 3, 5),
+                hours=Decimal("1"), type="manual", created_by="test",
+            ),
+        ])
+        await db_session.flush()
+
+        response = await client.get(
+            f"/api/v1/lesson-records/by-enrollment/{enrollment.id}",
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        manual, scheduled = response.json()["data"]["items"]
+        assert set(manual) == set(LessonRecordResponse.model_fields)
+        assert manual["type"] == "manual"
+        assert manual["teacher_name"] is None and manual["schedule_date"] is None
+        assert manual["student_name"] == test_students[0].name
+        assert scheduled["teacher_name"] == test_teachers[0].name
+        assert scheduled["schedule_date"] == "2024-03-01"
+        assert scheduled["class_plan_name"] == plan.name
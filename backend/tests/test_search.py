@@ -0,0 +1,151 @@
+"""
+List search tests.
+列表搜索测试：相关度排序、电话号码按数字匹配、拼音首字母匹配、通配符转义。
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.search import digits_only, name_pinyin
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.models.user import User
+
+
+async def _search(client: AsyncClient, url: str, token: str, term: str) -> list[dict]:
+    response = await client.get(
+        url,
+        params={"search": term, "page_size": 100},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    return response.json()["data"]["items"]
+
+
+class TestSearch:
+    """列表搜索"""
+
+    def test_digits_only(self):
+        """电话号码去掉分隔符，没有数字时为 None"""
+        assert digits_only("+86 138-0000 0001") == "8613800000001"
+        assert digits_only("  ") is None
+        assert digits_only(None) is None
+
+    def test_name_pinyin(self):
+        """姓名转换为小写拼音全拼和首字母"""
+        assert name_pinyin("张三") == ("zhangsan", "zs")
+        assert name_pinyin("初二(3)班") == ("chuer3ban", "ce3b")
+        assert name_pinyin("") == (None, None)
+
+    @pytest.mark.asyncio
+    async def test_pinyin_initials_in_dropdowns(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        test_teachers: list[Teacher],
+        super_admin_token: str
+    ):
+        """下拉列表按拼音首字母或全拼前缀搜索"""
+        student = Student(name="张三", phone="13900000031", campus_id=test_students[0].campus_id, created_by="test")
+        db_session.add(student)
+        await db_session.flush()
+        assert (student.name_pinyin, student.name_initials) == ("zhangsan", "zs")
+
+        for term in ("zs", "ZhangS", "zhang san"):
+            items = await _search(client, "/api/v1/students/all", super_admin_token, term)
+            assert [item["id"] for item in items] == [student.id], term
+
+        items = await _search(client, "/api/v1/teachers/all", super_admin_token, "lls")
+        assert [item["name"] for item in items] == ["李老师"]
+
+    @pytest.mark.asyncio
+    async def test_pinyin_follows_name_updates(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """修改姓名后按新姓名的拼音搜索"""
+        student = test_students[0]
+        student.name = "王五"
+        await db_session.flush()
+
+        items = await _search(client, "/api/v1/students", super_admin_token, "ww")
+        assert [item["id"] for item in items] == [student.id]
+        assert await _search(client, "/api/v1/students", super_admin_token, "xm") == []
+
+    @pytest.mark.asyncio
+    async def test_student_results_ranked(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """完全匹配排在前缀匹配之前，前缀匹配排在包含匹配之前"""
+        campus_id = test_students[0].campus_id
+        contains = Student(name="王思远", phone="13900000011", campus_id=campus_id, created_by="test")
+        prefix = Student(name="思远明", phone="13900000012", campus_id=campus_id, created_by="test")
+        exact = Student(name="思远", phone="13900000013", campus_id=campus_id, created_by="test")
+        db_session.add_all([contains, prefix, exact])
+        await db_session.flush()
+
+        items = await _search(client, "/api/v1/students", super_admin_token, "思远")
+        assert [item["id"] for item in items] == [exact.id, prefix.id, contains.id]
+
+    @pytest.mark.asyncio
+    async def test_student_phone_search_ignores_separators(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """电话号码按纯数字匹配，与录入和搜索时的分隔符无关"""
+        student = Student(
+            name="赵六",
+            phone="139-0000-0021",
+            parent_phone="137 0000 0022",
+            campus_id=test_students[0].campus_id,
+            created_by="test"
+        )
+        db_session.add(student)
+        await db_session.flush()
+        assert student.phone_digits == "13900000021"
+
+        for term in ("13900000021", "0000 0021", "137-0000-0022"):
+            items = await _search(client, "/api/v1/students", super_admin_token, term)
+            assert [item["id"] for item in items] == [student.id], term
+
+    @pytest.mark.asyncio
+    async def test_like_wildcards_are_literal(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """搜索词中的 % 和 _ 按字面匹配"""
+        assert await _search(client, "/api/v1/users", super_admin_token, "%") == []
+        items = await _search(client, "/api/v1/users", super_admin_token, "bj_")
+        assert [item["username"] for item in items] == ["bj_admin"]
+
+    @pytest.mark.asyncio
+    async def test_user_phone_update_keeps_digits_in_sync(
+        self,
+        client: AsyncClient,
+        test_users: dict[str, User],
+        super_admin_token: str
+    ):
+        """更新用户手机号后可按新号码搜索到"""
+        teacher = test_users["teacher"]
+        response = await client.put(
+            f"/api/v1/users/{teacher.id}",
+            json={"phone": "138 0000 9999"},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+
+        items = await _search(client, "/api/v1/users", super_admin_token, "13800009999")
+        assert [item["id"] for item in items] == [teacher.id]
@@ -0,0 +1,176 @@
+"""
+Tests for password hashing worker pool, token verification and login throttling.
+密码哈希线程池、令牌校验、登录限流测试。
+"""
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from jose import JWTError
+
+from app.core import cache as cache_module
+from app.core import rate_limit, security
+from app.core.exceptions import ServiceUnavailableException
+from app.core.rate_limit import TokenBucketLimiter, login_throttle
+from app.core.security import (
+    PasswordWorkPool,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+    verify_token,
+)
+
+
+class TestPasswordWorkPool:
+    """密码哈希线程池"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_roundtrip(self):
+        """异步哈希与校验结果正确"""
+        hashed = await get_password_hash_async("123456")
+        assert await verify_password_async("123456", hashed) is True
+        assert await verify_password_async("654321", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop(self):
+        """哈希计算不在事件循环线程中执行"""
+        pool = PasswordWorkPool(max_workers=1, max_queue=10)
+        loop_thread = threading.get_ident()
+        worker_thread = await pool.submit(threading.get_ident)
+        assert worker_thread != loop_thread
+        assert pool.stats()["completed"] == 1
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """排队数达到上限时拒绝新请求"""
+        pool = PasswordWorkPool(max_workers=1, max_queue=2)
+        release = threading.Event()
+
+        # 1个执行中 + 2个排队
+        tasks = [asyncio.ensure_future(pool.submit(release.wait, 5)) for _ in range(3)]
+        while pool.stats()["running"] < 1:
+            await asyncio.sleep(0.01)
+        assert pool.stats()["queued"] == 2
+
+        with pytest.raises(ServiceUnavailableException):
+            await pool.submit(release.wait, 5)
+
+        release.set()
+        assert await asyncio.gather(*tasks) == [True, True, True]
+
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["queued"] == 0
+        assert stats["peak_queued"] >= 2
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_submit_releases_slot(self):
+        """排队中的请求被取消后归还排队名额，不会一直占满队列"""
+        pool = PasswordWorkPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        running = asyncio.ensure_future(pool.submit(release.wait, 5))
+        while pool.stats()["running"] < 1:
+            await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(pool.submit(release.wait, 5))
+        await asyncio.sleep(0)
+        assert pool.stats()["queued"] == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert pool.stats()["queued"] == 0
+
+        release.set()
+        assert await running is True
+        assert await pool.submit(release.wait, 5) is True
+        assert pool.stats()["queued"] == 0
+        pool.shutdown()
+
+
+class TestVerifiedTokenCache:
+    """已校验令牌缓存"""
+
+    def test_repeated_verification_skips_decode(self):
+        """同一令牌第二次校验不再验签"""
+        token = create_access_token({"sub": "1"})
+        assert verify_token(token)["sub"] == "1"
+
+        with patch.object(security, "_decode_token") as decode:
+            payload = verify_token(token)
+        decode.assert_not_called()
+        assert payload["sub"] == "1"
+
+    def test_cached_payload_still_checks_type(self):
+        """缓存命中时仍校验令牌类型，且返回副本"""
+        token = create_access_token({"sub": "1"})
+        verify_token(token)["sub"] = "2"
+
+        assert verify_token(token, token_type="refresh") is None
+        assert verify_token(token)["sub"] == "1"
+
+    def test_cache_entry_expires_with_token(self, monkeypatch):
+        """缓存条目在令牌过期时失效"""
+        token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=30))
+        assert verify_token(token) is not None
+
+        now = time.monotonic()
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 31)
+        with patch.object(security, "_decode_token", side_effect=JWTError("expired")):
+            assert verify_token(token) is None
+
+
+class TestLoginThrottle:
+    """登录限流与准入控制"""
+
+    def test_token_bucket_refills(self, monkeypatch):
+        """令牌耗尽后拒绝，按速率补充后恢复"""
+        limiter = TokenBucketLimiter("login_rate_test", rate_per_minute=60, burst=2, maxsize=10)
+        assert limiter.try_acquire("bj_admin")
+        assert limiter.try_acquire("bj_admin")
+        assert not limiter.try_acquire("bj_admin")
+        assert limiter.try_acquire("sh_admin")
+
+        now = time.monotonic()
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now + 1.5)
+        assert limiter.try_acquire("bj_admin")
+        assert limiter.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_login_fails_before_password_check(
+        self,
+        client: AsyncClient,
+        test_users
+    ):
+        """用户名令牌耗尽后直接返回429，不校验密码"""
+        for _ in range(login_throttle.user_limiter.burst):
+            login_throttle.user_limiter.try_acquire("bj_admin")
+
+        with patch("app.services.auth_service.verify_password_async") as verify:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": "BJ_admin", "password": "123456"}
+            )
+        assert response.status_code == 429
+        verify.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_in_flight_cap(self, client: AsyncClient, test_users):
+        """同时进行的登录数达到上限时拒绝"""
+        login_throttle.in_flight = login_throttle.max_in_flight
+        try:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": "bj_admin", "password": "123456"}
+            )
+        finally:
+            login_throttle.in_flight = 0
+        assert response.status_code == 429
+        assert login_throttle.stats()["rejected_in_flight"] >= 1
@@ -0,0 +1,174 @@
+"""
+Typeahead index tests.
+下拉输入联想测试：内存索引的匹配与排序、接口联想模式、提交后增量更新、按校区的版本号。
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.typeahead import TypeaheadEntry, TypeaheadIndex
+from app.core.versions import STUDENT_TYPEAHEAD_VERSION, bump_version, get_scoped_stamp, get_version, scoped_key
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.schemas.student import StudentUpdate
+from app.services.student_service import STUDENT_TYPEAHEAD, StudentService
+
+
+def _entry(id: int, name: str, pinyin: str, initials: str, phone: str, active: bool = True) -> TypeaheadEntry:
+    return TypeaheadEntry(
+        id=id, name=name, aliases=(pinyin, initials), phones=(phone,), attrs={"is_active": active}
+    )
+
+
+class TestTypeaheadIndex:
+    """内存索引"""
+
+    def setup_method(self):
+        self.index = TypeaheadIndex([
+            _entry(1, "张三", "zhangsan", "zs", "138-0000-1234"),
+            _entry(2, "张三丰", "zhangsanfeng", "zsf", "13900005678"),
+            _entry(3, "李张三", "lizhangsan", "lzs", "13700009999", active=False),
+        ])
+
+    def test_exact_before_prefix_before_contains(self):
+        """完全匹配 > 前缀匹配 > 姓名包含"""
+        assert self.index.search("张三", 10) == [1, 2, 3]
+        assert self.index.search("zs", 10) == [1, 2]
+
+    def test_phone_prefix_and_tail(self):
+        """电话号码按前缀或尾号匹配"""
+        assert self.index.search("1380000", 10) == [1]
+        assert self.index.search("5678", 10) == [2]
+
+    def test_filters_and_limit(self):
+        """按属性筛选并截取前 K 条"""
+        assert self.index.search("张三", 10, {"is_active": True}) == [1, 2]
+        assert self.index.search("张三", 1) == [1]
+
+    def test_add_and_remove(self):
+        """增量新增、替换、删除"""
+        self.index.add(_entry(4, "王五", "wangwu", "ww", ""))
+        assert self.index.search("ww", 10) == [4]
+        self.index.add(_entry(1, "赵六", "zhaoliu", "zl", ""))
+        assert self.index.search("zs", 10) == [2]
+        self.index.remove(2)
+        assert self.index.search("张", 10) == [3]
+        assert len(self.index) == 3
+
+
+class TestTypeaheadEndpoints:
+    """下拉接口的输入联想模式"""
+
+    @pytest.mark.asyncio
+    async def test_student_dropdown_typeahead(
+        self,
+        client: AsyncClient,
+        test_students: list[Student],
+        super_admin_token: str
+    ):
+        """传入 q 时只返回匹配的前 limit 条"""
+        response = await client.get(
+            "/api/v1/students/all",
+            params={"q": "xm", "limit": 5},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        items = response.json()["data"]["items"]
+        assert [item["id"] for item in items] == [test_students[0].id]
+
+    @pytest.mark.asyncio
+    async def test_teacher_dropdown_typeahead_by_phone_tail(
+        self,
+        client: AsyncClient,
+        test_teachers: list[Teacher],
+        super_admin_token: str
+    ):
+        """教师按电话尾号联想"""
+        teacher = test_teachers[1]
+        response = await client.get(
+            "/api/v1/teachers/all",
+            params={"q": teacher.phone[-4:]},
+            headers={"Authorization": f"Bearer {super_admin_token}"}
+        )
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["data"]["items"]] == [teacher.id]
+
+    @pytest.mark.asyncio
+    async def test_commit_updates_index_incrementally(
+        self,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        monkeypatch
+    ):
+        """写操作提交后增量更新已建立的索引，不重新加载"""
+        loads = []
+        original_load = STUDENT_TYPEAHEAD._load
+
+        async def counting_load(db, scope):
+            loads.append(scope)
+            return await original_load(db, scope)
+
+        monkeypatch.setattr(STUDENT_TYPEAHEAD, "_load", counting_load)
+        campus_id = test_students[0].campus_id
+        assert await STUDENT_TYPEAHEAD.search(db_session, "xm", 10, scope=campus_id) == [test_students[0].id]
+
+        student = Student(name="小明明", phone="13600000003", campus_id=campus_id, created_by="test")
+        db_session.add(student)
+        await db_session.flush()
+        await STUDENT_TYPEAHEAD.changed(db_session, student)
+        await db_session.commit()
+
+        ids = await STUDENT_TYPEAHEAD.search(db_session, "xm", 10, scope=campus_id)
+        assert ids == [test_students[0].id, student.id]
+        assert loads == [campus_id]
+
+    @pytest.mark.asyncio
+    async def test_other_campus_index_not_rebuilt(
+        self,
+        db_session: AsyncSession,
+        test_students: list[Student],
+        monkeypatch
+    ):
+        """其他进程修改了一个校区的学生后，只重建该校区的索引"""
+        loads = []
+        original_load = STUDENT_TYPEAHEAD._load
+
+        async def counting_load(db, scope):
+            loads.append(scope)
+            return await original_load(db, scope)
+
+        monkeypatch.setattr(STUDENT_TYPEAHEAD, "_load", counting_load)
+        bj_campus, sh_campus = test_students[0].campus_id, test_students[1].campus_id
+        for campus_id in (bj_campus, sh_campus):
+            await STUDENT_TYPEAHEAD.search(db_session, "x", 10, scope=campus_id)
+
+        # 模拟其他进程：版本号已递增，但本进程没有收到增量更新
+        await bump_version(db_session, scoped_key(STUDENT_TYPEAHEAD_VERSION, bj_campus))
+        await db_session.commit()
+
+        for campus_id in (bj_campus, sh_campus):
+            await STUDENT_TYPEAHEAD.search(db_session, "x", 10, scope=campus_id)
+        assert loads == [bj_campus, sh_campus, bj_campus]
+
+    @pytest.mark.asyncio
+    async def test_unindexed_change_does_not_bump(
+        self,
+        db_session: AsyncSession,
+        test_students: list[Student]
+    ):
+        """只修改联想不用的字段时不递增联想版本号；改姓名时只递增所在校区的版本号"""
+        student = test_students[0]
+        key = scoped_key(STUDENT_TYPEAHEAD_VERSION, student.campus_id)
+        other_key = scoped_key(STUDENT_TYPEAHEAD_VERSION, test_students[1].campus_id)
+        service = StudentService(db_session)
+
+        await service.update(student.id, StudentUpdate(remark="备注", school="实验中学"), "test")
+        await db_session.commit()
+        assert await get_version(db_session, key) == 0
+
+        await service.update(student.id, StudentUpdate(name="小明明"), "test")
+        await db_session.commit()
+        assert await get_version(db_session, key) == 1
+        assert await get_version(db_session, other_key) == 0
+        # 全部校区的版本号为各校区之和
+        assert (await get_scoped_stamp(db_session, STUDENT_TYPEAHEAD_VERSION, None))[0] == 1